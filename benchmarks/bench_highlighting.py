@@ -0,0 +1,83 @@
+"""Measure typing latency on a 100k-line Python document with and without highlighting.
+
+Run with ``QT_QPA_PLATFORM=offscreen uv run python benchmarks/bench_highlighting.py``.
+Each keystroke is timed from key press to the end of its synchronous handling,
+which includes re-highlighting the edited block within the per-keystroke budget.
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from PySide6.QtCore import Qt  # noqa: E402
+from PySide6.QtTest import QTest  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+import highlighter  # noqa: E402
+import main  # noqa: E402
+
+LINES = 100_000
+TEXT = '"""x"""  # opening and closing a triple quote forces re-highlighting past the edited line\n'
+SAMPLE = '''@decorator
+def function(argument, other=0x1F):
+    """Docstring spanning
+    two lines."""
+    value = len(argument) + 3.5e-2  # comment
+    return "string" if value else 'other'
+'''
+
+
+def type_text(app, editor, text):
+    """Return per-keystroke latencies in milliseconds."""
+    latencies = []
+    for char in text:
+        start = time.perf_counter()
+        if char == "\n":
+            QTest.keyClick(editor, Qt.Key.Key_Return)
+        else:
+            QTest.keyClicks(editor, char)
+        latencies.append((time.perf_counter() - start) * 1000)
+        app.processEvents()
+    return latencies
+
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<22} p50 {statistics.median(latencies):6.3f} ms  p95 {p95:6.3f} ms  max {latencies[-1]:6.3f} ms")
+
+
+def main_benchmark():
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = main.MainWindow()
+    window.resize(1280, 960)
+    window.show()
+    editor = window.text_editor
+    repeats = LINES // SAMPLE.count("\n")
+    editor.setPlainText(SAMPLE * repeats)
+    editor.setFocus()
+    app.processEvents()
+
+    cursor = editor.textCursor()
+    cursor.setPosition(len(SAMPLE) * 10)
+    editor.setTextCursor(cursor)
+    plain = type_text(app, editor, TEXT * 5)
+
+    editor.highlighter.set_lexer(highlighter.PythonLexer())
+    start = time.perf_counter()
+    while editor.highlighter.pending:
+        app.processEvents()
+    background = time.perf_counter() - start
+    highlighted = type_text(app, editor, TEXT * 5)
+
+    print(f"{editor.document().blockCount()} lines, budget {highlighter.KEYSTROKE_BUDGET_MS} ms per keystroke")
+    print(f"background highlighting of the whole document: {background:.2f} s")
+    report("typing, plain", plain)
+    report("typing, highlighted", highlighted)
+
+
+if __name__ == "__main__":
+    main_benchmark()
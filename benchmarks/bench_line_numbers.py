@@ -0,0 +1,92 @@
+"""Measure LineNumberArea paint time per frame on a 100k-line document.
+
+Run with ``QT_QPA_PLATFORM=offscreen uv run python benchmarks/bench_line_numbers.py``.
+The "before" numbers come from a copy of the original paintEvent, which looked up
+font metrics, set the pen and formatted a new string for every row on every paint.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from PySide6.QtCore import Qt  # noqa: E402
+from PySide6.QtGui import QPainter  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+import main  # noqa: E402
+
+LINES = 100_000
+FRAMES = 500
+
+
+class LegacyLineNumberArea(main.LineNumberArea):
+    """The line number gutter as it painted before caching was introduced."""
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), Qt.GlobalColor.lightGray)
+
+        block = self.text_editor.firstVisibleBlock()
+        block_number = block.blockNumber()
+        top = self.text_editor.blockBoundingGeometry(block).translated(self.text_editor.contentOffset()).top()
+        bottom = top + self.text_editor.blockBoundingRect(block).height()
+
+        while block.isValid() and top <= event.rect().bottom():
+            if block.isVisible() and bottom >= event.rect().top():
+                number = str(block_number + 1)
+                painter.setPen(Qt.GlobalColor.black)
+                painter.drawText(
+                    0,
+                    int(top),
+                    self.width(),
+                    self.text_editor.fontMetrics().height(),
+                    Qt.AlignmentFlag.AlignLeft,
+                    number,
+                )
+
+            block = block.next()
+            top = bottom
+            bottom = top + self.text_editor.blockBoundingRect(block).height()
+            block_number += 1
+
+
+def measure(app, editor, area):
+    """Return the mean milliseconds spent painting the whole gutter per scrolled frame."""
+    scroll_bar = editor.verticalScrollBar()
+    step = max(1, scroll_bar.maximum() // FRAMES)
+    elapsed = 0.0
+    for frame in range(FRAMES):
+        scroll_bar.setValue(frame * step)
+        app.processEvents()
+        start = time.perf_counter()
+        area.repaint()
+        elapsed += time.perf_counter() - start
+    return elapsed * 1000 / FRAMES
+
+
+def main_benchmark():
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = main.MainWindow()
+    window.resize(1280, 960)
+    window.show()
+    editor = window.text_editor
+    editor.setPlainText("\n".join(f"line {i}" for i in range(LINES)))
+    app.processEvents()
+
+    after = measure(app, editor, editor.line_number_area)
+
+    legacy = LegacyLineNumberArea(editor)
+    legacy.setGeometry(editor.line_number_area.geometry())
+    editor.line_number_area.hide()
+    legacy.show()
+    before = measure(app, editor, legacy)
+
+    print(f"{LINES} lines, {FRAMES} frames, gutter height {legacy.height()}px")
+    print(f"before: {before:.3f} ms/frame")
+    print(f"after:  {after:.3f} ms/frame")
+
+
+if __name__ == "__main__":
+    main_benchmark()
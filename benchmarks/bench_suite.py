@@ -0,0 +1,255 @@
+"""Benchmark the editor's hot paths on synthetic documents and write the results as JSON.
+
+Run with ``QT_QPA_PLATFORM=offscreen uv run python benchmarks/bench_suite.py``.
+For each document size (1K, 100K, 1M and 10M lines by default) this measures the
+open time, save time, setPlainText on a fresh editor, per-keystroke typing latency,
+viewport and LineNumberArea repaint time while scrolling, and memory footprint.
+Documents above the large file threshold open in read-only large file mode, so
+their save, setPlainText and typing entries are null.
+
+Pass ``--output results.json`` to choose where the results go and ``--compare
+old.json`` to print the change of every metric against an earlier run.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import PySide6  # noqa: E402
+from PySide6.QtCore import Qt  # noqa: E402
+from PySide6.QtTest import QTest  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+import main  # noqa: E402
+
+SIZES = [1_000, 100_000, 1_000_000, 10_000_000]
+LINE = "{:08d} the quick brown fox jumps over the lazy dog\n"
+KEYSTROKES = 200
+FRAMES = 200
+# Relative slowdowns above this are flagged by --compare.
+REGRESSION_THRESHOLD = 0.10
+
+
+def document_path(lines):
+    """Return a synthetic document of ``lines`` lines, generating it on first use."""
+    directory = os.path.join(tempfile.gettempdir(), "gapp-text-editor-bench")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{lines}.txt")
+    if not os.path.exists(path):
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            for start in range(0, lines, 100_000):
+                file.write("".join(LINE.format(i) for i in range(start, min(lines, start + 100_000))))
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def resident_memory():
+    """Return the resident set size in bytes, or the peak where the current size is unavailable."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {
+        "p50": statistics.median(samples),
+        "p95": samples[int(len(samples) * 0.95) - 1],
+        "p99": samples[int(len(samples) * 0.99) - 1],
+    }
+
+
+def wait_until(app, done):
+    """Process events until ``done()`` holds; return the elapsed seconds."""
+    start = time.perf_counter()
+    while not done():
+        app.processEvents()
+    return time.perf_counter() - start
+
+
+def measure_open(app, window, path):
+    start = time.perf_counter()
+    window.open_file(path)
+    tab = window.current_tab
+    if tab.editor.large_file is not None:
+        wait_until(app, tab.editor.large_file.index.isFinished)
+    else:
+        wait_until(app, lambda: tab.loader is None)
+    return time.perf_counter() - start
+
+
+def measure_save(app, window, path):
+    tab = window.current_tab
+    if tab.editor.large_file is not None:
+        return None
+    copy_path = path + ".saved"
+    start = time.perf_counter()
+    window._write_file(copy_path)
+    wait_until(app, lambda: tab.saver is None)
+    elapsed = time.perf_counter() - start
+    os.unlink(copy_path)
+    return elapsed
+
+
+def measure_set_plain_text(app, path):
+    if os.path.getsize(path) > main.LARGE_FILE_THRESHOLD:
+        return None
+    with open(path, encoding="utf-8") as file:
+        text = file.read()
+    editor = main.TextEditor()
+    start = time.perf_counter()
+    editor.setPlainText(text)
+    elapsed = time.perf_counter() - start
+    editor.deleteLater()
+    app.processEvents()
+    return elapsed
+
+
+def measure_typing(app, editor):
+    """Return per-keystroke latency percentiles in milliseconds, typing in the middle of the document.
+
+    The typed text stays in the document, so the save measured afterwards writes an edited piece table.
+    """
+    if editor.large_file is not None:
+        return None
+    editor.setFocus()
+    editor.go_to_line(editor.blockCount() // 2)
+    app.processEvents()
+    latencies = []
+    for index in range(KEYSTROKES):
+        start = time.perf_counter()
+        if index % 40 == 39:
+            QTest.keyClick(editor, Qt.Key.Key_Return)
+        else:
+            QTest.keyClicks(editor, "x")
+        latencies.append((time.perf_counter() - start) * 1000)
+        app.processEvents()
+    return percentiles(latencies)
+
+
+def measure_scroll_repaint(app, editor):
+    """Return the mean milliseconds to repaint the viewport and the gutter per scrolled frame."""
+    scroll_bar = editor.large_file_scroll_bar if editor.large_file is not None else editor.verticalScrollBar()
+    step = max(1, scroll_bar.maximum() // FRAMES)
+    viewport = gutter = 0.0
+    for frame in range(FRAMES):
+        scroll_bar.setValue(frame * step)
+        app.processEvents()
+        start = time.perf_counter()
+        editor.viewport().repaint()
+        middle = time.perf_counter()
+        editor.line_number_area.repaint()
+        viewport += middle - start
+        gutter += time.perf_counter() - middle
+    return {"viewport": viewport * 1000 / FRAMES, "line_numbers": gutter * 1000 / FRAMES}
+
+
+def run_size(app, window, lines):
+    path = document_path(lines)
+    size = os.path.getsize(path)
+    gc.collect()
+    before = resident_memory()
+    open_time = measure_open(app, window, path)
+    gc.collect()
+    editor = window.text_editor
+    result = {
+        "bytes": size,
+        "large_file_mode": editor.large_file is not None,
+        "open_s": open_time,
+        "open_mb_per_s": size / open_time / (1024 * 1024),
+        "memory_mb": {
+            "rss_delta": (resident_memory() - before) / (1024 * 1024),
+            "estimate": editor.memory_usage() / (1024 * 1024),
+        },
+        "scroll_repaint_ms": measure_scroll_repaint(app, editor),
+        "typing_ms": measure_typing(app, editor),
+        "save_s": measure_save(app, window, path),
+    }
+    window.close_tab(window.tabs.currentIndex())
+    app.processEvents()
+    result["set_plain_text_s"] = measure_set_plain_text(app, path)
+    return result
+
+
+def flatten(results, prefix=""):
+    """Flatten nested result dictionaries into ``{"a.b": value}``."""
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(old, new):
+    """Print each metric of two runs side by side, flagging slowdowns."""
+    for lines, results in new["results"].items():
+        if lines not in old["results"]:
+            continue
+        print(f"\n{int(lines):,} lines vs. {old['environment'].get('timestamp', 'previous run')}")
+        previous = flatten(old["results"][lines])
+        for metric, value in flatten(results).items():
+            if metric not in previous or not previous[metric]:
+                continue
+            change = value / previous[metric] - 1
+            # Throughput improves upwards; every other metric is a time or a size.
+            worse = -change if metric.endswith("per_s") else change
+            flag = "  REGRESSION" if worse > REGRESSION_THRESHOLD and metric != "bytes" else ""
+            print(f"  {metric:<32} {previous[metric]:12.3f} -> {value:12.3f}  {change:+7.1%}{flag}")
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated line counts")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    arguments = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    window = main.MainWindow()
+    window.resize(1280, 960)
+    window.show()
+    app.processEvents()
+
+    results = {}
+    for lines in (int(size) for size in arguments.sizes.split(",")):
+        print(f"{lines:,} lines…", flush=True)
+        results[str(lines)] = run_size(app, window, lines)
+        print(json.dumps(results[str(lines)], indent=2))
+
+    report = {
+        "environment": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pyside": PySide6.__version__,
+            "platform": platform.platform(),
+            "qpa": QApplication.platformName(),
+        },
+        "results": results,
+    }
+    with open(arguments.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"wrote {arguments.output}")
+    if arguments.compare:
+        with open(arguments.compare, encoding="utf-8") as file:
+            compare(json.load(file), report)
+    window.close()
+
+
+if __name__ == "__main__":
+    main_benchmark()
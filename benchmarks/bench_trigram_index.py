@@ -0,0 +1,115 @@
+"""Measure trigram index build throughput and query latency on a synthetic log tree.
+
+Run with ``QT_QPA_PLATFORM=offscreen uv run python benchmarks/bench_trigram_index.py``.
+Builds FILES log files of FILE_SIZE bytes in a temporary directory, indexes them
+with the process pool, then times candidate lookup and a full Find in Folder scan
+with and without the index for a rare and a common query. Trigram extraction is
+also timed on its own in this process, against a copy of the original version that
+built a tuple for every byte position.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from folder_search import FolderSearch, create_pool, iter_files  # noqa: E402
+from trigram_index import TrigramIndexer, file_trigrams, filter_candidates  # noqa: E402
+
+FILES = 200
+FILE_SIZE = 1024 * 1024
+LEVELS = ["INFO", "DEBUG", "WARN", "ERROR"]
+QUERIES = ["request_id=rare-needle-42", "ERROR"]
+
+
+def build_tree(root):
+    """Write FILES synthetic log files; one of them contains the rare needle."""
+    rng = random.Random(0)
+    for index in range(FILES):
+        lines = []
+        size = 0
+        while size < FILE_SIZE:
+            line = (
+                f"2025-01-01T00:00:{size % 60:02d} {rng.choice(LEVELS)} "
+                f"worker-{rng.randrange(64)} took {rng.random():.4f}s\n"
+            )
+            lines.append(line)
+            size += len(line)
+        if index == FILES // 2:
+            lines.append("2025-01-01T00:00:00 INFO request_id=rare-needle-42\n")
+        with open(os.path.join(root, f"app-{index:04d}.log"), "w") as file:
+            file.writelines(lines)
+
+
+def legacy_file_trigrams(path):
+    """Trigram extraction as it was before words were deduplicated."""
+    trigrams = set()
+    with open(path, "rb") as file:
+        data = file.read().lower()
+        trigrams.update(zip(data, data[1:], data[2:]))
+    return sorted((a << 16) | (b << 8) | c for a, b, c in trigrams)
+
+
+def extraction_throughput(extract, paths):
+    """Return the MB/s of extracting the trigrams of the given files."""
+    size = sum(os.path.getsize(path) for path in paths)
+    start = time.perf_counter()
+    for path in paths:
+        extract(path)
+    return size / (1024 * 1024) / (time.perf_counter() - start)
+
+
+def timed_scan(pool, root, query, file_filter):
+    search = FolderSearch(pool, root, "*.log", query, case_sensitive=True, file_filter=file_filter)
+    matched = []
+    search.file_matched.connect(lambda path, matches: matched.append(path))
+    start = time.perf_counter()
+    search.run()
+    return time.perf_counter() - start, len(matched)
+
+
+def main_benchmark():
+    pool = create_pool()
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root)
+        index_path = os.path.join(root, ".index", "trigrams.sqlite")
+        total_mb = sum(os.path.getsize(path) for path in iter_files(root, "*.log")) / (1024 * 1024)
+
+        # Warm the pool so process start-up is not counted as indexing or scan time.
+        timed_scan(pool, root, "warm-up", None)
+
+        indexer = TrigramIndexer(pool, index_path, root, "*.log")
+        start = time.perf_counter()
+        indexer.run()
+        build = time.perf_counter() - start
+        print(f"{FILES} files, {total_mb:.0f} MB")
+        sample = sorted(iter_files(root, "*.log"))[:10]
+        before = extraction_throughput(legacy_file_trigrams, sample)
+        after = extraction_throughput(file_trigrams, sample)
+        print(f"trigram extraction, one process: before {before:.1f} MB/s, after {after:.1f} MB/s")
+        print(f"index build: {build:.2f} s, {total_mb / build:.1f} MB/s, {FILES / build:.0f} files/s")
+
+        start = time.perf_counter()
+        TrigramIndexer(pool, index_path, root, "*.log").run()
+        print(f"index refresh with nothing changed: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        for query in QUERIES:
+            start = time.perf_counter()
+            candidates = list(filter_candidates(index_path, query, False, iter_files(root, "*.log")))
+            lookup = (time.perf_counter() - start) * 1000
+            scan, matched = timed_scan(pool, root, query, None)
+            indexed_scan, _ = timed_scan(
+                pool, root, query, lambda paths, q=query: filter_candidates(index_path, q, False, paths)
+            )
+            print(
+                f"{query!r}: lookup {lookup:.1f} ms, {len(candidates)} candidate files, {matched} matching; "
+                f"scan {scan * 1000:.0f} ms without index, {indexed_scan * 1000:.0f} ms with index"
+            )
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,18 @@
+import os
+
+from PySide6.QtCore import QStandardPaths
+
+# Set as the QApplication name in main(), so that Qt's standard locations are named after the editor.
+APPLICATION_NAME = "gapp-text-editor"
+
+
+def data_directory():
+    """Return the directory for the editor's persistent state, such as the session and journals."""
+    data = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+    return data or os.path.join(os.path.expanduser("~/.local/share"), APPLICATION_NAME)
+
+
+def cache_directory():
+    """Return the directory for data the editor can rebuild, such as the trigram index."""
+    cache = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+    return cache or os.path.join(os.path.expanduser("~/.cache"), APPLICATION_NAME)
@@ -0,0 +1,56 @@
+from PySide6.QtCore import QObject, QTimer, Signal
+
+import tracing
+
+
+class ChangeBus(QObject):
+    """Coalesces document changes into one notification per event-loop tick.
+
+    Every ``contentsChange`` of the document widens a pending block range; the
+    range is delivered once through ``contents_changed`` when control returns to
+    the event loop, or after ``debounce_ms`` of quiet if a debounce is set.
+    Subscribers that only need to know *that* something changed therefore cost
+    one call per batch instead of one per keystroke or per pasted chunk.
+    """
+
+    contents_changed = Signal(int, int)
+
+    def __init__(self, document, parent=None, debounce_ms=0):
+        super().__init__(parent)
+        self._document = document
+        self._first_block = None
+        self._last_block = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+        self.set_debounce(debounce_ms)
+        document.contentsChange.connect(self._record_change)
+
+    def set_debounce(self, debounce_ms):
+        """Deliver batches ``debounce_ms`` after the last change; 0 means on the next event-loop tick."""
+        self._timer.setInterval(debounce_ms)
+
+    @tracing.traced("contentsChange: change bus", "signal")
+    def _record_change(self, position, chars_removed, chars_added):
+        """Widen the pending block range to cover one document change."""
+        first = self._document.findBlock(position).blockNumber()
+        last = self._document.findBlock(position + chars_added).blockNumber()
+        if last < 0:
+            last = self._document.blockCount() - 1
+        if self._first_block is None:
+            self._first_block, self._last_block = first, last
+        else:
+            self._first_block = min(self._first_block, first)
+            self._last_block = max(self._last_block, last)
+        if self._timer.interval() or not self._timer.isActive():
+            self._timer.start()
+
+    @tracing.traced("contents_changed", "signal")
+    def flush(self):
+        """Deliver the pending notification immediately, if any."""
+        self._timer.stop()
+        if self._first_block is None:
+            return
+        first, last = self._first_block, min(self._last_block, self._document.blockCount() - 1)
+        self._first_block = self._last_block = None
+        self.contents_changed.emit(first, max(first, last))
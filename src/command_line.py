@@ -0,0 +1,103 @@
+import argparse
+import codecs
+
+# Only the standard library is imported here, so the command line can be parsed
+# before Qt is loaded.
+
+# Qt options that take the next argument as their value, which must not be taken for a file.
+# QApplication reads them from sys.argv itself; like Qt, either one or two dashes are accepted.
+QT_OPTIONS_WITH_VALUE = {
+    "-display",
+    "-geometry",
+    "-platform",
+    "-platformpluginpath",
+    "-platformtheme",
+    "-plugin",
+    "-qwindowgeometry",
+    "-qwindowicon",
+    "-qwindowtitle",
+    "-session",
+    "-style",
+    "-stylesheet",
+}
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="Gapp Text Editor")
+    parser.add_argument(
+        "files",
+        nargs="*",
+        metavar="FILE | +LINE",
+        help="files to open; +LINE jumps to LINE in the next file (or the previous one, if last)",
+    )
+    parser.add_argument("--goto", action="append", default=[], metavar="FILE:LINE", help="open FILE at LINE")
+    parser.add_argument("--readonly", action="store_true", help="open the files read-only")
+    parser.add_argument("--encoding", help="decode and save the files with this encoding, overriding detection")
+    parser.add_argument(
+        "--large-file-threshold",
+        type=int,
+        metavar="MB",
+        help="open files larger than this read-only in large file mode (default 256); implies --new-instance",
+    )
+    parser.add_argument("--new-instance", action="store_true", help="do not hand the files to a running editor")
+    parser.add_argument("--startup-profile", action="store_true", help="print startup timings after the first paint")
+    parser.add_argument(
+        "--trace", action="store_true", help="record a trace from startup; export it from the View menu"
+    )
+    return parser
+
+
+def parse_arguments(argv):
+    """Parse command line arguments; ``files`` becomes a list of ``(path, line)`` with ``line`` 1-based or None."""
+    parser = _build_parser()
+    # Options Qt understands (e.g. -platform offscreen, -reverse) are left for QApplication.
+    arguments, _ = parser.parse_known_intermixed_args(_without_qt_values(argv))
+    if arguments.encoding:
+        try:
+            codecs.lookup(arguments.encoding)
+        except LookupError:
+            parser.error(f"unknown encoding: {arguments.encoding}")
+    if arguments.large_file_threshold is not None:
+        if arguments.large_file_threshold < 0:
+            parser.error(f"invalid large file threshold: {arguments.large_file_threshold}")
+        # A running editor keeps its own threshold, so the files are opened in a new one.
+        arguments.new_instance = True
+
+    files = []
+    line = None
+    for argument in arguments.files:
+        if argument.startswith("+"):
+            line = _parse_line(parser, argument[1:])
+        else:
+            files.append((argument, line))
+            line = None
+    if line is not None:
+        if not files:
+            parser.error("+LINE given without a file")
+        files[-1] = (files[-1][0], line)
+    for goto in arguments.goto:
+        path, _, line = goto.rpartition(":")
+        if not path:
+            parser.error(f"--goto expects FILE:LINE, got {goto}")
+        files.append((path, _parse_line(parser, line)))
+    arguments.files = files
+    return arguments
+
+
+def _without_qt_values(argv):
+    """Return ``argv`` without the values of Qt options, leaving the options themselves as unknown arguments."""
+    result = []
+    arguments = iter(argv)
+    for argument in arguments:
+        result.append(argument)
+        if argument == "--":
+            result.extend(arguments)
+        elif argument in QT_OPTIONS_WITH_VALUE or argument[1:] in QT_OPTIONS_WITH_VALUE:
+            next(arguments, None)
+    return result
+
+
+def _parse_line(parser, text):
+    if not text.isdigit() or int(text) < 1:
+        parser.error(f"invalid line number: {text}")
+    return int(text)
@@ -0,0 +1,50 @@
+import bz2
+import gzip
+import lzma
+import os
+
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz")
+# Faster than gzip's default of 9 for a slightly larger file, since saving is interactive.
+GZIP_LEVEL = 6
+
+
+def compression_suffix(file_path):
+    """Return the compression suffix of ``file_path``, e.g. ``".gz"``, or None for an uncompressed file."""
+    suffix = os.path.splitext(file_path or "")[1].lower()
+    return suffix if suffix in COMPRESSED_SUFFIXES else None
+
+
+def uncompressed_path(file_path):
+    """Return ``file_path`` without its compression suffix, e.g. to pick a syntax for ``notes.md.gz``."""
+    return file_path[: -len(compression_suffix(file_path))] if compression_suffix(file_path) else file_path
+
+
+def open_reader(file, file_path):
+    """Wrap the binary ``file`` so reads return decompressed bytes when ``file_path`` is compressed.
+
+    Decompression is streamed, so only the data being read is held in memory.
+    """
+    suffix = compression_suffix(file_path)
+    if suffix == ".gz":
+        return gzip.GzipFile(fileobj=file, mode="rb")
+    if suffix == ".bz2":
+        return bz2.BZ2File(file, "rb")
+    if suffix == ".xz":
+        return lzma.LZMAFile(file, "rb")
+    return file
+
+
+def open_writer(file, file_path):
+    """Wrap the binary ``file`` so writes are compressed in the format of ``file_path``.
+
+    Closing the wrapper finishes the compressed stream but leaves ``file`` open.
+    """
+    suffix = compression_suffix(file_path)
+    if suffix == ".gz":
+        name = os.path.basename(uncompressed_path(file_path))
+        return gzip.GzipFile(filename=name, mode="wb", compresslevel=GZIP_LEVEL, fileobj=file)
+    if suffix == ".bz2":
+        return bz2.BZ2File(file, "wb")
+    if suffix == ".xz":
+        return lzma.LZMAFile(file, "wb")
+    return file
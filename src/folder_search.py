@@ -0,0 +1,143 @@
+import fnmatch
+import mmap
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from PySide6.QtCore import QThread, Signal
+
+MAX_MATCHES_PER_FILE = 1000
+MAX_FILES_IN_FLIGHT = 64
+# Files whose first block contains a NUL byte are treated as binary and skipped.
+BINARY_SNIFF_SIZE = 8192
+
+
+def iter_files(root, glob="*"):
+    """Yield paths below ``root`` whose file name matches ``glob``, skipping hidden directories."""
+    patterns = [pattern.strip() for pattern in glob.split(";") if pattern.strip()] or ["*"]
+    for directory, subdirectories, file_names in os.walk(root):
+        subdirectories[:] = [name for name in subdirectories if not name.startswith(".")]
+        for name in file_names:
+            if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                yield os.path.join(directory, name)
+
+
+def search_file(path, query, regex=False, case_sensitive=False):
+    """Scan one memory-mapped file and return ``(path, size, [(line_number, line_text), ...])``.
+
+    Runs in a pool process, so it only takes and returns picklable values.
+    """
+    try:
+        size = os.path.getsize(path)
+        if size == 0:
+            return path, 0, []
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if b"\0" in buffer[:BINARY_SNIFF_SIZE]:
+                return path, size, []
+            return path, size, _scan(buffer, query, regex, case_sensitive)
+    except (OSError, ValueError):
+        return path, 0, []
+
+
+def _scan(buffer, query, regex, case_sensitive):
+    """Return up to MAX_MATCHES_PER_FILE matching lines, at most one entry per line."""
+    if regex or not case_sensitive:
+        needle = query.encode("utf-8") if regex else re.escape(query.encode("utf-8"))
+        pattern = re.compile(needle, re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE)
+        positions = (match.start() for match in pattern.finditer(buffer) if match.end() > match.start())
+    else:
+        positions = _find_all(buffer, query.encode("utf-8"))
+
+    results = []
+    line_number = 1
+    counted_to = 0
+    line_end = -1
+    for position in positions:
+        if position < line_end:
+            continue
+        line_number += buffer[counted_to:position].count(b"\n")
+        counted_to = position
+        line_start = buffer.rfind(b"\n", 0, position) + 1
+        line_end = buffer.find(b"\n", position)
+        if line_end < 0:
+            line_end = len(buffer)
+        text = buffer[line_start:line_end].decode("utf-8", errors="replace").rstrip("\r")
+        results.append((line_number, text))
+        if len(results) >= MAX_MATCHES_PER_FILE:
+            break
+    return results
+
+
+def _find_all(buffer, needle):
+    position = buffer.find(needle)
+    while position >= 0:
+        yield position
+        position = buffer.find(needle, position + len(needle))
+
+
+def create_pool():
+    """Create the process pool used for folder searches.
+
+    Workers are spawned rather than forked, since forking a process that already
+    runs Qt threads is unsafe.
+    """
+    return ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+
+
+class FolderSearch(QThread):
+    """Walks a directory and fans file scans out to a process pool, streaming results back."""
+
+    file_matched = Signal(str, list)
+    progress = Signal(int, int, float)
+
+    def __init__(self, pool, root, glob, query, regex=False, case_sensitive=False, file_filter=None, parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.root = root
+        self.glob = glob
+        self.query = query
+        self.regex = regex
+        self.case_sensitive = case_sensitive
+        # Optional callable narrowing the walked paths, e.g. with a trigram index.
+        self.file_filter = file_filter
+        self.error = ""
+
+    def run(self):
+        """Submit files as the walk finds them, keeping a bounded number in flight."""
+        start = time.perf_counter()
+        files_done = 0
+        bytes_done = 0
+        pending = set()
+        try:
+            if self.regex:
+                re.compile(self.query.encode("utf-8"))
+            files = iter_files(self.root, self.glob)
+            if self.file_filter is not None:
+                files = iter(self.file_filter(files))
+            exhausted = False
+            while not self.isInterruptionRequested():
+                while not exhausted and len(pending) < MAX_FILES_IN_FLIGHT:
+                    path = next(files, None)
+                    if path is None:
+                        exhausted = True
+                        break
+                    pending.add(self.pool.submit(search_file, path, self.query, self.regex, self.case_sensitive))
+                if not pending:
+                    break
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, size, matches = future.result()
+                    files_done += 1
+                    bytes_done += size
+                    if matches:
+                        self.file_matched.emit(path, matches)
+                if done:
+                    self.progress.emit(files_done, bytes_done, time.perf_counter() - start)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            for future in pending:
+                future.cancel()
+            self.progress.emit(files_done, bytes_done, time.perf_counter() - start)
@@ -0,0 +1,201 @@
+import functools
+import os
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QDockWidget,
+    QFileDialog,
+    QHBoxLayout,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
+
+from folder_search import FolderSearch, create_pool
+from trigram_index import TrigramIndexer, default_index_path, filter_candidates
+
+
+class FolderSearchPanel(QDockWidget):
+    """Dock listing matches from a multi-process search across a folder."""
+
+    MAX_RESULTS = 10000
+
+    def __init__(self, parent):
+        super().__init__("Find in Folder", parent)
+        self.index_path = default_index_path()
+        self._pool = None
+        self._search = None
+        self._indexer = None
+        self._result_count = 0
+        self._setup_widgets()
+        self.setVisible(False)
+
+    def _setup_widgets(self):
+        """Create the folder, filter and query fields and the result list."""
+        self.folder_field = QLineEdit(os.getcwd())
+        browse_button = QPushButton("Browse…")
+        browse_button.clicked.connect(self._browse)
+        self.glob_field = QLineEdit("*")
+        self.glob_field.setToolTip("File name patterns, separated by ';'")
+        self.query_field = QLineEdit()
+        self.query_field.setPlaceholderText("Find in folder")
+        self.query_field.returnPressed.connect(self.start_search)
+        self.regex_option = QCheckBox("Regex")
+        self.case_option = QCheckBox("Match case")
+        self.index_option = QCheckBox("Use index")
+        self.index_option.setToolTip("Keep a trigram index of the folder to skip files that cannot match")
+        self.search_button = QPushButton("Search")
+        self.search_button.clicked.connect(self._toggle_search)
+        self.results = QListWidget()
+        self.results.itemActivated.connect(self._open_result)
+        self.results.itemClicked.connect(self._open_result)
+
+        options = QHBoxLayout()
+        for widget in (
+            self.folder_field,
+            browse_button,
+            self.glob_field,
+            self.query_field,
+            self.regex_option,
+            self.case_option,
+            self.index_option,
+            self.search_button,
+        ):
+            options.addWidget(widget)
+        layout = QVBoxLayout()
+        layout.addLayout(options)
+        layout.addWidget(self.results)
+        container = QWidget()
+        container.setLayout(layout)
+        self.setWidget(container)
+
+    def show_panel(self):
+        """Show the dock and focus the query field."""
+        self.setVisible(True)
+        self.query_field.setFocus()
+        self.query_field.selectAll()
+
+    def _browse(self):
+        folder = QFileDialog.getExistingDirectory(self, "Find in Folder", self.folder_field.text())
+        if folder:
+            self.folder_field.setText(folder)
+
+    def _toggle_search(self):
+        if self._search is not None:
+            self.cancel_search()
+        else:
+            self.start_search()
+
+    def start_search(self):
+        """Start scanning the folder, replacing any previous results."""
+        self.cancel_search()
+        self.results.clear()
+        self._result_count = 0
+        if not self.query_field.text() or not os.path.isdir(self.folder_field.text()):
+            return
+        if self._pool is None:
+            self._pool = create_pool()
+        file_filter = None
+        if self.index_option.isChecked():
+            file_filter = functools.partial(
+                filter_candidates, self.index_path, self.query_field.text(), self.regex_option.isChecked()
+            )
+        search = FolderSearch(
+            self._pool,
+            self.folder_field.text(),
+            self.glob_field.text(),
+            self.query_field.text(),
+            regex=self.regex_option.isChecked(),
+            case_sensitive=self.case_option.isChecked(),
+            file_filter=file_filter,
+            parent=self,
+        )
+        search.file_matched.connect(self._add_results)
+        search.progress.connect(self._show_progress)
+        search.finished.connect(self._search_finished)
+        search.finished.connect(search.deleteLater)
+        self._search = search
+        self.search_button.setText("Cancel")
+        search.start()
+
+    def cancel_search(self):
+        """Stop the running search, keeping the results found so far."""
+        if self._search is not None:
+            self._search.requestInterruption()
+            self._search.wait()
+
+    def update_index(self):
+        """Index new and changed files of the current folder in the background."""
+        if self._indexer is not None or not os.path.isdir(self.folder_field.text()):
+            return
+        if self._pool is None:
+            self._pool = create_pool()
+        indexer = TrigramIndexer(self._pool, self.index_path, self.folder_field.text(), self.glob_field.text(), self)
+        indexer.progress.connect(self._show_index_progress)
+        indexer.finished.connect(self._index_finished)
+        indexer.finished.connect(indexer.deleteLater)
+        self._indexer = indexer
+        indexer.start()
+
+    def _show_index_progress(self, files_done, bytes_done, elapsed):
+        elapsed = max(elapsed, 1e-6)
+        self.parent().statusBar().showMessage(
+            f"Indexing: {files_done} files, {bytes_done / elapsed / (1024 * 1024):.1f} MB/s", 5000
+        )
+
+    def _index_finished(self):
+        if self.sender() is self._indexer:
+            if self._indexer.error:
+                self.parent().statusBar().showMessage(f"Indexing failed: {self._indexer.error}", 5000)
+            self._indexer = None
+
+    def shutdown(self):
+        """Stop searching and indexing and tear down the process pool."""
+        self.cancel_search()
+        if self._indexer is not None:
+            self._indexer.requestInterruption()
+            self._indexer.wait()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _add_results(self, path, matches):
+        """Append one file's matching lines to the result list."""
+        if self.sender() is not self._search or self._result_count >= self.MAX_RESULTS:
+            return
+        for line_number, text in matches[: self.MAX_RESULTS - self._result_count]:
+            item = QListWidgetItem(f"{path}:{line_number}: {text.strip()}")
+            item.setData(Qt.ItemDataRole.UserRole, (path, line_number))
+            self.results.addItem(item)
+        self._result_count += len(matches)
+
+    def _show_progress(self, files_done, bytes_done, elapsed):
+        """Report scan throughput in the status bar."""
+        elapsed = max(elapsed, 1e-6)
+        self.parent().statusBar().showMessage(
+            f"Find in Folder: {files_done} files, {self._result_count} matches, "
+            f"{files_done / elapsed:.0f} files/s, {bytes_done / elapsed / (1024 * 1024):.1f} MB/s"
+        )
+
+    def _search_finished(self):
+        search = self.sender()
+        if search is not self._search:
+            return
+        self._search = None
+        self.search_button.setText("Search")
+        if search.error:
+            self.parent().statusBar().showMessage(f"Find in Folder: {search.error}", 5000)
+        elif self.index_option.isChecked():
+            self.update_index()
+
+    def _open_result(self, item):
+        """Open the file of a result at its line."""
+        path, line_number = item.data(Qt.ItemDataRole.UserRole)
+        try:
+            self.parent().open_file(path, line_number)
+        except Exception as e:
+            self.parent().statusBar().showMessage(f"Error opening file: {str(e)}", 5000)
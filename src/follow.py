@@ -0,0 +1,138 @@
+import codecs
+import os
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+import tracing
+
+# Changes are read at most this often, so a fast writer costs one document insert per interval.
+READ_INTERVAL_MS = 50
+# How often the file is polled when change notifications are unavailable, and as a safety net when they are.
+POLL_INTERVAL_MS = 250
+WATCHED_POLL_INTERVAL_MS = 2000
+# Bytes appended to the document at once; a backlog is read in slices of this size, yielding to the
+# event loop between them so that input and painting are not held up by a fast writer.
+MAX_READ_SIZE = 256 * 1024
+
+
+class FileFollower(QObject):
+    """Follows a growing file from byte ``offset`` and emits the text appended to it, like ``tail -F``.
+
+    Changes are noticed through QFileSystemWatcher, with a polling timer for file
+    systems that do not report them, and are read at most once per
+    ``READ_INTERVAL_MS`` from where the last read stopped. When the file is
+    truncated, or replaced by a new file as logs are rotated, ``reset`` is emitted
+    and the file is followed again from its start; what was appended to a rotated
+    file before it was replaced is read first.
+    """
+
+    appended = Signal(str)
+    reset = Signal()
+    failed = Signal(str)
+
+    def __init__(self, file_path, offset, encoding="utf-8", parent=None):
+        super().__init__(parent)
+        self.file_path = os.path.abspath(file_path)
+        self.encoding = encoding
+        self._file = None
+        self._open(offset)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._schedule_read)
+        self._watcher.directoryChanged.connect(self._schedule_read)
+        self._read_timer = QTimer(self)
+        self._read_timer.setSingleShot(True)
+        self._read_timer.timeout.connect(self._read)
+        self._poll_timer = QTimer(self)
+        self._poll_timer.timeout.connect(self._schedule_read)
+        self._watch()
+        self._poll_timer.start()
+        # Catch up with anything appended since the document was read.
+        self._schedule_read()
+
+    def offset(self):
+        """Return the byte offset up to which the file's text has been emitted, to follow it again from there."""
+        # Bytes of a character cut by the last read, and a line break held back, have not been emitted yet.
+        pending = len(self._decoder.getstate()[0])
+        if self._pending_cr:
+            pending += self._cr_size
+        return self._file.tell() - pending
+
+    def close(self):
+        """Stop following and release the file."""
+        self._read_timer.stop()
+        self._poll_timer.stop()
+        paths = self._watcher.files() + self._watcher.directories()
+        if paths:
+            self._watcher.removePaths(paths)
+        self._file.close()
+
+    def _open(self, offset):
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.file_path, "rb")
+        self._file.seek(offset)
+        stat = os.fstat(self._file.fileno())
+        self._identity = (stat.st_dev, stat.st_ino)
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        self._pending_cr = False
+        encoder = codecs.getincrementalencoder(self.encoding)()
+        # The first call writes any BOM, which is not part of a line break.
+        encoder.encode("")
+        self._cr_size = len(encoder.encode("\r"))
+
+    def _watch(self):
+        """Watch the file, which the watcher forgets once it is replaced, and its directory for its return."""
+        watching = self.file_path in self._watcher.files()
+        if not watching and os.path.exists(self.file_path):
+            watching = self._watcher.addPath(self.file_path)
+        directory = os.path.dirname(self.file_path)
+        if directory not in self._watcher.directories():
+            self._watcher.addPath(directory)
+        self._poll_timer.setInterval(WATCHED_POLL_INTERVAL_MS if watching else POLL_INTERVAL_MS)
+
+    def _schedule_read(self):
+        if not self._read_timer.isActive():
+            self._read_timer.start(READ_INTERVAL_MS)
+
+    @tracing.traced("follow file", "io")
+    def _read(self):
+        """Emit what was appended since the last read, then switch files if the followed one was replaced."""
+        try:
+            if os.fstat(self._file.fileno()).st_size < self._file.tell():
+                self._restart()
+                return
+            data = self._file.read(MAX_READ_SIZE)
+            self._emit(data)
+            if len(data) == MAX_READ_SIZE:
+                self._read_timer.start(0)
+                return
+            try:
+                stat = os.stat(self.file_path)
+            except FileNotFoundError:
+                # Rotated away and not created again yet; keep reading the old file meanwhile.
+                return
+            if (stat.st_dev, stat.st_ino) != self._identity:
+                self._emit(b"", final=True)
+                self._restart()
+            else:
+                self._watch()
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def _restart(self):
+        self._open(0)
+        self._watch()
+        self.reset.emit()
+        self._schedule_read()
+
+    def _emit(self, data, final=False):
+        text = self._decoder.decode(data, final)
+        if self._pending_cr:
+            text = "\r" + text
+        # Hold back a trailing CR until the next read shows whether an LF follows it.
+        self._pending_cr = not final and text.endswith("\r")
+        if self._pending_cr:
+            text = text[:-1]
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        if text:
+            self.appended.emit(text)
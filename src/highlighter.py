@@ -0,0 +1,293 @@
+import bisect
+import builtins
+import heapq
+import keyword
+import os
+import re
+import time
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtGui import QColor, QFont, QTextCharFormat, QTextLayout
+
+import tracing
+from compression import uncompressed_path
+from piece_table import astral_offsets
+
+# Synchronous highlighting done in response to one edit; the rest is deferred to idle time.
+KEYSTROKE_BUDGET_MS = 2.0
+# Length of each background slice, kept below a frame so scrolling and typing stay smooth.
+IDLE_SLICE_MS = 8.0
+
+# Block user state used for blocks that have not been tokenized since they last changed.
+UNHIGHLIGHTED = -1
+
+
+def _format(color, bold=False, italic=False):
+    char_format = QTextCharFormat()
+    char_format.setForeground(QColor(color))
+    if bold:
+        char_format.setFontWeight(QFont.Weight.Bold)
+    if italic:
+        char_format.setFontItalic(True)
+    return char_format
+
+
+FORMATS = {
+    "keyword": _format("#0000c0", bold=True),
+    "builtin": _format("#7a3e9d"),
+    "definition": _format("#005f87", bold=True),
+    "decorator": _format("#aa5d00"),
+    "string": _format("#008000"),
+    "comment": _format("#808080", italic=True),
+    "number": _format("#b5400d"),
+    "heading": _format("#00008b", bold=True),
+    "strong": _format("#000000", bold=True),
+    "emphasis": _format("#000000", italic=True),
+    "code": _format("#a0522d"),
+    "link": _format("#0645ad"),
+    "quote": _format("#606060", italic=True),
+    "list": _format("#b5400d", bold=True),
+}
+
+
+class PythonLexer:
+    """Line-at-a-time Python tokenizer; the state tracks open triple-quoted strings."""
+
+    NORMAL, SINGLE_TRIPLE, DOUBLE_TRIPLE = 0, 1, 2
+    _TRIPLE_QUOTES = {SINGLE_TRIPLE: "'''", DOUBLE_TRIPLE: '"""'}
+    _PATTERN = re.compile(
+        r"(?P<comment>#.*)"
+        r"|(?P<triple>[rRbBuUfF]{0,2}(?:'''|\"\"\"))"
+        r"|(?P<string>[rRbBuUfF]{0,2}(?:'[^'\\\n]*(?:\\.[^'\\\n]*)*'?|\"[^\"\\\n]*(?:\\.[^\"\\\n]*)*\"?))"
+        r"|(?P<decorator>^\s*@[\w.]+)"
+        r"|\b(?:def|class)\s+(?P<definition>\w+)"
+        r"|(?P<number>\b(?:0[xXoObB][\da-fA-F_]+|\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?j?)\b)"
+        r"|(?P<word>\b[A-Za-z_]\w*\b)"
+    )
+    _KEYWORDS = frozenset(keyword.kwlist + keyword.softkwlist)
+    _BUILTINS = frozenset(name for name in dir(builtins) if not name.startswith("_"))
+
+    def tokenize(self, text, state):
+        """Return ``([(start, length, kind), ...], end_state)`` for one line."""
+        tokens = []
+        position = 0
+        if state != self.NORMAL:
+            position, state = self._close_triple(text, 0, state, tokens)
+            if state != self.NORMAL:
+                return tokens, state
+        for match in self._PATTERN.finditer(text, position):
+            if match.start() < position:
+                continue
+            kind = match.lastgroup
+            if kind == "triple":
+                quote_state = self.SINGLE_TRIPLE if match.group().endswith("'''") else self.DOUBLE_TRIPLE
+                position, state = self._close_triple(text, match.start(), quote_state, tokens, match.end())
+                if state != self.NORMAL:
+                    return tokens, state
+                continue
+            if kind == "definition":
+                # Highlight the def/class keyword as well as the name it defines.
+                tokens.append((match.start(), match.start("definition") - match.start(), "keyword"))
+                tokens.append((match.start("definition"), len(match.group("definition")), "definition"))
+            elif kind == "word":
+                word = match.group()
+                if word in self._KEYWORDS:
+                    tokens.append((match.start(), len(word), "keyword"))
+                elif word in self._BUILTINS:
+                    tokens.append((match.start(), len(word), "builtin"))
+            else:
+                tokens.append((match.start(), match.end() - match.start(), kind))
+            position = match.end()
+        return tokens, self.NORMAL
+
+    def _close_triple(self, text, start, state, tokens, search_from=None):
+        """Emit a triple-quoted string token starting at ``start`` and report where it ends."""
+        end = text.find(self._TRIPLE_QUOTES[state], start if search_from is None else search_from)
+        if end < 0:
+            tokens.append((start, len(text) - start, "string"))
+            return len(text), state
+        end += 3
+        tokens.append((start, end - start, "string"))
+        return end, self.NORMAL
+
+
+class MarkdownLexer:
+    """Line-at-a-time Markdown tokenizer; the state tracks open fenced code blocks."""
+
+    NORMAL, FENCED = 0, 1
+    _FENCE = re.compile(r"^\s*(```|~~~)")
+    _BLOCK_PATTERNS = (
+        (re.compile(r"^#{1,6}\s.*"), "heading"),
+        (re.compile(r"^\s*>.*"), "quote"),
+        (re.compile(r"^\s*(?:[-*+]|\d+\.)\s"), "list"),
+    )
+    _INLINE = re.compile(
+        r"(?P<code>`[^`]+`)"
+        r"|(?P<strong>\*\*[^*]+\*\*|__[^_]+__)"
+        r"|(?P<emphasis>\*[^*\s][^*]*\*|\b_[^_\s][^_]*_\b)"
+        r"|(?P<link>\[[^\]]*\]\([^)]*\))"
+    )
+
+    def tokenize(self, text, state):
+        """Return ``([(start, length, kind), ...], end_state)`` for one line."""
+        if self._FENCE.match(text):
+            return [(0, len(text), "code")], self.NORMAL if state == self.FENCED else self.FENCED
+        if state == self.FENCED:
+            return [(0, len(text), "code")], state
+        tokens = []
+        for pattern, kind in self._BLOCK_PATTERNS:
+            match = pattern.match(text)
+            if match:
+                tokens.append((0, match.end(), kind))
+                break
+        tokens.extend((m.start(), m.end() - m.start(), m.lastgroup) for m in self._INLINE.finditer(text))
+        return tokens, self.NORMAL
+
+
+LEXERS = {
+    ".py": PythonLexer,
+    ".pyw": PythonLexer,
+    ".md": MarkdownLexer,
+    ".markdown": MarkdownLexer,
+}
+
+
+def lexer_for_path(file_path):
+    """Return a lexer instance for the file's extension, or None for plain text."""
+    lexer_class = LEXERS.get(os.path.splitext(uncompressed_path(file_path or ""))[1].lower())
+    return lexer_class() if lexer_class else None
+
+
+class Highlighter(QObject):
+    """Incremental syntax highlighter with a per-edit time budget and a background pass.
+
+    Each block stores the lexer state at its end in its user state. After an edit
+    the changed blocks are re-tokenized immediately, continuing downward only
+    while the end state differs from what was stored, and never for longer than
+    ``KEYSTROKE_BUDGET_MS``. Work left over is recorded as resume points that an
+    idle timer processes in ``IDLE_SLICE_MS`` slices, which is also how whole
+    documents are highlighted after loading.
+    """
+
+    def __init__(self, document, parent=None):
+        super().__init__(parent)
+        self._document = document
+        self._lexer = None
+        self._resume_points = []
+        self._block_count = document.blockCount()
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setInterval(0)
+        self._idle_timer.timeout.connect(self._run_idle_slice)
+        document.contentsChange.connect(self._on_contents_change)
+
+    @property
+    def lexer(self):
+        """The active lexer, or None when highlighting is off."""
+        return self._lexer
+
+    @property
+    def pending(self):
+        """Whether background highlighting work is outstanding."""
+        return bool(self._resume_points)
+
+    def set_lexer(self, lexer):
+        """Switch languages and re-highlight the whole document in the background."""
+        if lexer is None and self._lexer is None:
+            return
+        self._lexer = lexer
+        block = self._document.begin()
+        while block.isValid():
+            block.setUserState(UNHIGHLIGHTED)
+            block = block.next()
+        self._resume_points = [0]
+        self._idle_timer.start()
+
+    @tracing.traced("contentsChange: highlight", "highlight")
+    def _on_contents_change(self, position, chars_removed, chars_added):
+        """Shift pending resume points past the edit and re-highlight the edited blocks."""
+        first = self._document.findBlock(position)
+        first_number = first.blockNumber()
+        block_delta = self._document.blockCount() - self._block_count
+        self._block_count = self._document.blockCount()
+        if block_delta:
+            self._resume_points = [
+                point if point <= first_number else max(first_number, point + block_delta)
+                for point in self._resume_points
+            ]
+            heapq.heapify(self._resume_points)
+        if self._lexer is None:
+            return
+
+        last_number = self._document.findBlock(position + chars_added).blockNumber()
+        if last_number < 0:
+            last_number = self._document.blockCount() - 1
+
+        block = first
+        while block.isValid() and block.blockNumber() <= last_number:
+            block.setUserState(UNHIGHLIGHTED)
+            block = block.next()
+        self._highlight_from(first_number, KEYSTROKE_BUDGET_MS)
+
+    @tracing.traced("highlight idle slice", "highlight")
+    def _run_idle_slice(self):
+        """Continue from the earliest resume point for one background slice."""
+        if not self._resume_points:
+            self._idle_timer.stop()
+            return
+        self._highlight_from(heapq.heappop(self._resume_points), IDLE_SLICE_MS)
+
+    def _highlight_from(self, block_number, budget_ms):
+        """Tokenize forward from a block until states converge or the budget runs out."""
+        deadline = time.perf_counter() + budget_ms / 1000
+        block = self._document.findBlockByNumber(block_number)
+        previous = block.previous()
+        state = previous.userState() if previous.isValid() else 0
+        if state == UNHIGHLIGHTED:
+            # The block above is itself pending; resume from there once it is reached.
+            heapq.heappush(self._resume_points, block_number)
+            self._idle_timer.start()
+            return
+        dirty_start = dirty_end = None
+        while block.isValid():
+            old_state = block.userState()
+            state, reformatted = self._highlight_block(block, state)
+            if reformatted:
+                dirty_start = block.position() if dirty_start is None else dirty_start
+                dirty_end = block.position() + block.length()
+            block = block.next()
+            if old_state == state and (not block.isValid() or block.userState() != UNHIGHLIGHTED):
+                break
+            if time.perf_counter() > deadline and block.isValid():
+                heapq.heappush(self._resume_points, block.blockNumber())
+                self._idle_timer.start()
+                break
+        if dirty_start is not None:
+            # One relayout for the whole run; markContentsDirty does not emit contentsChange.
+            self._document.markContentsDirty(dirty_start, dirty_end - dirty_start)
+
+    def _highlight_block(self, block, state):
+        """Apply formats to one block; return its end state and whether its formats changed."""
+        layout = block.layout()
+        ranges = []
+        if self._lexer is not None:
+            text = block.text()
+            tokens, state = self._lexer.tokenize(text, max(0, state))
+            # Tokens index the str, while format ranges count UTF-16 units, two for each non-BMP character.
+            wide = astral_offsets(text)
+            for start, length, kind in tokens:
+                end = start + length
+                if wide:
+                    start += bisect.bisect_left(wide, start)
+                    end += bisect.bisect_left(wide, end)
+                format_range = QTextLayout.FormatRange()
+                format_range.start = start
+                format_range.length = end - start
+                format_range.format = FORMATS[kind]
+                ranges.append(format_range)
+        else:
+            state = 0
+        block.setUserState(state)
+        if ranges or layout.formats():
+            layout.setFormats(ranges)
+            return state, True
+        return state, False
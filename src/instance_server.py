@@ -0,0 +1,64 @@
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+from single_instance import decode_request, server_name
+
+# Requests larger than this are dropped instead of buffered.
+MAX_REQUEST_SIZE = 1024 * 1024
+
+
+class InstanceServer(QObject):
+    """Local socket server through which later launches hand their files to this editor."""
+
+    files_received = Signal(list, dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._server = QLocalServer(self)
+        self._server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self._server.newConnection.connect(self._accept_connections)
+
+    def listen(self):
+        """Start listening, replacing a socket left behind by an editor that crashed.
+
+        Returns False if another editor is still listening, or if there is no private
+        directory for the socket.
+        """
+        try:
+            name = server_name()
+        except OSError:
+            return False
+        if self._server.listen(name):
+            return True
+        probe = QLocalSocket()
+        probe.connectToServer(name)
+        if probe.waitForConnected(100):
+            probe.abort()
+            return False
+        QLocalServer.removeServer(name)
+        return self._server.listen(name)
+
+    def close(self):
+        """Stop listening and remove the socket."""
+        self._server.close()
+
+    def _accept_connections(self):
+        while self._server.hasPendingConnections():
+            connection = self._server.nextPendingConnection()
+            connection.readyRead.connect(lambda connection=connection: self._read_request(connection))
+            connection.disconnected.connect(connection.deleteLater)
+
+    def _read_request(self, connection):
+        """Handle a request once its terminating newline has arrived."""
+        if not connection.canReadLine():
+            if connection.bytesAvailable() > MAX_REQUEST_SIZE:
+                connection.abort()
+            return
+        try:
+            files, options = decode_request(bytes(connection.readLine()))
+        except ValueError:
+            connection.abort()
+            return
+        connection.write(b"ok\n")
+        connection.disconnectFromServer()
+        self.files_received.emit(files, options)
@@ -0,0 +1,279 @@
+import os
+import queue
+import struct
+import time
+import uuid
+import zlib
+
+from PySide6.QtCore import QLockFile, QThread, Signal
+
+from app_paths import data_directory
+import tracing
+
+JOURNAL_VERSION = 1
+JOURNAL_SUFFIX = ".journal"
+# Edits collected before one write and fsync per journal; a crash loses at most this much typing.
+BATCH_INTERVAL = 0.25
+
+# magic, version, size and mtime_ns of the file the edits apply to; the encoding and
+# the path follow as length-prefixed UTF-8.
+_HEADER = struct.Struct("<4sBQQ")
+_STRING = struct.Struct("<I")
+# position, characters removed, bytes of inserted UTF-8 text; the text and a CRC32 follow.
+_RECORD = struct.Struct("<III")
+_CHECKSUM = struct.Struct("<I")
+_MAGIC = b"GTEJ"
+
+
+def default_journal_directory():
+    """Return where edit journals live in the user's application data directory."""
+    return os.path.join(data_directory(), "journal")
+
+
+def file_fingerprint(file_path):
+    """Return ``(size, mtime_ns)`` of a file, or ``(0, 0)`` for no file, to tell whether it changed."""
+    try:
+        stat = os.stat(file_path)
+    except (OSError, ValueError):
+        return 0, 0
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _encode_string(text):
+    data = text.encode("utf-8", "surrogatepass")
+    return _STRING.pack(len(data)) + data
+
+
+def encode_header(file_path, encoding, fingerprint):
+    """Return the journal header describing the saved file the edits apply to."""
+    return _HEADER.pack(_MAGIC, JOURNAL_VERSION, *fingerprint) + _encode_string(encoding) + _encode_string(file_path)
+
+
+def encode_record(position, chars_removed, text):
+    """Return one edit as a checksummed record."""
+    data = text.encode("utf-8", "surrogatepass")
+    record = _RECORD.pack(position, chars_removed, len(data)) + data
+    return record + _CHECKSUM.pack(zlib.crc32(record))
+
+
+def read_journal(journal_path):
+    """Return ``(header, edits)`` of a journal, or None if it has no valid header.
+
+    ``header`` is ``{"path", "encoding", "fingerprint"}`` and ``edits`` is a list of
+    ``(position, chars_removed, text)``. Reading stops at the first torn or corrupt
+    record, i.e. the end of the last batch that reached the disk.
+    """
+    try:
+        with open(journal_path, "rb") as file:
+            data = file.read()
+        magic, version, size, mtime_ns = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != JOURNAL_VERSION:
+            return None
+        offset = _HEADER.size
+        strings = []
+        for _ in range(2):
+            (length,) = _STRING.unpack_from(data, offset)
+            offset += _STRING.size
+            strings.append(data[offset : offset + length].decode("utf-8", "surrogatepass"))
+            offset += length
+    except (OSError, struct.error, UnicodeDecodeError):
+        return None
+    encoding, file_path = strings
+    edits = []
+    while offset + _RECORD.size + _CHECKSUM.size <= len(data):
+        position, chars_removed, length = _RECORD.unpack_from(data, offset)
+        end = offset + _RECORD.size + length
+        if end + _CHECKSUM.size > len(data):
+            break
+        (checksum,) = _CHECKSUM.unpack_from(data, end)
+        if checksum != zlib.crc32(data[offset:end]):
+            break
+        edits.append((position, chars_removed, data[offset + _RECORD.size : end].decode("utf-8", "surrogatepass")))
+        offset = end + _CHECKSUM.size
+    return {"path": file_path, "encoding": encoding, "fingerprint": (size, mtime_ns)}, edits
+
+
+class JournalWriter(QThread):
+    """Worker thread that applies journal writes in order, fsyncing each touched journal once per batch."""
+
+    failed = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._queue = queue.SimpleQueue()
+
+    def append(self, journal_path, header, data):
+        """Append records, writing ``header`` first if the journal does not exist yet."""
+        self._queue.put(("append", journal_path, header, data))
+
+    def rewrite(self, journal_path, data):
+        """Replace a journal's whole contents."""
+        self._queue.put(("rewrite", journal_path, data))
+
+    def remove(self, journal_path):
+        """Delete a journal."""
+        self._queue.put(("remove", journal_path))
+
+    def stop(self):
+        """Write everything queued so far and end the thread."""
+        self._queue.put(None)
+        self.wait()
+
+    def run(self):
+        """Collect commands for ``BATCH_INTERVAL`` and apply them as one batch."""
+        while True:
+            command = self._queue.get()
+            if command is not None:
+                time.sleep(BATCH_INTERVAL)
+            batch = [command]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in batch
+            try:
+                with tracing.span("journal batch", "io", commands=len(batch)):
+                    self._apply([command for command in batch if command is not None])
+            except Exception as e:
+                self.failed.emit(str(e))
+            if stopping:
+                return
+
+    @staticmethod
+    def _apply(commands):
+        files = {}
+        try:
+            for operation, journal_path, *payload in commands:
+                file = files.pop(journal_path, None)
+                if operation == "append":
+                    if file is None:
+                        file = open(journal_path, "ab")
+                    if file.tell() == 0:
+                        file.write(payload[0])
+                    file.write(payload[1])
+                    files[journal_path] = file
+                    continue
+                if file is not None:
+                    file.close()
+                if operation == "rewrite":
+                    with open(journal_path + ".tmp", "wb") as temp:
+                        temp.write(payload[0])
+                        temp.flush()
+                        os.fsync(temp.fileno())
+                    os.replace(journal_path + ".tmp", journal_path)
+                elif os.path.exists(journal_path):
+                    os.unlink(journal_path)
+        finally:
+            for file in files.values():
+                file.flush()
+                os.fsync(file.fileno())
+                file.close()
+
+
+class EditJournal:
+    """Append-only journal of one document's edits since it was last saved.
+
+    Each edit is queued to the JournalWriter as a record holding only the edited
+    range and the inserted text, so journaling costs O(edit size). After a save the
+    journal is rewritten to hold just the edits made while the save was running.
+    """
+
+    def __init__(self, writer, journal_path, file_path, encoding, fingerprint):
+        self.journal_path = journal_path
+        self._writer = writer
+        self._header = encode_header(file_path, encoding, fingerprint)
+        # Records made since the snapshot of a save in progress.
+        self._since_snapshot = None
+
+    def record(self, position, chars_removed, text):
+        """Journal one edit of the document."""
+        data = encode_record(position, chars_removed, text)
+        if self._since_snapshot is not None:
+            self._since_snapshot.append(data)
+        self._writer.append(self.journal_path, self._header, data)
+
+    def begin_save(self):
+        """Note that the document's current contents are being saved."""
+        self._since_snapshot = []
+
+    def finish_save(self, file_path, encoding, fingerprint):
+        """Restart the journal from the saved file, keeping edits made during the save."""
+        records, self._since_snapshot = self._since_snapshot or [], None
+        self._header = encode_header(file_path, encoding, fingerprint)
+        if records:
+            self._writer.rewrite(self.journal_path, self._header + b"".join(records))
+        else:
+            self._writer.remove(self.journal_path)
+
+    def cancel_save(self):
+        """Forget a save that failed or was cancelled."""
+        self._since_snapshot = None
+
+    def discard(self):
+        """Delete the journal, e.g. when the document is closed or matches the file on disk."""
+        self._since_snapshot = None
+        self._writer.remove(self.journal_path)
+
+
+class JournalDirectory:
+    """This process's directory of journals under ``root``, held with a lock file while running.
+
+    Directories whose lock is no longer held belong to editors that exited or crashed,
+    and their journals are taken over by ``recover``.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.directory = os.path.join(root, uuid.uuid4().hex)
+        os.makedirs(self.directory)
+        self._lock = QLockFile(os.path.join(self.directory, "lock"))
+        self._lock.tryLock(0)
+
+    def new_journal_path(self):
+        """Return a path for a new journal."""
+        return os.path.join(self.directory, uuid.uuid4().hex + JOURNAL_SUFFIX)
+
+    def recover(self):
+        """Move the journals of editors that are no longer running into this directory; return their paths."""
+        recovered = []
+        for name in os.listdir(self.root):
+            directory = os.path.join(self.root, name)
+            if directory == self.directory or not os.path.isdir(directory):
+                continue
+            lock = QLockFile(os.path.join(directory, "lock"))
+            if not lock.tryLock(0):
+                continue
+            try:
+                for journal in os.listdir(directory):
+                    if journal.endswith(JOURNAL_SUFFIX):
+                        recovered.append(os.path.join(self.directory, journal))
+                        os.replace(os.path.join(directory, journal), recovered[-1])
+            finally:
+                lock.unlock()
+            _remove_directory(directory)
+        return recovered
+
+    def set_aside(self, journal_path):
+        """Move a journal out of the way of future recovery, keeping it for the user; return its new path."""
+        path = os.path.join(self.root, os.path.basename(journal_path))
+        os.replace(journal_path, path)
+        return path
+
+    def close(self):
+        """Release the lock; the directory is removed unless journals are left for the next start."""
+        self._lock.unlock()
+        _remove_directory(self.directory)
+
+
+def _remove_directory(directory):
+    """Remove a journal directory if it holds nothing but leftover temp and lock files."""
+    try:
+        for name in os.listdir(directory):
+            if name.endswith(JOURNAL_SUFFIX):
+                return
+        for name in os.listdir(directory):
+            os.unlink(os.path.join(directory, name))
+        os.rmdir(directory)
+    except OSError:
+        pass
@@ -0,0 +1,198 @@
+import bisect
+import mmap
+import os
+import re
+from array import array
+
+from PySide6.QtCore import QThread, Signal
+
+import tracing
+from undo_history import utf16_length
+
+LARGE_FILE_THRESHOLD = 256 * 1024 * 1024
+INDEX_CHUNK_SIZE = 4 * 1024 * 1024
+SEARCH_CHUNK_SIZE = 4 * 1024 * 1024
+# A search stops collecting matches beyond this, so a common query cannot exhaust memory.
+MAX_SEARCH_MATCHES = 1_000_000
+
+
+class LineIndex(QThread):
+    """Background scan that records a sparse newline index for a memory-mapped file.
+
+    Only one checkpoint per chunk is stored: the byte offset of the chunk and the
+    number of the first line starting in it. Exact line offsets are resolved on
+    demand by scanning forward from the nearest checkpoint.
+    """
+
+    progress = Signal(int, int)
+
+    def __init__(self, buffer, parent=None):
+        super().__init__(parent)
+        self._buffer = buffer
+        self.chunk_offsets = array("q", [0])
+        self.chunk_first_lines = array("q", [0])
+        self.line_count = 1
+
+    @tracing.traced("index lines", "io")
+    def run(self):
+        """Count newlines chunk by chunk, publishing checkpoints as they are found."""
+        size = len(self._buffer)
+        lines = 0
+        offset = 0
+        while offset < size and not self.isInterruptionRequested():
+            end = min(offset + INDEX_CHUNK_SIZE, size)
+            lines += self._buffer[offset:end].count(b"\n")
+            offset = end
+            # Appending to both arrays before bumping line_count keeps readers on the GUI thread consistent.
+            self.chunk_offsets.append(offset)
+            self.chunk_first_lines.append(lines)
+            self.line_count = lines + 1
+            self.progress.emit(offset, size)
+
+
+class LargeFileModel:
+    """Read-only view of a memory-mapped file addressed by line number."""
+
+    def __init__(self, file_path, encoding="utf-8"):
+        self.file_path = file_path
+        self.encoding = encoding
+        self._file = open(file_path, "rb")
+        try:
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped.
+            self._buffer = b""
+        self.index = LineIndex(self._buffer)
+
+    @property
+    def line_count(self):
+        """Number of lines indexed so far."""
+        return self.index.line_count
+
+    def line_offset(self, line):
+        """Return the byte offset at which the given line starts."""
+        if line <= 0:
+            return 0
+        checkpoint = bisect.bisect_right(self.index.chunk_first_lines, line - 1) - 1
+        offset = self.index.chunk_offsets[checkpoint]
+        for _ in range(line - self.index.chunk_first_lines[checkpoint]):
+            offset = self._buffer.find(b"\n", offset) + 1
+            if offset == 0:
+                return len(self._buffer)
+        return offset
+
+    def text(self, first_line, count):
+        """Decode ``count`` lines starting at ``first_line``."""
+        start = self.line_offset(first_line)
+        end = self._buffer.find(b"\n", start)
+        for _ in range(count - 1):
+            if end < 0:
+                break
+            end = self._buffer.find(b"\n", end + 1)
+        if end < 0:
+            end = len(self._buffer)
+        text = self._buffer[start:end].decode(self.encoding, errors="replace").replace("\r\n", "\n")
+        return text[:-1] if text.endswith("\r") else text
+
+    def column(self, offset):
+        """Return the UTF-16 column of byte ``offset`` within its line, as the decoded line is shown."""
+        line_start = self._buffer.rfind(b"\n", 0, offset) + 1
+        return utf16_length(self._buffer[line_start:offset].decode(self.encoding, errors="replace"))
+
+    def line_breaks(self, start, end):
+        """Return the number of line breaks between byte offsets ``start`` and ``end``."""
+        return self._buffer[start:end].count(b"\n")
+
+    def close(self):
+        """Stop indexing and release the mapping."""
+        self.index.requestInterruption()
+        self.index.wait()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._file.close()
+
+
+class LargeFileSearch(QThread):
+    """Worker thread that scans a large file for a query and streams matches back as ``(start, end, line)``.
+
+    ``start`` and ``end`` are byte offsets and ``line`` is the 0-based line the match
+    starts on. The file is mapped again here, as folder searches do, so closing the
+    editor's mapping cannot pull it from under the scan. The query is encoded in the
+    file's encoding and matched against the raw bytes, so ignoring case only folds
+    ASCII letters. Chunks are cut at line ends, so a regex match can only span lines
+    inside one chunk. At most ``MAX_SEARCH_MATCHES`` matches are reported.
+    """
+
+    matches_found = Signal(list)
+
+    def __init__(self, file_path, query, encoding="utf-8", regex=False, case_sensitive=False, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.query = query
+        self.encoding = encoding
+        self.regex = regex
+        self.case_sensitive = case_sensitive
+        self.error = ""
+        # Set when the search stopped at MAX_SEARCH_MATCHES.
+        self.truncated = False
+
+    @tracing.traced("search large file", "io")
+    def run(self):
+        """Search chunk by chunk, emitting one batch of matches per chunk."""
+        try:
+            needle = self.query.encode(self.encoding)
+            pattern = None
+            if self.regex or not self.case_sensitive:
+                flags = re.MULTILINE if self.case_sensitive else re.MULTILINE | re.IGNORECASE
+                pattern = re.compile(needle if self.regex else re.escape(needle), flags)
+            with open(self.file_path, "rb") as file:
+                # Empty files cannot be mapped, and have nothing to find.
+                if os.fstat(file.fileno()).st_size:
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                        self._scan(buffer, needle, pattern)
+        except UnicodeEncodeError:
+            self.error = f"The query cannot be written in {self.encoding}"
+        except (re.error, OSError, ValueError) as e:
+            self.error = str(e)
+
+    def _scan(self, buffer, needle, pattern):
+        size = len(buffer)
+        count = 0
+        line = 0
+        counted_to = 0
+        start = 0
+        while start < size and not self.isInterruptionRequested():
+            end = min(start + SEARCH_CHUNK_SIZE, size)
+            if end < size:
+                # End the chunk after a line break, or after the end of a line longer than a chunk.
+                cut = buffer.rfind(b"\n", start, end) + 1
+                if cut <= start:
+                    cut = buffer.find(b"\n", end) + 1
+                end = cut or size
+            matches = []
+            for match_start, match_end in self._find(buffer, needle, pattern, start, end):
+                line += buffer[counted_to:match_start].count(b"\n")
+                counted_to = match_start
+                matches.append((match_start, match_end, line))
+            if count + len(matches) > MAX_SEARCH_MATCHES:
+                self.truncated = True
+                matches = matches[: MAX_SEARCH_MATCHES - count]
+            if matches:
+                count += len(matches)
+                self.matches_found.emit(matches)
+            if self.truncated:
+                return
+            start = end
+
+    @staticmethod
+    def _find(buffer, needle, pattern, start, end):
+        """Yield ``(start, end)`` of the non-empty matches between byte offsets ``start`` and ``end``."""
+        if pattern is None:
+            position = buffer.find(needle, start, end)
+            while position >= 0:
+                yield position, position + len(needle)
+                position = buffer.find(needle, position + len(needle), end)
+            return
+        for match in pattern.finditer(buffer, start, end):
+            if match.end() > match.start():
+                yield match.start(), match.end()
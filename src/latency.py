@@ -0,0 +1,103 @@
+import time
+from collections import deque
+
+from PySide6.QtCore import QEvent, QObject, QTimer, Signal
+
+# Keystrokes kept in the rolling histogram.
+SAMPLE_WINDOW = 500
+# Phases of one keystroke, each measured from the end of the previous one:
+# the key event and the document change with its contentsChange handlers, the
+# layout of the changed blocks, waiting for the event loop to paint, and painting
+# the viewport and line number area.
+PHASES = ("change", "layout", "wait", "paint", "total")
+
+
+def percentiles(samples):
+    """Return ``(p50, p95, p99)`` of the samples."""
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return tuple(ordered[min(last, int(len(ordered) * fraction))] for fraction in (0.5, 0.95, 0.99))
+
+
+class LatencyProbe(QObject):
+    """Measures keystroke-to-paint latency in one editor; nothing is hooked until ``attach``.
+
+    Only keystrokes that change the document are measured. A keystroke's frame ends
+    when control returns to the event loop after the first paint following the change.
+    """
+
+    updated = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._editor = None
+        self._pending = None
+        self.samples = {phase: deque(maxlen=SAMPLE_WINDOW) for phase in PHASES}
+
+    def attach(self, editor):
+        """Start measuring ``editor``, detaching from the previous one."""
+        self.detach()
+        self._editor = editor
+        self._pending = None
+        for widget in (editor, editor.viewport(), editor.line_number_area):
+            widget.installEventFilter(self)
+        document = editor.document()
+        document.contentsChange.connect(self._mark_change)
+        document.documentLayout().update.connect(self._mark_layout)
+        document.documentLayout().updateBlock.connect(self._mark_layout)
+
+    def detach(self):
+        """Stop measuring the current editor."""
+        editor, self._editor = self._editor, None
+        self._pending = None
+        if editor is None:
+            return
+        for widget in (editor, editor.viewport(), editor.line_number_area):
+            widget.removeEventFilter(self)
+        document = editor.document()
+        document.contentsChange.disconnect(self._mark_change)
+        document.documentLayout().update.disconnect(self._mark_layout)
+        document.documentLayout().updateBlock.disconnect(self._mark_layout)
+
+    def statistics(self):
+        """Return ``{phase: (p50, p95, p99)}`` in milliseconds for phases with samples."""
+        return {phase: percentiles(samples) for phase, samples in self.samples.items() if samples}
+
+    def eventFilter(self, watched, event):
+        event_type = event.type()
+        if event_type == QEvent.Type.KeyPress:
+            if watched is self._editor and self._pending is None:
+                self._pending = {"key": time.perf_counter()}
+        elif event_type == QEvent.Type.Paint and self._pending is not None and "paint" not in self._pending:
+            if "change" not in self._pending:
+                # A paint that shows no edit, e.g. the cursor blinking after a navigation key.
+                self._pending = None
+            else:
+                self._pending["paint"] = time.perf_counter()
+                # Fires once the current paint, and any other paint of the same frame, is done.
+                QTimer.singleShot(0, self._finish_frame)
+        return False
+
+    def _mark_change(self):
+        if self._pending is not None and "change" not in self._pending:
+            self._pending["change"] = time.perf_counter()
+
+    def _mark_layout(self):
+        if self._pending is not None and "change" in self._pending and "paint" not in self._pending:
+            self._pending["layout"] = time.perf_counter()
+
+    def _finish_frame(self):
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        end = time.perf_counter()
+        layout = pending.get("layout", pending["change"])
+        for phase, start, stop in (
+            ("change", pending["key"], pending["change"]),
+            ("layout", pending["change"], layout),
+            ("wait", layout, pending["paint"]),
+            ("paint", pending["paint"], end),
+            ("total", pending["key"], end),
+        ):
+            self.samples[phase].append((stop - start) * 1000)
+        self.updated.emit()
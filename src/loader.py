@@ -0,0 +1,82 @@
+import codecs
+import os
+
+from PySide6.QtCore import QSemaphore, QThread, Signal
+
+import tracing
+from compression import open_reader
+from undo_store import content_hash
+
+CHUNK_SIZE = 1024 * 1024
+MAX_CHUNKS_IN_FLIGHT = 4
+
+
+class FileLoader(QThread):
+    """Worker thread that reads a file in chunks and hands decoded text to the GUI thread.
+
+    Compressed files are decompressed as they are read; progress is reported in bytes of the file on disk.
+    """
+
+    chunk_read = Signal(str)
+    progress = Signal(int, int)
+    loaded = Signal()
+    failed = Signal(str)
+
+    def __init__(self, file_path, encoding="utf-8", chunk_size=CHUNK_SIZE, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        # Hash of the file's uncompressed bytes, set once the whole file has been read.
+        self.content_hash = None
+        # Bytes of the file on disk that were read, set along with ``content_hash``.
+        self.bytes_read = None
+        # Bounds how many decoded chunks can wait in the event queue, so a slow GUI
+        # thread throttles the reader instead of buffering the whole file in memory.
+        self._slots = QSemaphore(MAX_CHUNKS_IN_FLIGHT)
+
+    def chunk_consumed(self):
+        """Signal that the GUI thread has finished appending one chunk."""
+        self._slots.release()
+
+    def cancel(self):
+        """Ask the worker to stop after the current chunk."""
+        self.requestInterruption()
+        self._slots.release(MAX_CHUNKS_IN_FLIGHT)
+
+    @tracing.traced("load file", "io")
+    def run(self):
+        """Read, decode and emit the file one chunk at a time."""
+        try:
+            total = os.path.getsize(self.file_path)
+            decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+            digest = content_hash()
+            pending_cr = False
+            with open(self.file_path, "rb") as raw, open_reader(raw, self.file_path) as file:
+                while not self.isInterruptionRequested():
+                    with tracing.span("read chunk", "io"):
+                        data = file.read(self.chunk_size)
+                        final = not data
+                        text = decoder.decode(data, final=final)
+                        digest.update(data)
+                    done = raw.tell()
+                    if pending_cr:
+                        text = "\r" + text
+                    # Hold back a trailing CR so a CRLF split across chunks is not read as two line breaks.
+                    pending_cr = not final and text.endswith("\r")
+                    if pending_cr:
+                        text = text[:-1]
+                    text = text.replace("\r\n", "\n").replace("\r", "\n")
+                    if text:
+                        self._slots.acquire()
+                        if self.isInterruptionRequested():
+                            break
+                        self.chunk_read.emit(text)
+                    self.progress.emit(done, total)
+                    if final:
+                        self.content_hash = digest.digest()
+                        self.bytes_read = done
+                        self.loaded.emit()
+                        break
+        except Exception as e:
+            self.failed.emit(str(e))
@@ -1,9 +1,36 @@
+import bisect
+import functools
+import os
 import sys
+import time
+from array import array
+
+# Reported by --startup-profile; interpreter startup itself is not included.
+STARTED_AT = time.perf_counter()
+
+from command_line import parse_arguments
+from prefetch import prefetch_files
+from single_instance import hand_off
+
+if __name__ == "__main__":
+    _arguments = parse_arguments(sys.argv[1:])
+    # Hand the files to an editor that is already running before paying for the Qt imports below.
+    if not _arguments.new_instance and hand_off(_arguments.files, _arguments.readonly, _arguments.encoding):
+        sys.exit(0)
+    # Otherwise read them into the page cache while Qt is being imported.
+    prefetch_files(path for path, _ in _arguments.files)
+
 from PySide6.QtWidgets import (
     QApplication,
+    QCheckBox,
+    QHBoxLayout,
+    QLineEdit,
     QMainWindow,
+    QPlainTextEdit,
+    QPushButton,
     QTextEdit,
     QStatusBar,
+    QTabWidget,
     QFileDialog,
     QVBoxLayout,
     QWidget,
@@ -11,117 +38,1045 @@ from PySide6.QtWidgets import (
     QMenu,
     QMenuBar,
     QMessageBox,
+    QProgressBar,
+    QScrollBar,
+    QToolButton,
+)
+from PySide6.QtGui import QShortcut, QKeySequence, QPainter, QAction, QColor, QStaticText, QTextCharFormat, QTextCursor
+from PySide6.QtCore import Qt, QEvent, QPoint, QRect, QTimer, Signal
+
+from app_paths import APPLICATION_NAME
+from change_bus import ChangeBus
+from compression import COMPRESSED_SUFFIXES, compression_suffix
+from follow import FileFollower
+from highlighter import Highlighter, lexer_for_path
+from journal import (
+    EditJournal,
+    JournalDirectory,
+    JournalWriter,
+    default_journal_directory,
+    file_fingerprint,
+    read_journal,
+)
+from large_file import LARGE_FILE_THRESHOLD, LargeFileModel, LargeFileSearch
+from loader import FileLoader
+from piece_table import PieceTable
+from saver import FileSaver
+from search import TextSearch, compile_query
+from session import default_session_path, load_session, save_session
+from startup_profile import StartupProfile
+from text_format import detect_text_format, is_ascii_compatible
+import tracing
+from undo_history import DEFAULT_MEMORY_LIMIT as DEFAULT_UNDO_MEMORY_LIMIT, UndoHistory, utf16_length
+from undo_store import default_undo_directory, load_undo_history, save_undo_history, undo_file_path
+
+IMPORTED_AT = time.perf_counter()
+
+# Lines kept in the widget above and below the viewport while in large file mode.
+LARGE_FILE_MARGIN = 1000
+# Rough per-block cost of QTextDocument's block and layout bookkeeping, used for memory estimates.
+BLOCK_OVERHEAD = 96
+# Estimated memory all loaded documents may use before inactive ones are unloaded.
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024
+# Compressed files are opened and saved transparently, so the file dialogs offer them too.
+FILE_DIALOG_FILTER = ";;".join(
+    [
+        "Text Files (*.txt)",
+        f"Compressed Files ({' '.join('*' + suffix for suffix in COMPRESSED_SUFFIXES)})",
+        "All Files (*)",
+    ]
 )
-from PySide6.QtGui import QShortcut, QKeySequence, QPainter, QAction
-from PySide6.QtCore import Qt, QRect
+
+
+def _format_size(size):
+    return f"{size / (1024 * 1024):.1f} MB"
 
 
 class LineNumberArea(QWidget):
-    """Widget to display line numbers for the text editor."""
+    """Widget to display line numbers for the text editor.
+
+    Font metrics and the rendered text of each number are cached, painting is
+    clipped to the exposed rect, and edits only repaint rows whose number or
+    position actually changed.
+    """
+
+    MAX_CACHED_NUMBERS = 4096
 
     def __init__(self, editor):
         super().__init__(editor)
         self.text_editor = editor
+        self._number_cache = {}
+        # Maps the y position of each painted row to the line number drawn there.
+        self._painted_rows = {}
+        self.invalidate_cache()
+
+    def invalidate_cache(self):
+        """Drop cached metrics and rendered numbers, e.g. after a font change."""
+        metrics = self.text_editor.fontMetrics()
+        self._line_height = metrics.height()
+        self._digit_width = metrics.horizontalAdvance("9")
+        self._number_cache.clear()
+        self._painted_rows.clear()
         self.setFixedWidth(self._calculate_width())
+        self.update()
 
     def _calculate_width(self):
         """Calculate the width needed for line numbers based on maximum lines."""
-        digits = len(str(max(1, self.text_editor.document().blockCount())))
-        return 10 + digits * self.text_editor.fontMetrics().horizontalAdvance("9")
+        line_count = self.text_editor.document().blockCount() + self.text_editor.line_number_offset
+        if self.text_editor.large_file is not None:
+            line_count = self.text_editor.large_file.line_count
+        digits = len(str(max(1, line_count)))
+        return 10 + digits * self._digit_width
 
+    def _rows(self, rect_top, rect_bottom):
+        """Yield ``(line_number, top, height)`` for visible blocks overlapping the given span."""
+        editor = self.text_editor
+        block = editor.firstVisibleBlock()
+        line_number = block.blockNumber() + editor.line_number_offset + 1
+        top = editor.blockBoundingGeometry(block).translated(editor.contentOffset()).top()
+        while block.isValid() and top <= rect_bottom:
+            height = editor.blockBoundingRect(block).height()
+            if block.isVisible() and top + height >= rect_top:
+                yield line_number, int(top), height
+            block = block.next()
+            top += height
+            line_number += 1
+
+    def _static_text(self, line_number):
+        """Return the pre-laid-out glyph run for a line number."""
+        text = self._number_cache.get(line_number)
+        if text is None:
+            if len(self._number_cache) >= self.MAX_CACHED_NUMBERS:
+                self._number_cache.clear()
+            text = QStaticText(str(line_number))
+            text.setTextFormat(Qt.TextFormat.PlainText)
+            text.prepare(font=self.text_editor.font())
+            self._number_cache[line_number] = text
+        return text
+
+    @tracing.traced("paint line numbers", "paint")
     def paintEvent(self, event):
         """Paint the line numbers."""
         if not self.text_editor.show_line_numbers:
             return
 
+        rect = event.rect()
         painter = QPainter(self)
-        painter.fillRect(event.rect(), Qt.GlobalColor.lightGray)
-
-        block = self.text_editor.firstVisibleBlock()
-        block_number = block.blockNumber()
-        top = self.text_editor.blockBoundingGeometry(block).translated(self.text_editor.contentOffset()).top()
-        bottom = top + self.text_editor.blockBoundingRect(block).height()
-
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                number = str(block_number + 1)
-                painter.setPen(Qt.GlobalColor.black)
-                painter.drawText(
-                    0,
-                    int(top),
-                    self.width(),
-                    self.text_editor.fontMetrics().height(),
-                    Qt.AlignmentFlag.AlignLeft,
-                    number,
-                )
+        painter.fillRect(rect, Qt.GlobalColor.lightGray)
+        painter.setPen(Qt.GlobalColor.black)
+        painter.setFont(self.text_editor.font())
+        for line_number, top, _ in self._rows(rect.top(), rect.bottom()):
+            painter.drawStaticText(0, top, self._static_text(line_number))
+            self._painted_rows[top] = line_number
 
-            block = block.next()
-            top = bottom
-            bottom = top + self.text_editor.blockBoundingRect(block).height()
-            block_number += 1
+    def scroll_rows(self, dy):
+        """Scroll the painted rows along with the viewport, repainting only the exposed strip."""
+        # Rows scrolled out of the gutter are dropped, so the map never outgrows one screen of rows.
+        height = self.height()
+        self._painted_rows = {
+            top + dy: number for top, number in self._painted_rows.items() if -self._line_height < top + dy < height
+        }
+        self.scroll(0, dy)
+
+    def update_rows(self, rect_top, rect_bottom):
+        """Repaint the rows within the span whose line number or position changed since the last paint."""
+        dirty_top = dirty_bottom = None
+        for line_number, top, height in self._rows(rect_top, rect_bottom):
+            if self._painted_rows.get(top) != line_number:
+                dirty_top = top if dirty_top is None else dirty_top
+                dirty_bottom = top + height
+        if dirty_top is not None:
+            self.update(0, dirty_top, self.width(), int(dirty_bottom - dirty_top) + 1)
 
     def update_width(self):
         """Update the width of the line number area."""
-        self.setFixedWidth(self._calculate_width())
+        width = self._calculate_width()
+        if width != self.width():
+            self.setFixedWidth(width)
+            self._painted_rows.clear()
+            self.update()
 
 
-class TextEditor(QTextEdit):
-    """Custom text editor widget with line number support."""
+class TextEditor(QPlainTextEdit):
+    """Plain text editor widget with line number support.
+
+    Built on QPlainTextEdit so that layout happens per block as blocks become
+    visible, instead of laying out the whole document as QTextEdit does.
+    """
 
     def __init__(self):
         super().__init__()
         self.current_file_path = ""
         self.show_line_numbers = True
-        self.setUndoRedoEnabled(True)
+        self.read_only = False
+        self.large_file = None
+        # 0-based line to show in large file mode once the line index reaches it.
+        self._pending_large_file_line = None
+        self.line_number_offset = 0
+        self.text_model = PieceTable()
+        # EditJournal recording every edit for crash recovery, if any.
+        self.journal = None
+        self.history = UndoHistory()
+        # Set while a file is streamed in, when the editor stays read-only whatever ``setReadOnly`` asked for.
+        self._loading = False
+        self._requested_read_only = False
+        # Set while appending loaded or followed text, which is not an edit.
+        self._appending = False
+        self._bulk_editing = False
+        # Undo is handled by ``history``; Qt's own stack would keep a second copy of every edit.
+        self.setUndoRedoEnabled(False)
         self.line_number_area = LineNumberArea(self)
-        self.document().blockCountChanged.connect(self.line_number_area.update_width)
-        self.textChanged.connect(self.line_number_area.update)
-        self.verticalScrollBar().valueChanged.connect(self.line_number_area.update)
+        self.large_file_scroll_bar = QScrollBar(Qt.Orientation.Vertical, self)
+        self.large_file_scroll_bar.setVisible(False)
+        self.large_file_scroll_bar.valueChanged.connect(self._scroll_large_file_to)
+        self.large_file_scroll_bar.actionTriggered.connect(self._drop_pending_large_file_line)
+        self.blockCountChanged.connect(self._update_line_number_width)
+        self.updateRequest.connect(self._update_line_number_area)
+        self.verticalScrollBar().valueChanged.connect(self._sync_large_file_window)
+        self.document().contentsChange.connect(self._mirror_contents_change)
+        self.document().modificationChanged.connect(self._mark_history_clean)
+        self.change_bus = ChangeBus(self.document(), self)
+        self.highlighter = Highlighter(self.document(), self)
         self.update_margins()
 
     def update_margins(self):
         """Update the left margin based on line number visibility."""
-        if self.show_line_numbers:
-            self.setViewportMargins(self.line_number_area.width(), 0, 0, 0)
-        else:
-            self.setViewportMargins(0, 0, 0, 0)
+        left = self.line_number_area.width() if self.show_line_numbers else 0
+        right = self.large_file_scroll_bar.sizeHint().width() if self.large_file is not None else 0
+        self.setViewportMargins(left, 0, right, 0)
         self.line_number_area.setVisible(self.show_line_numbers)
 
+    @tracing.traced("blockCountChanged: line number width", "signal")
+    def _update_line_number_width(self):
+        """Resize the line number area when the number of digits changes."""
+        width = self.line_number_area.width()
+        self.line_number_area.update_width()
+        if self.line_number_area.width() != width:
+            self.update_margins()
+
+    @tracing.traced("updateRequest: line number area", "signal")
+    def _update_line_number_area(self, rect, dy):
+        """Scroll or repaint the line number area along with the viewport."""
+        if dy:
+            self.line_number_area.scroll_rows(dy)
+        else:
+            self.line_number_area.update_rows(rect.top(), rect.bottom())
+
+    @tracing.traced("paint viewport", "paint")
+    def paintEvent(self, event):
+        """Paint the visible blocks."""
+        super().paintEvent(event)
+
+    def keyPressEvent(self, event):
+        """Route the undo and redo shortcuts to the editor's own history."""
+        if event.matches(QKeySequence.StandardKey.Undo):
+            self.undo()
+        elif event.matches(QKeySequence.StandardKey.Redo):
+            self.redo()
+        else:
+            super().keyPressEvent(event)
+
+    def contextMenuEvent(self, event):
+        """Show the standard context menu with its Undo and Redo entries using the editor's history."""
+        menu = self.createStandardContextMenu(event.pos())
+        for action in menu.actions():
+            if action.objectName() in ("edit-undo", "edit-redo"):
+                undo = action.objectName() == "edit-undo"
+                action.triggered.disconnect()
+                action.triggered.connect(self.undo if undo else self.redo)
+                available = self.history.can_undo() if undo else self.history.can_redo()
+                action.setEnabled(available and not self.isReadOnly())
+        menu.exec(event.globalPos())
+        menu.deleteLater()
+
+    def changeEvent(self, event):
+        """Refresh cached gutter metrics when the editor font changes."""
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.FontChange:
+            self.line_number_area.invalidate_cache()
+            self.update_margins()
+
     def toggle_line_numbers(self):
         """Toggle the visibility of line numbers."""
         self.show_line_numbers = not self.show_line_numbers
         self.update_margins()
         self.line_number_area.update()
 
+    def go_to_line(self, line):
+        """Move the cursor to the start of a 1-based line and center it in the view.
+
+        In large file mode a line the index has not reached yet is shown once it has.
+        """
+        if self.large_file is not None:
+            self._pending_large_file_line = line - 1
+            self._go_to_pending_large_file_line()
+            return
+        block = self.document().findBlockByNumber(line - 1)
+        if block.isValid():
+            self.setTextCursor(QTextCursor(block))
+            self.centerCursor()
+
+    def update_language(self):
+        """Pick the syntax highlighting lexer matching the current file's extension."""
+        lexer = lexer_for_path(self.current_file_path)
+        if type(lexer) is not type(self.highlighter.lexer):
+            self.highlighter.set_lexer(lexer)
+
+    def memory_usage(self):
+        """Estimate the bytes held by the document, its block bookkeeping and the piece table."""
+        document = self.document()
+        # QTextDocument stores text as UTF-16.
+        usage = document.characterCount() * 2 + document.blockCount() * BLOCK_OVERHEAD
+        usage += self.history.memory_usage()
+        return usage + sum(sys.getsizeof(buffer) for buffer in self.text_model.buffers)
+
+    @tracing.traced("contentsChange: mirror to piece table", "document")
+    def _mirror_contents_change(self, position, chars_removed, chars_added):
+        """Apply a document edit to the piece table, copying only the inserted characters.
+
+        Qt reports UTF-16 positions; the piece table converts them to string indices.
+        """
+        if self._appending or self._bulk_editing or self.large_file is not None:
+            return
+        # The document counts one trailing paragraph separator that plain text does not have.
+        length = self.document().characterCount() - 1
+        chars_removed = max(0, min(chars_removed, self.text_model.utf16_length() - position))
+        chars_added = max(0, min(chars_added, length - position))
+        cursor = QTextCursor(self.document())
+        cursor.setPosition(position)
+        cursor.setPosition(position + chars_added, QTextCursor.MoveMode.KeepAnchor)
+        text = cursor.selectedText().replace("\u2029", "\n").replace("\u2028", "\n")
+        start = self.text_model.from_utf16(position)
+        end = self.text_model.from_utf16(position + chars_removed)
+        removed = self.text_model.text(start, end) if end > start else ""
+        self.text_model.replace(start, end - start, text)
+        self.history.record(position, removed, text)
+        if self.journal is not None:
+            self.journal.record(position, chars_removed, text)
+
+    @tracing.traced("replace ranges", "document")
+    def replace_ranges(self, replacements):
+        """Apply sorted ``(start, end, text)`` replacements, in UTF-16 positions, as a single undo step.
+
+        Document edits go from the end backwards so earlier positions stay valid; the
+        piece table is updated in one linear pass rather than re-reading the combined
+        range from the document.
+        """
+        model = self.text_model
+        indices = [(model.from_utf16(start), model.from_utf16(end), text) for start, end, text in replacements]
+        cursor = QTextCursor(self.document())
+        self.history.begin_group()
+        self._bulk_editing = True
+        cursor.beginEditBlock()
+        try:
+            for (start, end, text), (first, last, _) in zip(reversed(replacements), reversed(indices)):
+                self.history.record(start, model.text(first, last), text)
+                cursor.setPosition(start)
+                cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+                cursor.insertText(text)
+        finally:
+            cursor.endEditBlock()
+            self._bulk_editing = False
+            self.history.end_group()
+        model.replace_ranges(indices)
+        if self.journal is not None:
+            for start, end, text in reversed(replacements):
+                self.journal.record(start, end - start, text)
+
+    def replay_edits(self, edits):
+        """Apply journaled ``(position, chars_removed, text)`` edits in order as one undo step."""
+        self._apply_edits(edits)
+
+    def undo(self):
+        """Revert the latest step of the undo history."""
+        if self.isReadOnly():
+            return
+        deltas = self.history.undo()
+        if deltas is not None:
+            edits = [(position, utf16_length(inserted), removed) for position, removed, inserted in reversed(deltas)]
+            self._apply_history(edits)
+
+    def redo(self):
+        """Reapply the latest undone step."""
+        if self.isReadOnly():
+            return
+        deltas = self.history.redo()
+        if deltas is not None:
+            self._apply_history([(position, utf16_length(removed), inserted) for position, removed, inserted in deltas])
+
+    def _apply_history(self, edits):
+        """Apply an undo or redo step, leaving the cursor after it and the document modified unless back at the save."""
+        cursor = self._apply_edits(edits, record_history=False)
+        self.setTextCursor(cursor)
+        self.ensureCursorVisible()
+        self.document().setModified(not self.history.is_clean())
+
+    def _apply_edits(self, edits, record_history=True):
+        """Apply ``(position, chars_removed, text)`` edits in order, as one undo step if recorded.
+
+        The piece table, journal and history are updated per edit rather than from the
+        one combined contentsChange the edit block delivers. Returns the cursor, placed
+        after the last edit.
+        """
+        cursor = QTextCursor(self.document())
+        if record_history:
+            self.history.begin_group()
+        self._bulk_editing = True
+        cursor.beginEditBlock()
+        try:
+            for position, chars_removed, text in edits:
+                end = self.document().characterCount() - 1
+                position = min(position, end)
+                chars_removed = min(chars_removed, end - position)
+                start = self.text_model.from_utf16(position)
+                stop = self.text_model.from_utf16(position + chars_removed)
+                if record_history:
+                    self.history.record(position, self.text_model.text(start, stop), text)
+                cursor.setPosition(position)
+                cursor.setPosition(position + chars_removed, QTextCursor.MoveMode.KeepAnchor)
+                cursor.insertText(text)
+                self.text_model.replace(start, stop - start, text)
+                if self.journal is not None:
+                    self.journal.record(position, chars_removed, text)
+        finally:
+            cursor.endEditBlock()
+            self._bulk_editing = False
+            if record_history:
+                self.history.end_group()
+        return cursor
+
+    def _mark_history_clean(self, modified):
+        if not modified:
+            self.history.mark_clean()
+
+    def setReadOnly(self, read_only):
+        """Allow or prevent editing; while a file is being loaded the editor stays read-only until it is done."""
+        self._requested_read_only = read_only
+        super().setReadOnly(read_only or self._loading)
+
+    def begin_loading(self):
+        """Clear the editor before a file is streamed into it; it can be scrolled but not edited meanwhile."""
+        self._loading = True
+        super().setReadOnly(True)
+        self.clear()
+        self.text_model = PieceTable()
+        self.history.clear()
+        # Appended chunks would otherwise carry a cursor sitting at the end of the text along with them.
+        self._set_keep_cursor_on_insert(True)
+
+    @tracing.traced("append chunk", "document")
+    def append_chunk(self, text):
+        """Append a chunk of loaded text without moving the user's cursor, selection or scroll position."""
+        anchor, position = self.textCursor().anchor(), self.textCursor().position()
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        self._appending = True
+        try:
+            cursor.insertText(text)
+        finally:
+            self._appending = False
+        self.text_model.append_original(text)
+        if self.textCursor().anchor() != anchor:
+            # Only the position is kept on insert; an anchor at the end moves along with the text, selecting it.
+            cursor = self.textCursor()
+            cursor.setPosition(anchor)
+            cursor.setPosition(position, QTextCursor.MoveMode.KeepAnchor)
+            self.setTextCursor(cursor)
+
+    def append_followed(self, text):
+        """Append text written to a followed file; like a loaded chunk, it is not an edit."""
+        self.append_chunk(text)
+        self.document().setModified(False)
+
+    def end_loading(self):
+        """Start tracking edits once the whole file has been appended."""
+        self._loading = False
+        super().setReadOnly(self._requested_read_only)
+        self._set_keep_cursor_on_insert(False)
+        self.document().setModified(False)
+        self.history.mark_clean()
+
+    def _set_keep_cursor_on_insert(self, keep):
+        cursor = self.textCursor()
+        cursor.setKeepPositionOnInsert(keep)
+        self.setTextCursor(cursor)
+
+    def open_large_file(self, model):
+        """Show a memory-mapped file read-only, keeping only a window of lines in the document."""
+        self.close_large_file()
+        self.large_file = model
+        self.setReadOnly(True)
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.large_file_scroll_bar.setVisible(True)
+        model.index.progress.connect(self._update_large_file_range)
+        model.index.finished.connect(self._go_to_pending_large_file_line)
+        self._update_large_file_range()
+        self.update_margins()
+        self._update_scroll_bar_geometry()
+        self._load_large_file_window(0)
+        model.index.start()
+
+    def close_large_file(self):
+        """Leave large file mode and release the mapped file."""
+        if self.large_file is None:
+            return
+        self.large_file.close()
+        self.large_file = None
+        self._pending_large_file_line = None
+        self.line_number_offset = 0
+        self.setReadOnly(self.read_only)
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.WidgetWidth)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.large_file_scroll_bar.setVisible(False)
+        self.clear()
+        self.text_model = PieceTable()
+        self.history.clear()
+        self.update_margins()
+
+    def large_file_line(self):
+        """Return the 0-based line shown at the top in large file mode, or the one waiting for the index."""
+        if self._pending_large_file_line is not None:
+            return self._pending_large_file_line
+        return self.large_file_scroll_bar.value()
+
+    def _update_large_file_range(self):
+        """Grow the external scroll bar as the line index is built."""
+        self.large_file_scroll_bar.setRange(0, max(0, self.large_file.line_count - 1))
+        self._update_line_number_width()
+        self._go_to_pending_large_file_line()
+
+    def _go_to_pending_large_file_line(self):
+        """Scroll to the requested line once it is indexed, or to the last line once indexing is done."""
+        line = self._pending_large_file_line
+        if line is None or self.large_file is None:
+            return
+        if line < self.large_file.line_count or self.large_file.index.isFinished():
+            self._pending_large_file_line = None
+            self.large_file_scroll_bar.setValue(line)
+
+    def _drop_pending_large_file_line(self):
+        """Forget a line still waiting for the index once the user scrolls elsewhere."""
+        self._pending_large_file_line = None
+
+    @tracing.traced("load large file window", "document")
+    def _load_large_file_window(self, line):
+        """Replace the document with the lines around ``line`` and scroll to it."""
+        start = max(0, line - LARGE_FILE_MARGIN)
+        visible = self.viewport().height() // max(1, self.fontMetrics().height()) + 1
+        self.line_number_offset = start
+        self.verticalScrollBar().blockSignals(True)
+        self.setPlainText(self.large_file.text(start, line - start + visible + LARGE_FILE_MARGIN))
+        self.verticalScrollBar().blockSignals(False)
+        self._scroll_to_window_line(line - start)
+
+    def _scroll_to_window_line(self, block_number):
+        """Scroll the internal view so the given block of the window is at the top."""
+        # Without wrapping, QPlainTextEdit's scroll bar counts blocks.
+        self.verticalScrollBar().setValue(block_number)
+
+    def _first_visible_window_line(self):
+        """Return the block number, within the window, at the top of the viewport."""
+        return self.firstVisibleBlock().blockNumber()
+
+    @tracing.traced("valueChanged: scroll large file", "signal")
+    def _scroll_large_file_to(self, line):
+        """Follow the external scroll bar, reloading the window when it leaves the loaded lines."""
+        if self.large_file is None:
+            return
+        window_line = line - self.line_number_offset
+        in_window = window_line < self.document().blockCount() - LARGE_FILE_MARGIN // 2 or self._window_reaches_end()
+        if window_line >= 0 and in_window:
+            self._scroll_to_window_line(window_line)
+        else:
+            self._load_large_file_window(line)
+
+    @tracing.traced("valueChanged: sync large file window", "signal")
+    def _sync_large_file_window(self):
+        """Mirror internal scrolling onto the external scroll bar and slide the window near its edges."""
+        if self.large_file is None:
+            return
+        window_line = self._first_visible_window_line()
+        line = self.line_number_offset + window_line
+        self.large_file_scroll_bar.blockSignals(True)
+        self.large_file_scroll_bar.setValue(line)
+        self.large_file_scroll_bar.blockSignals(False)
+        near_top = self.line_number_offset > 0 and window_line < LARGE_FILE_MARGIN // 2
+        near_bottom = (
+            not self._window_reaches_end() and window_line > self.document().blockCount() - LARGE_FILE_MARGIN // 2
+        )
+        if near_top or near_bottom:
+            self._load_large_file_window(line)
+
+    def _window_reaches_end(self):
+        """Return whether the loaded window already contains the last indexed line."""
+        return self.line_number_offset + self.document().blockCount() >= self.large_file.line_count
+
+    def _update_scroll_bar_geometry(self):
+        """Place the large file scroll bar along the right edge of the editor."""
+        cr = self.contentsRect()
+        width = self.large_file_scroll_bar.sizeHint().width()
+        self.large_file_scroll_bar.setGeometry(QRect(cr.right() - width + 1, cr.top(), width, cr.height()))
+
     def resizeEvent(self, event):
         """Adjust the line number area geometry when the editor is resized."""
         super().resizeEvent(event)
         cr = self.contentsRect()
         self.line_number_area.setGeometry(QRect(cr.left(), cr.top(), self.line_number_area.width(), cr.height()))
+        self._update_scroll_bar_geometry()
 
 
 class StatusBar(QStatusBar):
     """Custom status bar displaying file information."""
 
-    def __init__(self, text_editor):
+    cancel_requested = Signal()
+
+    def __init__(self):
         super().__init__()
-        self.file_label = QLabel(text_editor.current_file_path or "No file open")
+        self._text_editor = None
+        self.file_label = QLabel("No file open")
         self.addWidget(self.file_label)
 
-        text_editor.textChanged.connect(self._update_file_label)
+        self.memory_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setTextVisible(True)
+        self.cancel_button = QToolButton()
+        self.cancel_button.setText("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_requested)
+        self.latency_label = QLabel()
+        self.latency_label.setVisible(False)
+        self.addPermanentWidget(self.latency_label)
+        self.addPermanentWidget(self.memory_label)
+        self.addPermanentWidget(self.progress_bar)
+        self.addPermanentWidget(self.cancel_button)
+        self.clear_progress()
+
+    def set_text_editor(self, text_editor):
+        """Follow the file of another editor, e.g. after switching tabs."""
+        if self._text_editor is not None:
+            self._text_editor.change_bus.contents_changed.disconnect(self._update_file_label)
         self._text_editor = text_editor
+        text_editor.change_bus.contents_changed.connect(self._update_file_label)
+        self._update_file_label()
 
     def _update_file_label(self):
         """Update the file label when the current file changes."""
         self.file_label.setText(self._text_editor.current_file_path or "No file open")
 
+    def show_memory(self, current, usage, budget):
+        """Show the current tab's memory estimate and, as a tooltip, every loaded tab's."""
+        total = sum(size for _, size in usage)
+        self.memory_label.setText(f"Tab: {_format_size(current)} | All tabs: {_format_size(total)}")
+        lines = [f"{title}: {_format_size(size)}" for title, size in usage]
+        lines.append(f"Budget: {_format_size(budget)}")
+        self.memory_label.setToolTip("\n".join(lines))
+
+    def show_latency(self, statistics):
+        """Show keystroke-to-paint percentiles and, as a tooltip, the breakdown by phase."""
+        if "total" not in statistics:
+            return
+        p50, p95, p99 = statistics["total"]
+        self.latency_label.setText(f"Latency p50 {p50:.1f} | p95 {p95:.1f} | p99 {p99:.1f} ms")
+        lines = ["Keystroke to paint, p50 / p95 / p99 ms:"]
+        lines += [f"{phase}: {' / '.join(f'{value:.1f}' for value in values)}" for phase, values in statistics.items()]
+        self.latency_label.setToolTip("\n".join(lines))
+        self.latency_label.setVisible(True)
+
+    def clear_latency(self):
+        """Hide the latency readout."""
+        self.latency_label.setVisible(False)
+        self.latency_label.clear()
+
+    def show_progress(self, message, done, total):
+        """Show a cancellable progress indicator for a long-running operation."""
+        self.progress_bar.setFormat(f"{message} %p%")
+        # QProgressBar works on ints, so scale byte counts down to permille.
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setValue(int(done * 1000 / total) if total else 0)
+        self.progress_bar.setVisible(True)
+        self.cancel_button.setVisible(True)
+
+    def clear_progress(self):
+        """Hide the progress indicator."""
+        self.progress_bar.setVisible(False)
+        self.cancel_button.setVisible(False)
+
+
+class FindPanel(QWidget):
+    """Find/replace bar shown below the editor.
+
+    Searches run on a TextSearch worker over a piece-table snapshot; matches stream
+    in as sorted position arrays and only those inside the viewport are highlighted.
+    Editing the query or the document restarts the search, cancelling the old one.
+
+    Files above ``MainWindow.large_file_threshold`` (256 MB by default) open in
+    read-only large file mode. There a LargeFileSearch scans the mapped file instead,
+    and matches are kept as byte offsets with their line numbers, converted to
+    document positions only for the window of lines the editor holds. Replacing is
+    not available there; raise the threshold with ``--large-file-threshold`` to edit
+    such a file in memory, with Replace All still applied as one undo step.
+    """
+
+    MAX_HIGHLIGHTS = 1000
+    RESTART_DELAY_MS = 150
+
+    def __init__(self):
+        super().__init__()
+        self.text_editor = None
+        self._search = None
+        self._replace_search = None
+        self._replacements = []
+        self._replace_revision = None
+        self._clear_matches()
+        self._highlight_format = QTextCharFormat()
+        self._highlight_format.setBackground(QColor("#fff176"))
+        self._setup_widgets()
+
+        self._restart_timer = QTimer(self)
+        self._restart_timer.setSingleShot(True)
+        self._restart_timer.setInterval(self.RESTART_DELAY_MS)
+        self._restart_timer.timeout.connect(self._restart_search)
+        self.setVisible(False)
+
+    def set_text_editor(self, text_editor):
+        """Search another editor, e.g. after switching tabs, dropping the old editor's matches."""
+        if self.text_editor is not None:
+            self._cancel_search()
+            if self._replace_search is not None:
+                self._replace_search.requestInterruption()
+                self._replace_search = None
+                self.count_label.clear()
+            self.text_editor.setExtraSelections([])
+            self.text_editor.change_bus.contents_changed.disconnect(self._document_changed)
+            self.text_editor.verticalScrollBar().valueChanged.disconnect(self._refresh_highlights)
+        self._clear_matches()
+        self.text_editor = text_editor
+        text_editor.change_bus.contents_changed.connect(self._document_changed)
+        text_editor.verticalScrollBar().valueChanged.connect(self._refresh_highlights)
+        self._schedule_search()
+
+    def _clear_matches(self):
+        # Document positions of the matches; in large file mode, byte offsets and the lines they start on.
+        self._starts = array("q")
+        self._ends = array("q")
+        self._lines = array("q")
+        # In large file mode, the index of the match last selected and the selection made for it.
+        self._selected = None
+
+    def _document_changed(self):
+        """Search again after an edit; in large file mode the change is a new window of lines to highlight."""
+        if self.text_editor.large_file is not None:
+            self._refresh_highlights()
+        else:
+            self._schedule_search()
+
+    def _setup_widgets(self):
+        """Create the query fields, options and buttons."""
+        self.find_field = QLineEdit()
+        self.find_field.setPlaceholderText("Find")
+        self.find_field.textChanged.connect(self._schedule_search)
+        self.find_field.returnPressed.connect(self.find_next)
+        self.replace_field = QLineEdit()
+        self.replace_field.setPlaceholderText("Replace")
+        self.regex_option = QCheckBox("Regex")
+        self.regex_option.toggled.connect(self._schedule_search)
+        self.case_option = QCheckBox("Match case")
+        self.case_option.toggled.connect(self._schedule_search)
+        self.count_label = QLabel()
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.find_field)
+        layout.addWidget(self.replace_field)
+        layout.addWidget(self.regex_option)
+        layout.addWidget(self.case_option)
+        for name, handler in [
+            ("Previous", self.find_previous),
+            ("Next", self.find_next),
+            ("Replace", self.replace_current),
+            ("Replace All", self.replace_all),
+            ("Close", self.close_panel),
+        ]:
+            button = QPushButton(name)
+            button.clicked.connect(handler)
+            layout.addWidget(button)
+        layout.addWidget(self.count_label)
+        shortcut = QShortcut(QKeySequence("Escape"), self)
+        shortcut.setContext(Qt.ShortcutContext.WidgetWithChildrenShortcut)
+        shortcut.activated.connect(self.close_panel)
+
+    def show_find(self):
+        """Show the panel with the replace field hidden."""
+        self._show(replace=False)
+
+    def show_replace(self):
+        """Show the panel with the replace field."""
+        self._show(replace=True)
+
+    def _show(self, replace):
+        selected = self.text_editor.textCursor().selectedText()
+        if selected and "\u2029" not in selected:
+            self.find_field.setText(selected)
+        self.replace_field.setVisible(replace)
+        self.setVisible(True)
+        self.find_field.setFocus()
+        self.find_field.selectAll()
+        self._schedule_search()
+
+    def close_panel(self):
+        """Hide the panel, stop searching and clear highlights."""
+        self.setVisible(False)
+        self._cancel_search()
+        self._clear_matches()
+        self.text_editor.setExtraSelections([])
+        self.text_editor.setFocus()
+
+    def shutdown(self):
+        """Stop and wait for every search worker, e.g. before the window closes."""
+        self._cancel_search()
+        for worker in self.findChildren(TextSearch) + self.findChildren(LargeFileSearch):
+            worker.requestInterruption()
+            worker.wait()
+
+    def _schedule_search(self):
+        """Restart the search shortly, so bursts of typing start only one scan."""
+        if self.isVisible():
+            self._restart_timer.start()
+
+    def _cancel_search(self):
+        """Stop the running search; its late results are ignored."""
+        self._restart_timer.stop()
+        if self._search is not None:
+            self._search.requestInterruption()
+            self._search = None
+
+    def _start_worker(self, replacement=None):
+        """Start a TextSearch over a snapshot of the document."""
+        worker = TextSearch(
+            self.text_editor.text_model.snapshot(),
+            self.find_field.text(),
+            regex=self.regex_option.isChecked(),
+            case_sensitive=self.case_option.isChecked(),
+            replacement=replacement,
+            parent=self,
+        )
+        worker.finished.connect(worker.deleteLater)
+        return worker
+
+    def _restart_search(self):
+        """Cancel any running search and scan the document for the current query."""
+        self._cancel_search()
+        self._clear_matches()
+        self.text_editor.setExtraSelections([])
+        if not self.find_field.text():
+            self.count_label.clear()
+            return
+        large_file = self.text_editor.large_file
+        if large_file is not None:
+            search = LargeFileSearch(
+                large_file.file_path,
+                self.find_field.text(),
+                large_file.encoding,
+                regex=self.regex_option.isChecked(),
+                case_sensitive=self.case_option.isChecked(),
+                parent=self,
+            )
+            search.finished.connect(search.deleteLater)
+        else:
+            search = self._start_worker()
+        search.matches_found.connect(self._add_matches)
+        search.finished.connect(self._search_finished)
+        self._search = search
+        self.count_label.setText("Searching…")
+        search.start()
+
+    def _add_matches(self, matches):
+        """Append a batch of streamed matches and highlight any that are visible."""
+        if self.sender() is not self._search:
+            return
+        for start, end, line in matches:
+            self._starts.append(start)
+            self._ends.append(end)
+            if self.text_editor.large_file is not None:
+                self._lines.append(line)
+        self.count_label.setText(f"{len(self._starts)} matches…")
+        self._refresh_highlights()
+
+    def _search_finished(self):
+        """Report the final match count or the query error."""
+        search = self.sender()
+        if search is not self._search:
+            return
+        self._search = None
+        truncated = "+" if isinstance(search, LargeFileSearch) and search.truncated else ""
+        self.count_label.setText(search.error or f"{len(self._starts)}{truncated} matches")
+
+    @tracing.traced("valueChanged: refresh find highlights", "signal")
+    def _refresh_highlights(self):
+        """Highlight the matches that intersect the viewport."""
+        if not self._starts:
+            return
+        editor = self.text_editor
+        viewport = editor.viewport()
+        first_block = editor.firstVisibleBlock()
+        last_cursor = editor.cursorForPosition(QPoint(viewport.width(), viewport.height()))
+        if editor.large_file is not None:
+            begin = bisect.bisect_left(self._lines, editor.line_number_offset + first_block.blockNumber())
+            end = bisect.bisect_right(self._lines, editor.line_number_offset + last_cursor.blockNumber())
+        else:
+            begin = bisect.bisect_right(self._ends, first_block.position())
+            end = bisect.bisect_right(self._starts, last_cursor.position())
+        selections = []
+        for index in range(begin, min(end, begin + self.MAX_HIGHLIGHTS)):
+            start, stop = self._document_range(index)
+            if start < 0:
+                continue
+            selection = QTextEdit.ExtraSelection()
+            selection.cursor = QTextCursor(editor.document())
+            selection.cursor.setPosition(start)
+            selection.cursor.setPosition(stop, QTextCursor.MoveMode.KeepAnchor)
+            selection.format = self._highlight_format
+            selections.append(selection)
+        editor.setExtraSelections(selections)
+
+    def _document_range(self, index):
+        """Return the document positions of a match, or ``(-1, -1)`` if it is outside the large file window."""
+        large_file = self.text_editor.large_file
+        if large_file is None:
+            return self._starts[index], self._ends[index]
+        start, end, line = self._starts[index], self._ends[index], self._lines[index]
+        end_line = line + large_file.line_breaks(start, end)
+        document = self.text_editor.document()
+        first = document.findBlockByNumber(line - self.text_editor.line_number_offset)
+        last = document.findBlockByNumber(end_line - self.text_editor.line_number_offset)
+        if not first.isValid():
+            return -1, -1
+        position = first.position() + min(large_file.column(start), first.length() - 1)
+        if not last.isValid():
+            # The match runs past the window; highlight up to its end.
+            last = document.lastBlock()
+            return position, last.position() + last.length() - 1
+        # Clamped, as a ``\r`` the match may end after is not shown.
+        return position, last.position() + min(large_file.column(end), last.length() - 1)
+
+    def _select_match(self, index):
+        """Select the match at ``index`` in the editor, first bringing its line into view in large file mode."""
+        editor = self.text_editor
+        if editor.large_file is not None:
+            editor.go_to_line(self._lines[index] + 1)
+        start, end = self._document_range(index)
+        if start < 0:
+            # Its line is not indexed yet; go_to_line shows it once it is.
+            return
+        cursor = editor.textCursor()
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        editor.setTextCursor(cursor)
+        if editor.large_file is not None:
+            self._selected = (index, cursor.selectionStart(), cursor.selectionEnd())
+
+    def _match_index(self, after):
+        """Return the index of the first match starting after the selection start, or at it unless ``after``."""
+        cursor = self.text_editor.textCursor()
+        if self.text_editor.large_file is None:
+            search = bisect.bisect_right if after else bisect.bisect_left
+            return search(self._starts, cursor.selectionStart())
+        if self._selected is not None and self._selected[1:] == (cursor.selectionStart(), cursor.selectionEnd()):
+            # The matched line may not be in the window any more, so go on from the match itself.
+            return self._selected[0] + 1 if after else self._selected[0]
+        # Compare by line, then by column among the matches on the selection's line.
+        start = QTextCursor(self.text_editor.document())
+        start.setPosition(cursor.selectionStart())
+        line = self.text_editor.line_number_offset + start.blockNumber()
+        column = start.positionInBlock()
+        index = bisect.bisect_left(self._lines, line)
+        while index < len(self._lines) and self._lines[index] == line:
+            match_column = self.text_editor.large_file.column(self._starts[index])
+            if match_column > column or (match_column == column and not after):
+                break
+            index += 1
+        return index
+
+    def find_next(self):
+        """Select the first match after the current selection, wrapping around."""
+        if not self.isVisible():
+            self.show_find()
+            return
+        if self._starts:
+            index = self._match_index(after=True)
+            self._select_match(index if index < len(self._starts) else 0)
+
+    def find_previous(self):
+        """Select the last match before the current selection, wrapping around."""
+        if not self.isVisible():
+            self.show_find()
+            return
+        if self._starts:
+            index = self._match_index(after=False) - 1
+            self._select_match(index if index >= 0 else len(self._starts) - 1)
+
+    def replace_current(self):
+        """Replace the selected match and move to the next one."""
+        if self.text_editor.isReadOnly():
+            self.count_label.setText("Not available while the document is read-only or loading")
+            return
+        cursor = self.text_editor.textCursor()
+        index = bisect.bisect_left(self._starts, cursor.selectionStart())
+        if index < len(self._starts) and (self._starts[index], self._ends[index]) == (
+            cursor.selectionStart(),
+            cursor.selectionEnd(),
+        ):
+            replacement = self.replace_field.text()
+            if self.regex_option.isChecked():
+                pattern = compile_query(self.find_field.text(), True, self.case_option.isChecked())
+                match = pattern.fullmatch(cursor.selectedText().replace("\u2029", "\n"))
+                if match:
+                    replacement = match.expand(replacement)
+            cursor.insertText(replacement)
+        self.find_next()
+
+    def replace_all(self):
+        """Compute every replacement on a worker, then apply them as one undo step."""
+        if self.text_editor.large_file is not None:
+            # Only documents held in the piece table can be edited; see MainWindow.large_file_threshold.
+            self.count_label.setText("Not available in large file mode, which is read-only")
+            return
+        if self.text_editor.isReadOnly():
+            self.count_label.setText("Not available while the document is read-only or loading")
+            return
+        if not self.find_field.text() or self._replace_search is not None:
+            return
+        self._replacements = []
+        self._replace_revision = self.text_editor.document().revision()
+        search = self._start_worker(self.replace_field.text())
+        search.matches_found.connect(self._replacements.extend)
+        search.finished.connect(self._apply_replacements)
+        self._replace_search = search
+        self.count_label.setText("Replacing…")
+        search.start()
+
+    def _apply_replacements(self):
+        """Apply the collected replacements unless the document changed meanwhile."""
+        search = self._replace_search
+        if self.sender() is not search:
+            return
+        self._replace_search = None
+        replacements, self._replacements = self._replacements, []
+        if search.error:
+            self.count_label.setText(search.error)
+        elif self.text_editor.document().revision() != self._replace_revision:
+            self.count_label.setText("Document changed, Replace All cancelled")
+        else:
+            self.text_editor.replace_ranges(replacements)
+            self.count_label.setText(f"Replaced {len(replacements)} matches")
+
 
 class FileMenu(QMenu):
     """File menu containing file operations."""
 
-    def __init__(self, parent, text_editor):
+    def __init__(self, parent):
         super().__init__("File", parent)
-        self.text_editor = text_editor
         self._setup_actions()
 
     def _setup_actions(self):
@@ -130,6 +1085,8 @@ class FileMenu(QMenu):
             ("Open", "Ctrl+O", self._open_file),
             ("Save", "Ctrl+S", self._save_file),
             ("Save As", None, self._save_as_file),
+            ("Close Tab", "Ctrl+W", self._close_tab),
+            ("Follow File", None, self._toggle_follow),
         ]
 
         for name, shortcut, handler in actions:
@@ -142,12 +1099,9 @@ class FileMenu(QMenu):
     def _open_file(self):
         """Open a file and load its content."""
         try:
-            file_path, _ = QFileDialog.getOpenFileName(self.parent(), "Open File", "", "Text Files (*.txt)")
+            file_path, _ = QFileDialog.getOpenFileName(self.parent(), "Open File", "", FILE_DIALOG_FILTER)
             if file_path:
-                with open(file_path, "r", encoding="utf-8") as file:
-                    self.text_editor.setPlainText(file.read())
-                self.text_editor.current_file_path = file_path
-                self.parent().parent().statusBar().showMessage(f"Opened: {file_path}", 5000)
+                self.parent().parent().open_file(file_path)
         except Exception as e:
             self.parent().parent().statusBar().showMessage(f"Error opening file: {str(e)}", 5000)
 
@@ -159,35 +1113,90 @@ class FileMenu(QMenu):
         """Save file with a new name."""
         self.parent().parent()._save_as_file()
 
+    def _toggle_follow(self):
+        """Start or stop following the current file as it grows."""
+        self.parent().parent().toggle_follow()
+
+    def _close_tab(self):
+        """Close the current tab."""
+        main_window = self.parent().parent()
+        main_window.close_tab(main_window.tabs.currentIndex())
+
+
+class EditMenu(QMenu):
+    """Edit menu containing undo, redo, find and replace."""
+
+    def __init__(self, parent):
+        super().__init__("Edit", parent)
+        self._setup_actions()
+
+    def _setup_actions(self):
+        """Set up edit menu actions."""
+        # The panels are created on first use, so look them up only when an action fires.
+        main_window = self.parent().parent()
+        actions = [
+            ("Undo", QKeySequence.StandardKey.Undo, lambda: main_window.text_editor.undo()),
+            ("Redo", QKeySequence.StandardKey.Redo, lambda: main_window.text_editor.redo()),
+            ("Find", "Ctrl+F", lambda: main_window.find_panel.show_find()),
+            ("Find Next", "F3", lambda: main_window.find_panel.find_next()),
+            ("Find Previous", "Shift+F3", lambda: main_window.find_panel.find_previous()),
+            ("Replace", "Ctrl+H", lambda: main_window.find_panel.show_replace()),
+            ("Find in Folder", "Ctrl+Shift+F", lambda: main_window.folder_search_panel.show_panel()),
+        ]
+
+        for name, shortcut, handler in actions:
+            action = QAction(name, self)
+            action.setShortcut(QKeySequence(shortcut))
+            action.triggered.connect(handler)
+            self.addAction(action)
+
 
 class ViewMenu(QMenu):
     """View menu for toggling editor features."""
 
-    def __init__(self, parent, text_editor):
+    def __init__(self, parent):
         super().__init__("View", parent)
-        self.text_editor = text_editor
         self._setup_actions()
 
     def _setup_actions(self):
         """Set up view menu actions."""
+        main_window = self.parent().parent()
         toggle_line_numbers = QAction("Show Line Numbers", self, checkable=True)
-        toggle_line_numbers.setChecked(self.text_editor.show_line_numbers)
-        toggle_line_numbers.triggered.connect(self.text_editor.toggle_line_numbers)
+        toggle_line_numbers.setChecked(main_window.show_line_numbers)
+        toggle_line_numbers.triggered.connect(main_window.toggle_line_numbers)
         self.addAction(toggle_line_numbers)
 
+        toggle_latency = QAction("Show Typing Latency", self, checkable=True)
+        toggle_latency.triggered.connect(main_window.toggle_latency_probe)
+        self.addAction(toggle_latency)
+
+        self.addSeparator()
+        record_trace = QAction("Record Trace", self, checkable=True)
+        record_trace.setChecked(tracing.is_recording())
+        record_trace.triggered.connect(main_window.toggle_tracing)
+        self.addAction(record_trace)
+
+        export_trace = QAction("Export Trace...", self)
+        export_trace.triggered.connect(main_window.export_trace)
+        self.addAction(export_trace)
+
+        undo_statistics = QAction("Undo History Footprint...", self)
+        undo_statistics.triggered.connect(main_window.show_undo_statistics)
+        self.addAction(undo_statistics)
+
 
 class MenuBar(QMenuBar):
     """Custom menu bar for the application."""
 
-    def __init__(self, parent, text_editor):
+    def __init__(self, parent):
         super().__init__(parent)
-        self.text_editor = text_editor
         self._setup_menus()
 
     def _setup_menus(self):
         """Set up all menu items."""
-        self.addMenu(FileMenu(self, self.text_editor))
-        self.addMenu(ViewMenu(self, self.text_editor))
+        self.addMenu(FileMenu(self))
+        self.addMenu(EditMenu(self))
+        self.addMenu(ViewMenu(self))
         self.addMenu(self._create_about_menu())
 
     def _create_about_menu(self):
@@ -206,12 +1215,148 @@ class MenuBar(QMenuBar):
         )
 
 
+class DocumentTab(QWidget):
+    """Tab page for one document.
+
+    Until the tab is first activated, and again after it is unloaded, it holds only
+    metadata; ``editor`` is created when the document is loaded.
+    """
+
+    def __init__(self, file_path="", read_only=False, encoding=None):
+        super().__init__()
+        self.file_path = file_path
+        self.read_only = read_only
+        self.encoding = encoding or "utf-8"
+        # Without an explicit encoding it is detected from the file each time it is loaded.
+        self.detect_encoding = encoding is None
+        # Line break used when saving, detected along with the encoding.
+        self.newline = os.linesep
+        self.editor = None
+        self.loader = None
+        self.saver = None
+        self.journal = None
+        # ``(journal_path, header, edits)`` of unsaved changes recovered from a previous run, replayed once loaded.
+        self.recovery = None
+        # Fingerprint of the file as it was read, which journaled edits apply to.
+        self.base_fingerprint = (0, 0)
+        # Hash of the file's bytes as last read or written, which a saved undo history must match.
+        self.content_hash = None
+        # Bytes of the file the document was read from or saved to; following continues after them.
+        self.loaded_size = 0
+        # Set when loading was cancelled or failed, so the document holds only the start of the file.
+        self.partial = False
+        self.follower = None
+        self.pending_line = None
+        # Cursor position and scroll value to restore when an unloaded document is reloaded.
+        self.saved_position = None
+        self.last_used = 0
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    def title(self):
+        """Return the tab label: the file name, marked when modified."""
+        title = os.path.basename(self.file_path) or "Untitled"
+        if self.read_only:
+            title += " (read-only)"
+        if self.partial:
+            title += " (partial)"
+        if self.follower is not None:
+            title += " (following)"
+        if self.editor is not None and self.editor.document().isModified():
+            title += " *"
+        return title
+
+    def memory_usage(self):
+        """Estimate the memory held by the loaded document, 0 when unloaded."""
+        return self.editor.memory_usage() if self.editor is not None else 0
+
+    def can_unload(self):
+        """Whether the document can be dropped from memory and reloaded from disk later."""
+        return (
+            self.editor is not None
+            and self.loader is None
+            and self.saver is None
+            and self.follower is None
+            and not self.editor.document().isModified()
+            and os.path.isfile(self.file_path)
+        )
+
+    def position(self):
+        """Return ``(cursor, scroll)`` to restore later; in large file mode the scroll value is a line."""
+        if self.editor is None or self.saved_position is not None:
+            # Not loaded, or reloading and not yet back at the saved position.
+            return self.saved_position or (0, 0)
+        if self.editor.large_file is not None:
+            return 0, self.editor.large_file_line()
+        return self.editor.textCursor().position(), self.editor.verticalScrollBar().value()
+
+    def set_read_only(self, read_only):
+        """Allow or prevent editing, including after the editor leaves large file mode."""
+        self.read_only = read_only
+        if self.editor is not None:
+            self.editor.read_only = read_only
+            self.editor.setReadOnly(read_only or self.editor.large_file is not None or self.follower is not None)
+
+    def set_editor(self, editor):
+        """Show a newly created editor in the tab."""
+        self.editor = editor
+        self.set_read_only(self.read_only)
+        self.layout().addWidget(editor)
+
+    def unload(self):
+        """Drop the editor, remembering where the user was."""
+        self.saved_position = self.position()
+        if self.journal is not None:
+            # Documents are only unloaded when unmodified or being closed, so the journal is no longer needed.
+            self.journal.discard()
+            self.journal = None
+        editor, self.editor = self.editor, None
+        editor.close_large_file()
+        self.layout().removeWidget(editor)
+        editor.deleteLater()
+
+
 class MainWindow(QMainWindow):
-    """Main window for the text editor application."""
+    """Main window for the text editor application.
 
-    def __init__(self):
+    Each open file lives in a DocumentTab. Tabs are loaded when first activated,
+    and the least recently used unmodified tabs are unloaded whenever the
+    estimated memory of all loaded documents exceeds ``memory_budget``.
+
+    With a ``session_path``, the open documents, their positions and view settings
+    are written there shortly after each change and restored on the next start.
+    With a ``journal_directory``, every edit is journaled there until the document
+    is saved, and unsaved changes left by a crash or exit are replayed on the next start.
+    With an ``undo_directory``, the undo history of a document that matches its file is
+    kept there when the document is closed, and offered again when the same file is reopened.
+    Files larger than ``large_file_threshold`` bytes open read-only in large file mode.
+    """
+
+    large_file_threshold = LARGE_FILE_THRESHOLD
+    memory_budget = DEFAULT_MEMORY_BUDGET
+    undo_memory_limit = DEFAULT_UNDO_MEMORY_LIMIT
+    # Whether undo steps over the limit go to a temp file rather than being dropped.
+    undo_spill = True
+    SESSION_SAVE_DELAY_MS = 1000
+
+    def __init__(self, session_path=None, journal_directory=None, undo_directory=None, large_file_threshold=None):
         super().__init__()
-        self.text_editor = TextEditor()
+        if large_file_threshold is not None:
+            self.large_file_threshold = large_file_threshold
+        self.session_path = session_path
+        self.journal_directory = journal_directory
+        self.undo_directory = undo_directory
+        self._journals = None
+        self._journal_writer = None
+        self.show_line_numbers = True
+        self._activations = 0
+        self._find_panel = None
+        self._folder_search_panel = None
+        self._latency_probe = None
+        self._session_timer = QTimer(self)
+        self._session_timer.setSingleShot(True)
+        self._session_timer.setInterval(self.SESSION_SAVE_DELAY_MS)
+        self._session_timer.timeout.connect(self.write_session)
         self.init_ui()
 
     def init_ui(self):
@@ -220,8 +1365,13 @@ class MainWindow(QMainWindow):
         self.resize(QApplication.primaryScreen().size().width() - 20, QApplication.primaryScreen().size().height() - 75)
 
         # Set up layout
+        self.tabs = QTabWidget()
+        self.tabs.setDocumentMode(True)
+        self.tabs.setTabsClosable(True)
+        self.tabs.setMovable(True)
+        self.tabs.tabCloseRequested.connect(self.close_tab)
         self.text_editor_layout = QVBoxLayout()
-        self.text_editor_layout.addWidget(self.text_editor)
+        self.text_editor_layout.addWidget(self.tabs)
 
         # Create container widget
         container = QWidget()
@@ -229,8 +1379,18 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(container)
 
         # Set up menu and status bars
-        self.setMenuBar(MenuBar(self, self.text_editor))
-        self.setStatusBar(StatusBar(self.text_editor))
+        self.setStatusBar(StatusBar())
+        self.statusBar().cancel_requested.connect(self.cancel_loading)
+        self.statusBar().cancel_requested.connect(self.cancel_saving)
+        self.tabs.currentChanged.connect(self._activate_tab)
+        self.tabs.currentChanged.connect(self._schedule_session_save)
+        self.tabs.tabBar().tabMoved.connect(self._schedule_session_save)
+        self._setup_journal()
+        self.restore_session()
+        self.recover_journals()
+        if self.tabs.count() == 0:
+            self.add_document()
+        self.setMenuBar(MenuBar(self))
 
         # Set up shortcuts
         self._setup_shortcuts()
@@ -240,48 +1400,754 @@ class MainWindow(QMainWindow):
         QShortcut(QKeySequence("Ctrl+N"), self).activated.connect(self.new_file)
         QShortcut(QKeySequence("Ctrl+S"), self).activated.connect(self.save_file)
 
+    @property
+    def find_panel(self):
+        """The find/replace bar below the tabs, created on first use."""
+        if self._find_panel is None:
+            self._find_panel = FindPanel()
+            self.text_editor_layout.addWidget(self._find_panel)
+            self._find_panel.set_text_editor(self.text_editor)
+        return self._find_panel
+
+    @property
+    def folder_search_panel(self):
+        """The Find in Folder dock, created on first use."""
+        if self._folder_search_panel is None:
+            # Deferred: the panel pulls in multiprocessing, concurrent.futures and sqlite3.
+            from folder_search_panel import FolderSearchPanel
+
+            self._folder_search_panel = FolderSearchPanel(self)
+            self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self._folder_search_panel)
+        return self._folder_search_panel
+
+    @property
+    def current_tab(self):
+        """The DocumentTab being shown."""
+        return self.tabs.currentWidget()
+
+    @property
+    def text_editor(self):
+        """The editor of the current tab; the current tab is always loaded."""
+        return self.current_tab.editor
+
+    def _document_tabs(self):
+        return [self.tabs.widget(index) for index in range(self.tabs.count())]
+
+    def add_document(self, file_path="", activate=True, read_only=False, encoding=None):
+        """Add a tab for a file without reading it; it is loaded when first activated."""
+        tab = DocumentTab(file_path, read_only, encoding)
+        index = self.tabs.addTab(tab, tab.title())
+        self.tabs.setTabToolTip(index, file_path)
+        if activate:
+            self.tabs.setCurrentIndex(index)
+        return tab
+
+    def _find_tab(self, file_path):
+        file_path = os.path.abspath(file_path)
+        for tab in self._document_tabs():
+            if tab.file_path and os.path.abspath(tab.file_path) == file_path:
+                return tab
+        return None
+
+    def _activate_tab(self, index):
+        """Load the newly current tab if needed and point the shared widgets at its editor."""
+        tab = self.tabs.widget(index)
+        if tab is None:
+            return
+        self._activations += 1
+        tab.last_used = self._activations
+        if tab.editor is None:
+            self._create_editor(tab)
+            if tab.file_path:
+                try:
+                    self._load_document(tab)
+                except Exception as e:
+                    self.statusBar().showMessage(f"Error opening file: {str(e)}", 5000)
+            else:
+                self._start_journal(tab)
+        self.statusBar().set_text_editor(tab.editor)
+        if self._find_panel is not None:
+            self._find_panel.set_text_editor(tab.editor)
+        if self._latency_probe is not None:
+            self._latency_probe.attach(tab.editor)
+        if tab.loader is None and tab.saver is None:
+            self.statusBar().clear_progress()
+        tab.editor.setFocus()
+        self._unload_documents()
+
+    def _create_editor(self, tab):
+        editor = TextEditor()
+        editor.history = UndoHistory(self.undo_memory_limit, self.undo_spill)
+        if editor.show_line_numbers != self.show_line_numbers:
+            editor.toggle_line_numbers()
+        editor.document().modificationChanged.connect(lambda _: self._update_tab_title(tab))
+        editor.change_bus.contents_changed.connect(self._update_memory_usage)
+        editor.cursorPositionChanged.connect(self._schedule_session_save)
+        editor.verticalScrollBar().valueChanged.connect(self._schedule_session_save)
+        editor.large_file_scroll_bar.valueChanged.connect(self._schedule_session_save)
+        tab.set_editor(editor)
+
+    def _update_tab_title(self, tab):
+        index = self.tabs.indexOf(tab)
+        if index >= 0:
+            self.tabs.setTabText(index, tab.title())
+            self.tabs.setTabToolTip(index, tab.file_path)
+
+    def _update_memory_usage(self):
+        """Report the estimated memory of the current tab and of every loaded tab."""
+        usage = [(tab.title(), tab.memory_usage()) for tab in self._document_tabs() if tab.editor is not None]
+        self.statusBar().show_memory(self.current_tab.memory_usage(), usage, self.memory_budget)
+
+    def _unload_documents(self):
+        """Unload least recently used documents until the loaded ones fit in the memory budget."""
+        tabs = [tab for tab in self._document_tabs() if tab.editor is not None]
+        total = sum(tab.memory_usage() for tab in tabs)
+        candidates = sorted(
+            (tab for tab in tabs if tab is not self.current_tab and tab.can_unload()), key=lambda tab: tab.last_used
+        )
+        for tab in candidates:
+            if total <= self.memory_budget:
+                break
+            total -= tab.memory_usage()
+            self._save_undo_history(tab)
+            tab.unload()
+        self._update_memory_usage()
+
+    def close_tab(self, index):
+        """Close a tab, asking before discarding unsaved changes."""
+        tab = self.tabs.widget(index)
+        if tab is None:
+            return
+        if tab.editor is not None and tab.editor.document().isModified():
+            answer = QMessageBox.question(self, "Close Tab", f"Discard unsaved changes to {tab.title().rstrip(' *')}?")
+            if answer != QMessageBox.StandardButton.Yes:
+                return
+        if tab.saver is not None:
+            tab.saver.wait()
+        self._cancel_loading(tab)
+        if tab.follower is not None:
+            self._stop_following(tab)
+        # Switch the shared widgets to another editor before this one goes away.
+        self.tabs.removeTab(index)
+        if self.tabs.count() == 0:
+            self.add_document()
+        if tab.editor is not None:
+            self._save_undo_history(tab)
+            tab.unload()
+        tab.deleteLater()
+        self._update_memory_usage()
+        self._schedule_session_save()
+
+    def toggle_line_numbers(self):
+        """Toggle line numbers in every loaded editor."""
+        self.show_line_numbers = not self.show_line_numbers
+        for tab in self._document_tabs():
+            if tab.editor is not None and tab.editor.show_line_numbers != self.show_line_numbers:
+                tab.editor.toggle_line_numbers()
+        self._schedule_session_save()
+
+    def show_undo_statistics(self):
+        """Show how much memory and disk each loaded document's undo history uses."""
+        lines = []
+        for tab in self._document_tabs():
+            if tab.editor is not None:
+                stats = tab.editor.history.statistics()
+                lines.append(
+                    f"{tab.title()}: {stats['undo_steps']} undo and {stats['redo_steps']} redo steps in "
+                    f"{stats['memory_bytes']:,} bytes; {stats['spilled_steps']} steps in {stats['spilled_bytes']:,} "
+                    f"bytes spilled to disk; {stats['dropped_steps']} dropped"
+                )
+        lines.append(f"Memory limit per document: {_format_size(self.undo_memory_limit)}")
+        QMessageBox.information(self, "Undo History Footprint", "\n".join(lines))
+
+    def toggle_latency_probe(self, enabled):
+        """Start or stop measuring keystroke-to-paint latency in the current editor."""
+        if enabled and self._latency_probe is None:
+            from latency import LatencyProbe
+
+            self._latency_probe = LatencyProbe(self)
+            self._latency_probe.updated.connect(lambda: self.statusBar().show_latency(self._latency_probe.statistics()))
+            self._latency_probe.attach(self.text_editor)
+        elif not enabled and self._latency_probe is not None:
+            self._latency_probe.detach()
+            self._latency_probe.deleteLater()
+            self._latency_probe = None
+            self.statusBar().clear_latency()
+
+    def toggle_tracing(self, enabled):
+        """Start recording a fresh trace, or stop and discard the current one."""
+        if enabled:
+            tracing.start()
+            self.statusBar().showMessage("Recording trace", 5000)
+        else:
+            tracing.stop()
+            self.statusBar().showMessage("Trace discarded", 5000)
+
+    def export_trace(self):
+        """Write the recorded trace as Chrome Trace Event JSON, for chrome://tracing or Perfetto."""
+        if not tracing.is_recording():
+            self.statusBar().showMessage("No trace is being recorded; enable View > Record Trace first", 5000)
+            return
+        try:
+            file_path, _ = QFileDialog.getSaveFileName(self, "Export Trace", "trace.json", "Trace Files (*.json)")
+            if file_path:
+                count = tracing.export(file_path)
+                self.statusBar().showMessage(f"Exported {count} trace events to {file_path}", 5000)
+        except Exception as e:
+            self.statusBar().showMessage(f"Error exporting trace: {str(e)}", 5000)
+
+    def _setup_journal(self):
+        """Take a journal directory for this window and start the thread writing to it."""
+        if not self.journal_directory:
+            return
+        try:
+            self._journals = JournalDirectory(self.journal_directory)
+        except Exception as e:
+            self.statusBar().showMessage(f"Autosave is off: {str(e)}", 5000)
+            return
+        self._journal_writer = JournalWriter(self)
+        self._journal_writer.failed.connect(
+            lambda error: self.statusBar().showMessage(f"Autosave failed: {error}", 5000)
+        )
+        self._journal_writer.start()
+
+    def recover_journals(self):
+        """Reopen documents with unsaved changes journaled by an editor that is no longer running.
+
+        Changes to a file on disk are replayed once its tab is loaded; untitled documents are rebuilt now.
+        """
+        if self._journals is None:
+            return
+        try:
+            journal_paths = self._journals.recover()
+        except Exception as e:
+            self.statusBar().showMessage(f"Error recovering unsaved changes: {str(e)}", 5000)
+            return
+        for journal_path in journal_paths:
+            journal = read_journal(journal_path)
+            if journal is None or not journal[1]:
+                os.unlink(journal_path)
+                continue
+            header, edits = journal
+            file_path = header["path"]
+            tab = self._find_tab(file_path) if file_path else None
+            if tab is None and file_path and os.path.isfile(file_path):
+                tab = self.add_document(file_path, False, False, header["encoding"])
+            if tab is not None:
+                tab.recovery = (journal_path, header, edits)
+                if tab.editor is not None and tab.loader is None:
+                    self._start_journal(tab)
+                continue
+            # Untitled, or never saved: the edits apply to an empty document.
+            tab = DocumentTab(file_path, encoding=header["encoding"])
+            tab.recovery = (journal_path, header, edits)
+            self._create_editor(tab)
+            tab.editor.current_file_path = file_path
+            tab.editor.update_language()
+            self.tabs.addTab(tab, tab.title())
+            self._start_journal(tab)
+
+    def _start_journal(self, tab):
+        """Journal the edits of a freshly loaded document, first replaying any recovered ones."""
+        if self._journals is None or tab.editor.large_file is not None:
+            return
+        if tab.recovery is None:
+            journal_path = self._journals.new_journal_path()
+        else:
+            (journal_path, header, edits), tab.recovery = tab.recovery, None
+            if header["fingerprint"] != file_fingerprint(tab.file_path):
+                kept = self._journals.set_aside(journal_path)
+                self.statusBar().showMessage(
+                    f"Unsaved changes to {tab.file_path} not recovered, the file changed on disk; kept in {kept}", 5000
+                )
+                journal_path = self._journals.new_journal_path()
+            else:
+                tab.base_fingerprint = header["fingerprint"]
+                tab.editor.replay_edits(edits)
+                self.statusBar().showMessage(f"Recovered unsaved changes to {tab.title().rstrip(' *')}", 5000)
+        tab.journal = EditJournal(self._journal_writer, journal_path, tab.file_path, tab.encoding, tab.base_fingerprint)
+        tab.editor.journal = tab.journal
+
+    def restore_session(self):
+        """Recreate the tabs of the saved session; only the current document is loaded now."""
+        session = load_session(self.session_path) if self.session_path else None
+        if not session:
+            return
+        self.show_line_numbers = bool(session.get("show_line_numbers", True))
+        # Adding the first tab would make it current and load it; activate only the saved current tab.
+        self.tabs.blockSignals(True)
+        try:
+            for document in session.get("documents", []):
+                if document.get("path"):
+                    tab = self.add_document(
+                        document["path"], False, bool(document.get("read_only")), document.get("encoding")
+                    )
+                    tab.saved_position = (int(document.get("cursor", 0)), int(document.get("scroll", 0)))
+            if self.tabs.count():
+                self.tabs.setCurrentIndex(min(max(0, int(session.get("current", 0))), self.tabs.count() - 1))
+        finally:
+            self.tabs.blockSignals(False)
+        if self.tabs.count():
+            self._activate_tab(self.tabs.currentIndex())
+
+    def _session_state(self):
+        """Describe the open files, their positions and the view settings."""
+        documents = []
+        current = 0
+        for tab in self._document_tabs():
+            if not tab.file_path:
+                continue
+            if tab is self.current_tab:
+                current = len(documents)
+            cursor, scroll = tab.position()
+            documents.append(
+                {
+                    "path": os.path.abspath(tab.file_path),
+                    "cursor": cursor,
+                    "scroll": scroll,
+                    "read_only": tab.read_only,
+                    "encoding": None if tab.detect_encoding else tab.encoding,
+                }
+            )
+        return {"documents": documents, "current": current, "show_line_numbers": self.show_line_numbers}
+
+    def _schedule_session_save(self):
+        """Write the session shortly, so bursts of changes cost one write."""
+        if self.session_path:
+            self._session_timer.start()
+
+    @tracing.traced("write session", "io")
+    def write_session(self):
+        """Write the session file now."""
+        self._session_timer.stop()
+        if not self.session_path:
+            return
+        try:
+            save_session(self.session_path, self._session_state())
+        except Exception as e:
+            self.statusBar().showMessage(f"Error saving session: {str(e)}", 5000)
+
+    def open_file(self, file_path, line=None, read_only=False, encoding=None):
+        """Show a file in a tab, loading it on a worker thread, optionally jumping to a 1-based line.
+
+        ``read_only`` and ``encoding`` only apply when the file is not open yet.
+        """
+        tab = self._find_tab(file_path)
+        if tab is not None:
+            if line is not None:
+                if tab.editor is not None and tab.loader is None:
+                    tab.editor.go_to_line(line)
+                else:
+                    tab.pending_line = line
+            self.tabs.setCurrentWidget(tab)
+            return
+        current = self.current_tab
+        if not current.file_path and current.loader is None and current.editor.document().isEmpty():
+            # Replace the empty untitled tab instead of keeping it around.
+            current.file_path = file_path
+            current.pending_line = line
+            current.set_read_only(read_only)
+            current.encoding = encoding or "utf-8"
+            current.detect_encoding = encoding is None
+            self._load_document(current)
+            self._update_tab_title(current)
+            self._schedule_session_save()
+            return
+        tab = DocumentTab(file_path, read_only, encoding)
+        tab.pending_line = line
+        self.tabs.setCurrentIndex(self.tabs.addTab(tab, tab.title()))
+
+    def open_files(self, files, read_only=False, encoding=None):
+        """Open ``[(path, line), ...]``, reporting files that cannot be opened in the status bar."""
+        for file_path, line in files:
+            try:
+                self.open_file(file_path, line, read_only, encoding)
+            except Exception as e:
+                self.statusBar().showMessage(f"Error opening file: {str(e)}", 5000)
+
+    def bring_to_front(self):
+        """Show, un-minimize and activate the window."""
+        self.setWindowState(self.windowState() & ~Qt.WindowState.WindowMinimized)
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def _load_document(self, tab):
+        """Stream a tab's file into its editor, or map it in large file mode."""
+        editor = tab.editor
+        editor.close_large_file()
+        tab.encoding, tab.newline = detect_text_format(tab.file_path, None if tab.detect_encoding else tab.encoding)
+        # Large file mode maps the bytes on disk and splits them on b"\n", so compressed files and
+        # encodings such as UTF-16 are always streamed into the editor.
+        if (
+            os.path.getsize(tab.file_path) > self.large_file_threshold
+            and not compression_suffix(tab.file_path)
+            and is_ascii_compatible(tab.encoding)
+        ):
+            self.open_large_file(tab)
+            self._go_to_pending_line(tab)
+            self._restore_position(tab)
+            return
+        editor.begin_loading()
+        editor.current_file_path = tab.file_path
+        editor.update_language()
+
+        file_path = tab.file_path
+        tab.base_fingerprint = file_fingerprint(file_path)
+        loader = FileLoader(file_path, tab.encoding, parent=self)
+        loader.chunk_read.connect(functools.partial(self._append_loaded_chunk, tab, loader))
+        loader.progress.connect(functools.partial(self._show_progress, tab, "Opening"))
+        loader.loaded.connect(functools.partial(self._finish_loading, tab, loader, f"Opened: {file_path}", True))
+        loader.failed.connect(lambda error: self._finish_loading(tab, loader, f"Error opening file: {error}"))
+        loader.finished.connect(loader.deleteLater)
+        tab.loader = loader
+        loader.start()
+
+    def open_large_file(self, tab):
+        """Open a tab's file read-only in large file mode without reading it into memory."""
+        tab.editor.open_large_file(LargeFileModel(tab.file_path, tab.encoding))
+        tab.editor.current_file_path = tab.file_path
+        tab.editor.update_language()
+        if tab is self.current_tab:
+            self.statusBar()._update_file_label()
+        self.statusBar().showMessage(f"Opened read-only (large file): {tab.file_path}", 5000)
+
+    def _show_progress(self, tab, message, done, total):
+        """Show a worker's progress if its tab is the one being shown."""
+        if tab is self.current_tab:
+            self.statusBar().show_progress(message, done, total)
+
+    def cancel_loading(self):
+        """Stop loading the current tab, keeping whatever has already been read."""
+        self._cancel_loading(self.current_tab)
+
+    def _cancel_loading(self, tab):
+        if tab.loader is not None:
+            tab.loader.cancel()
+            tab.loader.wait()
+            self._finish_loading(tab, tab.loader, "Loading cancelled; only part of the file is shown")
+
+    def _append_loaded_chunk(self, tab, loader, text):
+        """Append one chunk from the loader and let it read the next."""
+        if loader is not tab.loader:
+            return
+        tab.editor.append_chunk(text)
+        if tab.pending_line is not None and tab.editor.blockCount() > tab.pending_line:
+            self._go_to_pending_line(tab)
+        loader.chunk_consumed()
+
+    def _go_to_pending_line(self, tab):
+        """Jump to the line requested when the file was opened, once it is available."""
+        if tab.pending_line is not None:
+            tab.editor.go_to_line(tab.pending_line)
+            tab.pending_line = None
+            tab.saved_position = None
+
+    def _restore_position(self, tab):
+        """Put the cursor and scroll position back where they were when the tab was unloaded or the session saved."""
+        if tab.saved_position is not None:
+            position, scroll_value = tab.saved_position
+            tab.saved_position = None
+            if tab.editor.large_file is not None:
+                tab.editor.go_to_line(scroll_value + 1)
+                return
+            cursor = tab.editor.textCursor()
+            cursor.setPosition(min(position, tab.editor.document().characterCount() - 1))
+            tab.editor.setTextCursor(cursor)
+            tab.editor.verticalScrollBar().setValue(scroll_value)
+
+    def _finish_loading(self, tab, loader, message, complete=False):
+        """Tear down loading state once the loader is done; only a complete document is journaled."""
+        if loader is not tab.loader:
+            return
+        tab.loader = None
+        tab.editor.end_loading()
+        tab.partial = not complete
+        if not complete:
+            tab.content_hash = None
+            self._update_tab_title(tab)
+        else:
+            tab.content_hash = loader.content_hash
+            tab.loaded_size = loader.bytes_read
+            self._attach_undo_history(tab)
+            self._start_journal(tab)
+        self._go_to_pending_line(tab)
+        self._restore_position(tab)
+        if tab is self.current_tab:
+            self.statusBar().clear_progress()
+            self.statusBar()._update_file_label()
+        self.statusBar().showMessage(message, 5000)
+        self._unload_documents()
+
+    def _attach_undo_history(self, tab):
+        """Offer a saved undo history to a freshly loaded tab; it is read on the first undo that needs it."""
+        if not self.undo_directory or not tab.file_path or tab.content_hash is None:
+            return
+        undo_path = undo_file_path(self.undo_directory, tab.file_path)
+        if os.path.exists(undo_path):
+            tab.editor.history.set_base_loader(
+                functools.partial(load_undo_history, undo_path, tab.file_path, tab.content_hash)
+            )
+
+    def _save_undo_history(self, tab):
+        """Keep a tab's undo history for the next time its file is opened, if the document matches the file."""
+        editor = tab.editor
+        if (
+            not self.undo_directory
+            or editor is None
+            or tab.loader is not None
+            or not tab.file_path
+            or tab.content_hash is None
+            or editor.large_file is not None
+            or editor.document().isModified()
+        ):
+            return
+        steps = editor.history.export_steps()
+        if steps is None:
+            return
+        try:
+            undo_path = undo_file_path(self.undo_directory, tab.file_path)
+            save_undo_history(undo_path, tab.file_path, tab.content_hash, *steps)
+        except Exception as e:
+            self.statusBar().showMessage(f"Error saving undo history: {str(e)}", 5000)
+
+    def toggle_follow(self):
+        """Start or stop appending what is written to the current file, like ``tail -F``."""
+        tab = self.current_tab
+        if tab.follower is not None:
+            self._stop_following(tab)
+            self.statusBar().showMessage(f"Stopped following: {tab.file_path}", 5000)
+            return
+        if not tab.file_path:
+            self.statusBar().showMessage("Save the file before following it", 5000)
+        elif tab.loader is not None or tab.saver is not None:
+            self.statusBar().showMessage("Wait for the file to finish loading or saving before following it", 5000)
+        elif tab.editor.large_file is not None or compression_suffix(tab.file_path):
+            self.statusBar().showMessage("Large and compressed files cannot be followed", 5000)
+        elif tab.editor.document().isModified() or tab.partial:
+            self.statusBar().showMessage("Save or undo the changes, or reload the file, before following it", 5000)
+        else:
+            try:
+                follower = FileFollower(tab.file_path, tab.loaded_size, tab.encoding, self)
+            except Exception as e:
+                self.statusBar().showMessage(f"Error following file: {str(e)}", 5000)
+                return
+            follower.appended.connect(functools.partial(self._append_followed, tab))
+            follower.reset.connect(functools.partial(self._reset_followed, tab))
+            follower.failed.connect(functools.partial(self._follow_failed, tab))
+            tab.follower = follower
+            # Appended text is not in the undo history, so the history no longer leads to the file.
+            tab.content_hash = None
+            tab.set_read_only(tab.read_only)
+            self._update_tab_title(tab)
+            self.statusBar().showMessage(f"Following: {tab.file_path}", 5000)
+
+    def _stop_following(self, tab):
+        # Following again continues from what has been appended to the document.
+        tab.loaded_size = tab.follower.offset()
+        tab.follower.close()
+        tab.follower.deleteLater()
+        tab.follower = None
+        tab.set_read_only(tab.read_only)
+        if tab.journal is not None:
+            # Edits from here on apply to the file as it has been followed so far.
+            tab.base_fingerprint = file_fingerprint(tab.file_path)
+            tab.journal.finish_save(tab.file_path, tab.encoding, tab.base_fingerprint)
+        self._update_tab_title(tab)
+
+    def _append_followed(self, tab, text):
+        """Append text written to a followed file, keeping the view at the bottom if it was there."""
+        scroll_bar = tab.editor.verticalScrollBar()
+        at_bottom = scroll_bar.value() == scroll_bar.maximum()
+        tab.editor.append_followed(text)
+        tab.loaded_size = tab.follower.offset()
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
+
+    def _reset_followed(self, tab):
+        """Empty a followed document whose file was truncated or rotated; it fills again from the new start."""
+        tab.editor.begin_loading()
+        tab.editor.end_loading()
+        tab.loaded_size = 0
+        if tab is self.current_tab:
+            self.statusBar().showMessage(f"File truncated or replaced, following from its start: {tab.file_path}", 5000)
+
+    def _follow_failed(self, tab, error):
+        self._stop_following(tab)
+        self.statusBar().showMessage(f"Error following file: {error}", 5000)
+
     def save_file(self):
         """Save the current file content."""
+        if self.text_editor.large_file is not None:
+            self.statusBar().showMessage("Large files are opened read-only", 5000)
+            return
+        if self.current_tab.read_only:
+            self.statusBar().showMessage("The file is opened read-only; use Save As to save a copy", 5000)
+            return
+        if self.current_tab.follower is not None:
+            self.statusBar().showMessage("The file is being followed; use Save As to save a copy", 5000)
+            return
+        if self.current_tab.partial:
+            self.statusBar().showMessage("Only part of the file was loaded; use Save As to save a copy", 5000)
+            return
         try:
-            text = self.text_editor.toPlainText()
             file_path = self.text_editor.current_file_path
             if file_path:
-                with open(file_path, "w", encoding="utf-8") as file:
-                    file.write(text)
+                self._write_file(file_path)
             else:
                 self._save_as_file()
         except Exception as e:
             self.statusBar().showMessage(f"Error saving file: {str(e)}", 5000)
 
+    def _write_file(self, file_path):
+        """Save a snapshot of the current tab's piece table on a worker thread."""
+        tab = self.current_tab
+        if tab.loader is not None:
+            self.statusBar().showMessage("Wait for the file to finish loading before saving", 5000)
+            return
+        self._cancel_saving(tab)
+        if tab.journal is not None:
+            tab.journal.begin_save()
+        saver = FileSaver(file_path, tab.editor.text_model.snapshot(), tab.encoding, tab.newline, parent=self)
+        saver.progress.connect(functools.partial(self._show_progress, tab, "Saving"))
+        saver.saved.connect(functools.partial(self._finish_saving, tab, saver, file_path, f"Saved: {file_path}"))
+        saver.failed.connect(lambda error: self._finish_saving(tab, saver, None, f"Error saving file: {error}"))
+        saver.finished.connect(saver.deleteLater)
+        tab.saver = saver
+        saver.start()
+
+    def cancel_saving(self):
+        """Abort saving the current tab, leaving the file on disk as it was."""
+        self._cancel_saving(self.current_tab)
+
+    def _cancel_saving(self, tab):
+        if tab.saver is not None:
+            tab.saver.cancel()
+            tab.saver.wait()
+            self._finish_saving(tab, tab.saver, None, "Save cancelled")
+
+    def _finish_saving(self, tab, saver, file_path, message):
+        """Record a completed save and tear down the progress indicator."""
+        if saver is not tab.saver:
+            return
+        tab.saver = None
+        if tab.journal is not None:
+            if file_path:
+                tab.base_fingerprint = file_fingerprint(file_path)
+                tab.journal.finish_save(file_path, tab.encoding, tab.base_fingerprint)
+            else:
+                tab.journal.cancel_save()
+        if file_path:
+            tab.partial = False
+            tab.content_hash = saver.content_hash
+            tab.loaded_size = os.path.getsize(file_path)
+            tab.file_path = file_path
+            tab.editor.current_file_path = file_path
+            tab.editor.update_language()
+            tab.editor.document().setModified(False)
+            self._update_tab_title(tab)
+            self._schedule_session_save()
+        if tab is self.current_tab:
+            self.statusBar()._update_file_label()
+            self.statusBar().clear_progress()
+        self.statusBar().showMessage(message, 5000)
+
+    def closeEvent(self, event):
+        """Let running saves finish and stop loading before the window goes away."""
+        self.write_session()
+        for tab in self._document_tabs():
+            if tab.saver is not None:
+                tab.saver.wait()
+            if tab.loader is not None:
+                tab.loader.cancel()
+                tab.loader.wait()
+            if tab.follower is not None:
+                self._stop_following(tab)
+            if tab.journal is not None and not tab.editor.document().isModified():
+                tab.journal.discard()
+            self._save_undo_history(tab)
+        if self._journal_writer is not None:
+            # Journals of modified documents stay behind and are recovered on the next start.
+            self._journal_writer.stop()
+            self._journals.close()
+        if self._find_panel is not None:
+            self._find_panel.shutdown()
+        if self._folder_search_panel is not None:
+            self._folder_search_panel.shutdown()
+        super().closeEvent(event)
+
     def new_file(self):
-        """Create a new file."""
+        """Create a new file in its own tab."""
         try:
             file_path, _ = QFileDialog.getSaveFileName(self, "Create a new file", "NewFile.txt", "Text Files (*.txt)")
             if file_path:
-                self.text_editor.clear()
-                self.text_editor.current_file_path = file_path
+                tab = DocumentTab(file_path)
+                # Created up front so that activating the tab does not try to read the file.
+                self._create_editor(tab)
+                tab.editor.current_file_path = file_path
+                tab.editor.update_language()
+                self._start_journal(tab)
+                self.tabs.setCurrentIndex(self.tabs.addTab(tab, tab.title()))
         except Exception as e:
             self.statusBar().showMessage(f"Error creating new file: {str(e)}", 5000)
 
     def _save_as_file(self):
         """Save file with a new name."""
-        file_path, _ = QFileDialog.getSaveFileName(self, "Save File", "NewFile.txt", "Text Files (*.txt)")
+        if self.text_editor.large_file is not None:
+            self.statusBar().showMessage("Large files are opened read-only", 5000)
+            return
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save File", "NewFile.txt", FILE_DIALOG_FILTER)
         if file_path:
+            if self.current_tab.follower is not None:
+                # The tab moves to the copy, which would miss what is appended to the followed file from here on.
+                self._stop_following(self.current_tab)
             try:
-                with open(file_path, "w", encoding="utf-8") as file:
-                    file.write(self.text_editor.toPlainText())
-                self.text_editor.current_file_path = file_path
+                self._write_file(file_path)
             except Exception as e:
                 self.statusBar().showMessage(f"Error saving file: {str(e)}", 5000)
 
 
 def main():
     """Initialize and run the application."""
+    arguments = parse_arguments(sys.argv[1:])
+    profile = StartupProfile(STARTED_AT) if arguments.startup_profile else None
+    if arguments.trace:
+        tracing.start()
     app = QApplication(sys.argv)
-    window = MainWindow()
+    # Names the directories Qt's standard locations return, e.g. ~/.local/share/gapp-text-editor.
+    app.setApplicationName(APPLICATION_NAME)
+    if profile is not None:
+        profile.mark("imports", IMPORTED_AT)
+        profile.mark("QApplication")
+    window = MainWindow(
+        session_path=default_session_path(),
+        journal_directory=default_journal_directory(),
+        undo_directory=default_undo_directory(),
+        large_file_threshold=(
+            None if arguments.large_file_threshold is None else arguments.large_file_threshold * 1024 * 1024
+        ),
+    )
+    # The loaders start here, before the window is shown and painted for the first time.
+    window.open_files(arguments.files, arguments.readonly, arguments.encoding)
+    if profile is not None:
+        profile.mark("window")
+        profile.report_after_first_paint(window.text_editor.viewport())
     window.show()
+    if not arguments.new_instance:
+        # Listening needs QtNetwork, so leave it until the window is up.
+        QTimer.singleShot(0, functools.partial(_start_instance_server, window))
     sys.exit(app.exec())
 
 
+def _start_instance_server(window):
+    """Let later launches hand their files to this window instead of opening their own."""
+    from instance_server import InstanceServer
+
+    server = InstanceServer(window)
+    server.files_received.connect(lambda files, options: window.open_files(files, **options))
+    server.files_received.connect(window.bring_to_front)
+    server.listen()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,323 @@
+import bisect
+import random
+import re
+
+# Inserted text is appended to the current add segment until it reaches this size,
+# so consecutive keystrokes extend a single piece instead of creating one per key.
+ADD_SEGMENT_SIZE = 4096
+
+# Characters outside the Basic Multilingual Plane, which take two UTF-16 code units.
+_ASTRAL = re.compile("[\U00010000-\U0010ffff]")
+
+
+def astral_offsets(text):
+    """Return the indices of the characters in ``text`` that take two UTF-16 code units."""
+    return [] if text.isascii() else [match.start() for match in _ASTRAL.finditer(text)]
+
+
+class _Piece:
+    """Treap node describing a span of one buffer."""
+
+    __slots__ = ("buffer", "start", "length", "priority", "left", "right", "size")
+
+    def __init__(self, buffer, start, length):
+        self.buffer = buffer
+        self.start = start
+        self.length = length
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.size = length
+
+
+def _size(node):
+    return node.size if node is not None else 0
+
+
+def _update(node):
+    node.size = node.length + _size(node.left) + _size(node.right)
+    return node
+
+
+def _merge(left, right):
+    """Concatenate two treaps."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _update(left)
+    right.left = _merge(left, right.left)
+    return _update(right)
+
+
+def _split(node, offset):
+    """Split a treap into the first ``offset`` characters and the rest, splitting a piece if needed."""
+    if node is None:
+        return None, None
+    left_size = _size(node.left)
+    if offset <= left_size:
+        left, node.left = _split(node.left, offset)
+        return left, _update(node)
+    offset -= left_size
+    if offset >= node.length:
+        node.right, right = _split(node.right, offset - node.length)
+        return _update(node), right
+    tail = _Piece(node.buffer, node.start + offset, node.length - offset)
+    tail.right = node.right
+    node.length = offset
+    node.right = None
+    return _update(node), _update(tail)
+
+
+def _build(pieces):
+    """Build a treap from pieces in document order in O(n) using a Cartesian-tree stack."""
+    stack = []
+    for piece in pieces:
+        last = None
+        while stack and stack[-1].priority < piece.priority:
+            last = _update(stack.pop())
+        piece.left = last
+        if stack:
+            stack[-1].right = piece
+        stack.append(piece)
+    while len(stack) > 1:
+        _update(stack.pop())
+    return _update(stack[0]) if stack else None
+
+
+class PieceTable:
+    """Text model that records edits as spans over immutable buffers.
+
+    Buffer 0.. hold the original text exactly as it was loaded (possibly in several
+    chunks) and are never copied; inserted text goes to append-only add segments.
+    Pieces are kept in a treap ordered by document position, so locating, inserting
+    and deleting cost O(log n) in the number of pieces.
+
+    Positions are Python string indices. QTextDocument counts UTF-16 code units
+    instead, so the indices of characters outside the BMP are kept sorted for
+    ``from_utf16`` and ``to_utf16``; without such characters both are the identity.
+    """
+
+    def __init__(self, text=""):
+        self.buffers = []
+        self._root = None
+        self._add_buffer = None
+        self._astral = []
+        if text:
+            self.append_original(text)
+
+    def __len__(self):
+        return _size(self._root)
+
+    def append_original(self, text):
+        """Append a chunk of original file content without copying it."""
+        if not text:
+            return
+        length = len(self)
+        self._astral += [length + offset for offset in astral_offsets(text)]
+        self.buffers.append(text)
+        self._root = _merge(self._root, _Piece(len(self.buffers) - 1, 0, len(text)))
+        self._add_buffer = None
+
+    def insert(self, position, text):
+        """Insert ``text`` at ``position``."""
+        if not text:
+            return
+        position = max(0, min(position, len(self)))
+        index = bisect.bisect_left(self._astral, position)
+        added = [position + offset for offset in astral_offsets(text)]
+        if added or index < len(self._astral):
+            self._astral[index:] = added + [offset + len(text) for offset in self._astral[index:]]
+        left, right = _split(self._root, position)
+        last = self._last_piece(left)
+        if (
+            last is not None
+            and last.buffer == self._add_buffer
+            and last.start + last.length == len(self.buffers[last.buffer])
+            and len(self.buffers[last.buffer]) + len(text) <= ADD_SEGMENT_SIZE
+        ):
+            # Extending the segment only changes characters no other piece refers to.
+            self.buffers[last.buffer] += text
+            self._extend_last_piece(left, len(text))
+        else:
+            start = 0
+            if self._add_buffer is not None and len(self.buffers[self._add_buffer]) + len(text) <= ADD_SEGMENT_SIZE:
+                start = len(self.buffers[self._add_buffer])
+                self.buffers[self._add_buffer] += text
+            else:
+                self.buffers.append(text)
+                self._add_buffer = len(self.buffers) - 1
+            left = _merge(left, _Piece(self._add_buffer, start, len(text)))
+        self._root = _merge(left, right)
+
+    def delete(self, position, length):
+        """Remove ``length`` characters starting at ``position``."""
+        if length <= 0:
+            return
+        first = bisect.bisect_left(self._astral, position)
+        if first < len(self._astral):
+            last = bisect.bisect_left(self._astral, position + length)
+            self._astral[first:] = [offset - length for offset in self._astral[last:]]
+        left, rest = _split(self._root, position)
+        _, right = _split(rest, length)
+        self._root = _merge(left, right)
+
+    def replace(self, position, length, text):
+        """Replace ``length`` characters at ``position`` with ``text``."""
+        self.delete(position, length)
+        self.insert(position, text)
+
+    def replace_ranges(self, replacements):
+        """Apply sorted, non-overlapping ``(start, end, text)`` replacements in one linear pass.
+
+        All replacement texts go into a single new add buffer and the piece list is
+        rebuilt once, so this costs O(pieces + replacements) instead of one treap
+        update per replacement.
+        """
+        if not replacements:
+            return
+        self._astral = self._shift_astral(replacements)
+        self.buffers.append("".join(text for _, _, text in replacements))
+        added = len(self.buffers) - 1
+        self._add_buffer = None
+        pieces = []
+        position = 0
+        added_offset = 0
+        spans = ((node.buffer, node.start, node.start + node.length) for node in self._pieces(self._root))
+        span = next(spans, None)
+        for start, end, text in replacements:
+            # Keep everything before the replacement, splitting the span that crosses ``start``.
+            while span is not None and position < start:
+                buffer, lo, hi = span
+                take = min(hi - lo, start - position)
+                pieces.append(_Piece(buffer, lo, take))
+                position += take
+                span = (buffer, lo + take, hi) if lo + take < hi else next(spans, None)
+            if text:
+                pieces.append(_Piece(added, added_offset, len(text)))
+                added_offset += len(text)
+            # Drop the replaced characters.
+            while span is not None and position < end:
+                buffer, lo, hi = span
+                skip = min(hi - lo, end - position)
+                position += skip
+                span = (buffer, lo + skip, hi) if lo + skip < hi else next(spans, None)
+        while span is not None:
+            buffer, lo, hi = span
+            pieces.append(_Piece(buffer, lo, hi - lo))
+            span = next(spans, None)
+        self._root = _build(pieces)
+
+    def _shift_astral(self, replacements):
+        """Return the astral character indices after sorted ``(start, end, text)`` replacements."""
+        if not self._astral and all(text.isascii() for _, _, text in replacements):
+            return self._astral
+        result = []
+        old = iter(self._astral)
+        offset = next(old, None)
+        delta = 0
+        for start, end, text in replacements:
+            while offset is not None and offset < start:
+                result.append(offset + delta)
+                offset = next(old, None)
+            while offset is not None and offset < end:
+                offset = next(old, None)
+            result += [start + delta + added for added in astral_offsets(text)]
+            delta += len(text) - (end - start)
+        while offset is not None:
+            result.append(offset + delta)
+            offset = next(old, None)
+        return result
+
+    def utf16_length(self):
+        """Return the length of the text in UTF-16 code units."""
+        return len(self) + len(self._astral)
+
+    def to_utf16(self, position):
+        """Convert a string index to the UTF-16 position QTextDocument uses."""
+        return position + bisect.bisect_left(self._astral, position)
+
+    def from_utf16(self, position):
+        """Convert a UTF-16 position to a string index; one inside a surrogate pair maps past its character."""
+        if not self._astral:
+            return position
+        astral = self._astral
+        # The astral character ``i`` starts at UTF-16 position ``astral[i] + i``.
+        return position - bisect.bisect_left(range(len(astral)), position, key=lambda i: astral[i] + i + 1)
+
+    def spans(self, start=0, end=None):
+        """Yield ``(buffer, lo, hi)`` triples covering the text between ``start`` and ``end``."""
+        end = len(self) if end is None else min(end, len(self))
+        # Descend to the piece containing ``start``, stacking (node, position) for pieces still to visit.
+        stack = []
+        node = self._root
+        offset = 0
+        while node is not None:
+            piece_start = offset + _size(node.left)
+            if start < piece_start:
+                stack.append((node, piece_start))
+                node = node.left
+            elif start < piece_start + node.length:
+                stack.append((node, piece_start))
+                break
+            else:
+                offset = piece_start + node.length
+                node = node.right
+        while stack:
+            node, piece_start = stack.pop()
+            if piece_start >= end:
+                return
+            lo = node.start + max(0, start - piece_start)
+            hi = node.start + min(node.length, end - piece_start)
+            yield self.buffers[node.buffer], lo, hi
+            offset = piece_start + node.length
+            node = node.right
+            while node is not None:
+                stack.append((node, offset + _size(node.left)))
+                node = node.left
+
+    def chunks(self, start=0, end=None):
+        """Yield the text between ``start`` and ``end`` as slices of the underlying buffers."""
+        for buffer, lo, hi in self.spans(start, end):
+            yield buffer if lo == 0 and hi == len(buffer) else buffer[lo:hi]
+
+    def snapshot(self):
+        """Return the current spans as a list that stays valid while the table keeps changing.
+
+        Buffers are immutable strings (add segments are replaced, never mutated), so the
+        snapshot costs O(pieces) and copies no text; it can be handed to another thread.
+        """
+        return list(self.spans())
+
+    def text(self, start=0, end=None):
+        """Return the text between ``start`` and ``end`` as a single string."""
+        return "".join(self.chunks(start, end))
+
+    def piece_count(self):
+        """Return the number of pieces, mainly for diagnostics."""
+        return sum(1 for _ in self._pieces(self._root))
+
+    def _pieces(self, node):
+        stack = []
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    @staticmethod
+    def _last_piece(node):
+        while node is not None and node.right is not None:
+            node = node.right
+        return node
+
+    @staticmethod
+    def _extend_last_piece(node, length):
+        while node is not None:
+            node.length += length if node.right is None else 0
+            node.size += length
+            node = node.right
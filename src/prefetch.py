@@ -0,0 +1,31 @@
+import threading
+
+PREFETCH_CHUNK_SIZE = 1024 * 1024
+# Only the start of bigger files is read, so huge files do not evict the rest of the page cache.
+MAX_PREFETCH_SIZE = 256 * 1024 * 1024
+
+
+def prefetch_files(paths):
+    """Read files into the OS page cache on a background thread.
+
+    Started before Qt is imported, so that disk reads overlap with Qt's startup and
+    the FileLoader threads later read from memory.
+    """
+    paths = list(paths)
+    if paths:
+        threading.Thread(target=_read_files, args=(paths,), name="prefetch", daemon=True).start()
+
+
+def _read_files(paths):
+    buffer = bytearray(PREFETCH_CHUNK_SIZE)
+    for path in paths:
+        try:
+            with open(path, "rb", buffering=0) as file:
+                done = 0
+                while done < MAX_PREFETCH_SIZE:
+                    read = file.readinto(buffer)
+                    if not read:
+                        break
+                    done += read
+        except OSError:
+            continue
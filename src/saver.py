@@ -0,0 +1,114 @@
+import codecs
+import os
+import shutil
+import tempfile
+
+from PySide6.QtCore import QThread, Signal
+
+import tracing
+from compression import open_writer
+from undo_store import content_hash
+
+WRITE_CHUNK_SIZE = 1024 * 1024
+
+
+def _read_umask():
+    # os.umask can only be read by setting it, so this runs once, at import on the main thread,
+    # rather than in the workers where another thread could create a file in between.
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# mkstemp creates files readable by their owner only; new files get the permissions open() would give them.
+NEW_FILE_MODE = 0o666 & ~_read_umask()
+
+
+class FileSaver(QThread):
+    """Worker thread that writes a piece-table snapshot to a temp file and renames it over the target.
+
+    A target named like a compressed file is written compressed in its format. A
+    symlinked target is resolved, so the file it points to is replaced rather than
+    the link.
+    """
+
+    progress = Signal(int, int)
+    saved = Signal()
+    failed = Signal(str)
+
+    def __init__(self, file_path, spans, encoding="utf-8", newline=os.linesep, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.spans = spans
+        self.encoding = encoding
+        # Line break written for each "\n" of the document.
+        self.newline = newline
+        # Hash of the bytes written before compression, set once the file has been saved.
+        self.content_hash = None
+
+    def cancel(self):
+        """Ask the worker to stop; the target file is left untouched."""
+        self.requestInterruption()
+
+    @tracing.traced("save file", "io")
+    def run(self):
+        """Stream the spans to disk, fsync and atomically replace the target."""
+        target = os.path.realpath(self.file_path)
+        directory = os.path.dirname(target)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(target)}.", suffix=".tmp")
+        try:
+            total = sum(hi - lo for _, lo, hi in self.spans)
+            done = 0
+            # Encoded here rather than by a text-mode file so the bytes can be hashed on the way out.
+            encoder = codecs.getincrementalencoder(self.encoding)()
+            digest = content_hash()
+            with os.fdopen(fd, "wb") as file:
+                stream = open_writer(file, self.file_path)
+                for buffer, lo, hi in self.spans:
+                    # Slice large original buffers piecewise so no full copy of the document is made.
+                    for start in range(lo, hi, WRITE_CHUNK_SIZE):
+                        if self.isInterruptionRequested():
+                            raise InterruptedError("Save cancelled")
+                        end = min(start + WRITE_CHUNK_SIZE, hi)
+                        text = buffer[start:end]
+                        if self.newline != "\n":
+                            text = text.replace("\n", self.newline)
+                        data = encoder.encode(text)
+                        digest.update(data)
+                        stream.write(data)
+                        done += end - start
+                        self.progress.emit(done, total)
+                data = encoder.encode("", final=True)
+                digest.update(data)
+                stream.write(data)
+                if stream is not file:
+                    stream.close()
+                with tracing.span("fsync", "io"):
+                    file.flush()
+                    os.fsync(file.fileno())
+            if os.path.exists(target):
+                shutil.copymode(target, temp_path)
+            else:
+                os.chmod(temp_path, NEW_FILE_MODE)
+            os.replace(temp_path, target)
+            self._fsync_directory(directory)
+            self.content_hash = digest.digest()
+            self.saved.emit()
+        except Exception as e:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            self.failed.emit(str(e))
+
+    @staticmethod
+    def _fsync_directory(directory):
+        """Persist the rename itself where the platform allows opening directories."""
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
@@ -0,0 +1,134 @@
+import bisect
+import re
+
+from PySide6.QtCore import QThread, Signal
+
+from piece_table import astral_offsets
+
+SEARCH_CHUNK_SIZE = 1024 * 1024
+
+
+def iter_text_chunks(spans, chunk_size=SEARCH_CHUNK_SIZE):
+    """Yield ``(offset, text)`` chunks of roughly ``chunk_size`` characters from piece-table spans."""
+    offset = 0
+    parts = []
+    length = 0
+    for buffer, lo, hi in spans:
+        while lo < hi:
+            end = min(hi, lo + chunk_size - length)
+            parts.append(buffer[lo:end])
+            length += end - lo
+            lo = end
+            if length >= chunk_size:
+                yield offset, "".join(parts)
+                offset += length
+                parts = []
+                length = 0
+    if parts:
+        yield offset, "".join(parts)
+
+
+def compile_query(query, regex=False, case_sensitive=False):
+    """Compile a find query; literal queries are escaped so one code path can expand replacements."""
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    return re.compile(query if regex else re.escape(query), flags)
+
+
+class TextSearch(QThread):
+    """Worker thread that scans a piece-table snapshot and streams match positions back.
+
+    Case-sensitive literal queries use ``str.find``, whose CPython implementation is a
+    Boyer-Moore-Horspool style skip search; everything else uses the compiled regex.
+    Literal matches may span chunk boundaries (an overlap of ``len(query) - 1``
+    characters is carried over); regex chunks are cut at line ends, so a regex match
+    can only span lines inside one chunk. When ``replacement`` is given, each match is
+    reported with its expanded replacement text.
+
+    Match positions are reported in UTF-16 code units, as QTextDocument counts them,
+    rather than as indices into the snapshot's strings.
+    """
+
+    matches_found = Signal(list)
+
+    def __init__(self, spans, query, regex=False, case_sensitive=False, replacement=None, parent=None):
+        super().__init__(parent)
+        self.spans = spans
+        self.query = query
+        self.regex = regex
+        self.case_sensitive = case_sensitive
+        if replacement is not None and not regex:
+            # Literal replacements must not be interpreted as group references by ``match.expand``.
+            replacement = replacement.replace("\\", "\\\\")
+        self.replacement = replacement
+        self.error = ""
+
+    def run(self):
+        """Search chunk by chunk, emitting one batch of matches per chunk."""
+        try:
+            pattern = compile_query(self.query, self.regex, self.case_sensitive)
+        except re.error as e:
+            self.error = str(e)
+            return
+        literal = self.query if self.case_sensitive and not self.regex and self.replacement is None else None
+        carried = ""
+        # UTF-16 position of the start of ``text``.
+        base = 0
+        chunks = iter_text_chunks(self.spans)
+        chunk = next(chunks, None)
+        while chunk is not None and not self.isInterruptionRequested():
+            _, text = chunk
+            chunk = next(chunks, None)
+            text = carried + text
+            if chunk is None:
+                limit = len(text)
+            elif self.regex:
+                # Leave the last, possibly incomplete, line for the next chunk.
+                limit = text.rfind("\n") + 1
+            else:
+                limit = len(text) - len(self.query) + 1
+            if literal is not None:
+                matches, resume = self._find_literal(literal, text, limit)
+            else:
+                matches, resume = self._find_pattern(pattern, text, limit)
+            wide = astral_offsets(text)
+            if matches:
+                self.matches_found.emit(self._document_positions(matches, wide, base))
+            carried = text[resume:]
+            base += resume + bisect.bisect_left(wide, resume)
+
+    @staticmethod
+    def _document_positions(matches, wide, base):
+        """Convert match indices into a text to UTF-16 positions, given its non-BMP character indices."""
+        if not wide:
+            return [(base + start, base + end, replacement) for start, end, replacement in matches]
+        return [
+            (base + start + bisect.bisect_left(wide, start), base + end + bisect.bisect_left(wide, end), replacement)
+            for start, end, replacement in matches
+        ]
+
+    @staticmethod
+    def _find_literal(query, text, limit):
+        """Return literal matches starting before ``limit`` and where scanning should resume."""
+        matches = []
+        resume = max(0, limit)
+        position = text.find(query, 0, limit + len(query) - 1)
+        while position >= 0:
+            resume = position + len(query)
+            matches.append((position, resume, None))
+            position = text.find(query, resume, limit + len(query) - 1)
+        return matches, max(resume, limit)
+
+    def _find_pattern(self, pattern, text, limit):
+        """Return regex matches starting before ``limit`` and where scanning should resume."""
+        matches = []
+        resume = max(0, limit)
+        for match in pattern.finditer(text):
+            if match.start() >= limit:
+                break
+            resume = max(resume, match.end())
+            if match.end() == match.start():
+                # Empty matches (e.g. ``^``) are not useful to highlight or replace.
+                continue
+            replacement = match.expand(self.replacement) if self.replacement is not None else None
+            matches.append((match.start(), match.end(), replacement))
+        return matches, resume
@@ -0,0 +1,44 @@
+import json
+import os
+import tempfile
+
+from app_paths import data_directory
+
+SESSION_VERSION = 1
+
+
+def default_session_path():
+    """Return the location of the session file in the user's application data directory."""
+    return os.path.join(data_directory(), "session.json")
+
+
+def load_session(session_path):
+    """Return the saved session, or None if there is none or it cannot be read.
+
+    A session is ``{"documents": [{"path", "cursor", "scroll", "read_only", "encoding"}, ...],
+    "current": int, "show_line_numbers": bool}``. ``scroll`` is the line at the top in large
+    file mode, and ``encoding`` is None when it is detected from the file.
+    """
+    try:
+        with open(session_path, encoding="utf-8") as file:
+            session = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(session, dict) or session.get("version") != SESSION_VERSION:
+        return None
+    return session
+
+
+def save_session(session_path, session):
+    """Write the session to a temp file and rename it over the old one, so a crash keeps the last session."""
+    directory = os.path.dirname(os.path.abspath(session_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".session.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(dict(session, version=SESSION_VERSION), file)
+        os.replace(temp_path, session_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
@@ -0,0 +1,104 @@
+import json
+import os
+import socket
+import stat
+import tempfile
+
+# Only the standard library is imported here, so handing files to a running editor
+# does not pay for loading Qt.
+
+HAND_OFF_TIMEOUT = 5.0
+
+
+def server_name():
+    """Return the per-user name of the local socket a running editor listens on.
+
+    On POSIX this is the path of a Unix domain socket, which QLocalServer accepts as a
+    full server name; on Windows it is a named pipe name. Without ``XDG_RUNTIME_DIR``
+    the socket is kept in a directory under the temp directory that only the user can
+    enter, so other users cannot put their own socket in its place. Raises OSError if
+    that directory cannot be created or is not private.
+    """
+    if os.name == "nt":
+        return f"gapp-text-editor-{os.environ.get('USERNAME', 'user')}"
+    directory = os.environ.get("XDG_RUNTIME_DIR")
+    if not directory:
+        directory = _private_directory(os.path.join(tempfile.gettempdir(), f"gapp-text-editor-{os.getuid()}"))
+    return os.path.join(directory, f"gapp-text-editor-{os.getuid()}.sock")
+
+
+def _private_directory(path):
+    """Create ``path`` readable by the user only, or check that the existing one is."""
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    # Another user may have created it first, or put a symlink there.
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) & 0o077:
+        raise PermissionError(f"Not a private directory: {path}")
+    return path
+
+
+def encode_request(files, read_only=False, encoding=None):
+    """Encode ``[(path, line), ...]`` and open options as one newline-terminated JSON message with absolute paths."""
+    request = {
+        "open": [[os.path.abspath(path), line] for path, line in files],
+        "read_only": read_only,
+        "encoding": encoding,
+    }
+    return (json.dumps(request) + "\n").encode("utf-8")
+
+
+def decode_request(message):
+    """Return the ``([(path, line), ...], options)`` of a request, skipping malformed entries.
+
+    ``options`` holds the ``read_only`` and ``encoding`` keyword arguments for opening the files.
+    """
+    request = json.loads(message.decode("utf-8"))
+    if not isinstance(request, dict):
+        return [], {}
+    files = [
+        (entry[0], entry[1] if isinstance(entry[1], int) else None)
+        for entry in request.get("open", [])
+        if isinstance(entry, list) and len(entry) == 2 and isinstance(entry[0], str)
+    ]
+    encoding = request.get("encoding")
+    options = {
+        "read_only": request.get("read_only") is True,
+        "encoding": encoding if isinstance(encoding, str) else None,
+    }
+    return files, options
+
+
+def hand_off(files, read_only=False, encoding=None, timeout=HAND_OFF_TIMEOUT):
+    """Send files to a running editor; return whether one accepted them.
+
+    With no files the running editor just raises its window.
+    """
+    message = encode_request(files, read_only, encoding)
+    if os.name == "nt":
+        return _hand_off_named_pipe(message, timeout)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(timeout)
+            connection.connect(server_name())
+            connection.sendall(message)
+            return connection.recv(16).startswith(b"ok")
+    except OSError:
+        return False
+
+
+def _hand_off_named_pipe(message, timeout):
+    # Named pipes are not reachable through the socket module, so use Qt's client there.
+    from PySide6.QtNetwork import QLocalSocket
+
+    connection = QLocalSocket()
+    connection.connectToServer(server_name())
+    if not connection.waitForConnected(int(timeout * 1000)):
+        return False
+    connection.write(message)
+    connection.waitForBytesWritten(int(timeout * 1000))
+    accepted = connection.waitForReadyRead(int(timeout * 1000)) and bytes(connection.readAll()).startswith(b"ok")
+    connection.disconnectFromServer()
+    return accepted
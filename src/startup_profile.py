@@ -0,0 +1,33 @@
+import time
+
+from PySide6.QtCore import QEvent, QObject, QTimer
+
+
+class StartupProfile(QObject):
+    """Records when each startup phase ends and prints a breakdown after the first paint."""
+
+    def __init__(self, started_at, parent=None):
+        super().__init__(parent)
+        self._marks = [("start", started_at)]
+
+    def mark(self, phase, at=None):
+        """Record that ``phase`` ended at ``at``, or now."""
+        self._marks.append((phase, time.perf_counter() if at is None else at))
+
+    def report_after_first_paint(self, widget):
+        """Print the breakdown once ``widget`` has painted for the first time."""
+        widget.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint:
+            watched.removeEventFilter(self)
+            # The timer fires once control is back in the event loop, after this paint.
+            QTimer.singleShot(0, self._report)
+        return False
+
+    def _report(self):
+        self.mark("first paint")
+        print("Startup profile:")
+        for (_, previous), (phase, at) in zip(self._marks, self._marks[1:]):
+            print(f"  {phase:<14}{(at - previous) * 1000:8.1f} ms")
+        print(f"  {'total':<14}{(self._marks[-1][1] - self._marks[0][1]) * 1000:8.1f} ms", flush=True)
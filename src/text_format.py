@@ -0,0 +1,192 @@
+import codecs
+import os
+
+from compression import compression_suffix, open_reader
+
+# Bytes read from the start of the file, and from each of the evenly spaced samples after it.
+HEAD_SAMPLE_SIZE = 64 * 1024
+SAMPLE_SIZE = 16 * 1024
+SAMPLE_COUNT = 3
+# Share of NUL bytes in one half of the byte pairs that marks BOM-less UTF-16.
+UTF16_NUL_RATIO = 0.3
+
+NEWLINE_NAMES = {"\n": "LF", "\r\n": "CRLF", "\r": "CR"}
+
+# Longest first, so the UTF-32-LE BOM is not taken for UTF-16-LE.
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32-le-sig"),
+    (codecs.BOM_UTF32_BE, "utf-32-be-sig"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16-le-sig"),
+    (codecs.BOM_UTF16_BE, "utf-16-be-sig"),
+]
+
+
+def _bom_codec(name, base, bom):
+    """Return a codec for ``base`` that writes ``bom`` first and drops it when reading, like utf-8-sig.
+
+    The plain utf-16 and utf-32 codecs write the BOM in the platform's byte order,
+    which would not keep a file's byte order when it is saved.
+    """
+    info = codecs.lookup(base)
+
+    def encode(text, errors="strict"):
+        data, consumed = info.encode(text, errors)
+        return bom + data, consumed
+
+    def decode(data, errors="strict"):
+        text, consumed = info.decode(data, errors)
+        return text.removeprefix("\ufeff"), consumed
+
+    class IncrementalEncoder(codecs.IncrementalEncoder):
+        def __init__(self, errors="strict"):
+            super().__init__(errors)
+            self._encoder = info.incrementalencoder(errors)
+            self._first = True
+
+        def encode(self, text, final=False):
+            data = self._encoder.encode(text, final)
+            if self._first:
+                self._first = False
+                data = bom + data
+            return data
+
+        def reset(self):
+            self._encoder.reset()
+            self._first = True
+
+    class IncrementalDecoder(codecs.IncrementalDecoder):
+        def __init__(self, errors="strict"):
+            super().__init__(errors)
+            self._decoder = info.incrementaldecoder(errors)
+            self._first = True
+
+        def decode(self, data, final=False):
+            text = self._decoder.decode(data, final)
+            if self._first and text:
+                self._first = False
+                text = text.removeprefix("\ufeff")
+            return text
+
+        def reset(self):
+            self._decoder.reset()
+            self._first = True
+
+        def getstate(self):
+            return self._decoder.getstate()
+
+        def setstate(self, state):
+            self._decoder.setstate(state)
+
+    return codecs.CodecInfo(
+        encode, decode, incrementalencoder=IncrementalEncoder, incrementaldecoder=IncrementalDecoder, name=name
+    )
+
+
+_BOM_CODECS = {
+    name.replace("-", "_"): (name, name.removesuffix("-sig"), bom) for bom, name in _BOMS if name != "utf-8-sig"
+}
+
+
+def _search_codec(name):
+    if name in _BOM_CODECS:
+        return _bom_codec(*_BOM_CODECS[name])
+    return None
+
+
+codecs.register(_search_codec)
+
+
+def _read_samples(file_path):
+    """Return the head of the file and up to ``SAMPLE_COUNT`` chunks spread over the rest of it.
+
+    Only the head of a compressed file is read, as seeking in it means decompressing up to there.
+    """
+    if compression_suffix(file_path):
+        with open(file_path, "rb") as raw, open_reader(raw, file_path) as file:
+            return file.read(HEAD_SAMPLE_SIZE), []
+    with open(file_path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        head = file.read(HEAD_SAMPLE_SIZE)
+        samples = []
+        rest = size - len(head) - SAMPLE_SIZE
+        if rest > 0:
+            for index in range(1, SAMPLE_COUNT + 1):
+                # Kept 4-byte aligned so UTF-16 and UTF-32 samples start on a code unit; the last one reaches the end.
+                file.seek((len(head) + rest * index // SAMPLE_COUNT) & ~3)
+                samples.append(file.read(SAMPLE_SIZE + 3))
+    return head, samples
+
+
+def _is_utf8(data, at_start):
+    if not at_start:
+        # Skip the continuation bytes of a character cut by the sample's start.
+        data = data[next((i for i, byte in enumerate(data[:4]) if byte & 0xC0 != 0x80), 0) :]
+    try:
+        # Not final, so a character cut by the sample's end is not an error.
+        codecs.getincrementaldecoder("utf-8")().decode(data)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _guess_encoding(head, samples):
+    for bom, name in _BOMS:
+        if head.startswith(bom):
+            return name
+    pairs = len(head) // 2
+    if pairs:
+        even = head[0 : pairs * 2 : 2].count(0)
+        odd = head[1 : pairs * 2 : 2].count(0)
+        if odd > pairs * UTF16_NUL_RATIO and even < pairs * 0.01:
+            return "utf-16-le"
+        if even > pairs * UTF16_NUL_RATIO and odd < pairs * 0.01:
+            return "utf-16-be"
+    if _is_utf8(head, True) and all(_is_utf8(sample, False) for sample in samples):
+        return "utf-8"
+    try:
+        for data in (head, *samples):
+            data.decode("cp1252")
+    except UnicodeDecodeError:
+        # Latin-1 decodes every byte, so the file at least saves back unchanged.
+        return "latin-1"
+    return "cp1252"
+
+
+def _guess_newline(texts):
+    counts = {"\r\n": 0, "\r": 0, "\n": 0}
+    for text in texts:
+        crlf = text.count("\r\n")
+        counts["\r\n"] += crlf
+        counts["\r"] += text.count("\r") - crlf
+        counts["\n"] += text.count("\n") - crlf
+    newline = max(counts, key=counts.get)
+    return newline if counts[newline] else os.linesep
+
+
+def is_ascii_compatible(encoding):
+    """Return whether ``encoding`` writes ASCII text, and so line breaks, as the same single bytes.
+
+    Large file mode indexes lines by searching the raw bytes for ``b"\\n"``, which
+    only works for such encodings; UTF-16 and UTF-32 text must be decoded first.
+    """
+    encoder = codecs.getincrementalencoder(encoding)()
+    # The first call writes any BOM, which only appears at the start of the file.
+    encoder.encode("")
+    return encoder.encode("\r\n") == b"\r\n"
+
+
+def detect_text_format(file_path, encoding=None):
+    """Return ``(encoding, newline)`` of a file, guessing the encoding unless it is given.
+
+    Only the head of the file and a few chunks spread over the rest are read, so the
+    cost does not grow with the file's size. A BOM decides the encoding; otherwise
+    UTF-16 is recognized by its NUL bytes, then UTF-8 is tried before Windows-1252
+    and Latin-1. The newline is the most common line break in the samples, or the
+    platform's when there is none.
+    """
+    head, samples = _read_samples(file_path)
+    if encoding is None:
+        encoding = _guess_encoding(head, samples)
+    texts = [data.decode(encoding, errors="replace") for data in (head, *samples)]
+    return encoding, _guess_newline(texts)
@@ -0,0 +1,132 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Spans are recorded from worker threads as well as the GUI thread, so this module
+# sticks to the standard library and a lock around the ring buffer.
+
+# Spans kept while recording; older ones are dropped first.
+DEFAULT_CAPACITY = 200_000
+
+_events = None
+_thread_names = {}
+_lock = threading.Lock()
+
+
+def is_recording():
+    """Return whether spans are being recorded."""
+    return _events is not None
+
+
+def start(capacity=DEFAULT_CAPACITY):
+    """Start recording spans into a ring buffer of ``capacity`` events, discarding earlier ones."""
+    global _events
+    with _lock:
+        _events = deque(maxlen=capacity)
+        _thread_names.clear()
+
+
+def stop():
+    """Stop recording and drop the recorded spans."""
+    global _events
+    with _lock:
+        _events = None
+
+
+class _Span:
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        thread_id = threading.get_ident()
+        with _lock:
+            if _events is None:
+                return
+            if thread_id not in _thread_names:
+                _thread_names[thread_id] = threading.current_thread().name
+            _events.append((self.name, self.category, self.start, end - self.start, thread_id, self.args))
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, category, **args):
+    """Return a context manager recording its body as a span; it does nothing when not recording."""
+    if _events is None:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def traced(name, category):
+    """Decorate a function so each call is recorded as a span while recording."""
+
+    def decorate(function):
+        # Qt drops signal arguments a slot does not take, but it cannot see through the
+        # wrapper, so the wrapper drops them itself.
+        code = function.__code__
+        max_args = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _events is None:
+                return function(*args[:max_args], **kwargs)
+            with _Span(name, category, None):
+                return function(*args[:max_args], **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def export(path):
+    """Write the recorded spans to ``path`` as Chrome Trace Event JSON; return the number of spans.
+
+    The file loads in chrome://tracing and in Perfetto.
+    """
+    with _lock:
+        events = list(_events or ())
+        thread_names = dict(_thread_names)
+    pid = os.getpid()
+    trace_events = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}}
+        for thread_id, thread_name in thread_names.items()
+    ]
+    for name, category, start, duration, thread_id, args in events:
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start * 1_000_000,
+            "dur": duration * 1_000_000,
+            "pid": pid,
+            "tid": thread_id,
+        }
+        if args:
+            event["args"] = args
+        trace_events.append(event)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, file)
+    return len(events)
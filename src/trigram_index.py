@@ -0,0 +1,262 @@
+import array
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from PySide6.QtCore import QThread, Signal
+
+from app_paths import cache_directory
+from folder_search import MAX_FILES_IN_FLIGHT, iter_files
+
+TRIGRAM_CHUNK_SIZE = 4 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    trigram INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    PRIMARY KEY (trigram, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+"""
+
+
+def default_index_path():
+    """Return the location of the shared trigram index in the user's cache directory."""
+    return os.path.join(cache_directory(), "trigrams.sqlite")
+
+
+def file_trigrams(path):
+    """Return ``(path, mtime_ns, size, trigrams)`` for a file, with trigrams of its lowercased bytes as ints.
+
+    Runs in a pool process. Trigrams across line breaks are included, which only
+    makes the candidate set larger, never smaller.
+    """
+    try:
+        stat = os.stat(path)
+        trigrams = set()
+        tail = b""
+        with open(path, "rb") as file:
+            while chunk := file.read(TRIGRAM_CHUNK_SIZE):
+                data = tail + chunk.lower()
+                _add_trigrams(trigrams, data)
+                tail = data[-2:]
+        return path, stat.st_mtime_ns, stat.st_size, sorted(trigrams)
+    except OSError:
+        return path, 0, 0, None
+
+
+def _add_trigrams(trigrams, data):
+    """Add the trigrams of ``data`` to the set as ``(a << 16) | (b << 8) | c``.
+
+    Making a Python object per byte position is what costs, so the data is first cut
+    into 8-byte words at C speed, starting at offsets 0 and 6 so that every trigram
+    lies within the first six positions of some word. Text repeats a lot, so there
+    are far fewer distinct words than positions; only those are split into trigrams,
+    again with slicing, by laying the bytes of each trigram out as a native uint32.
+    """
+    words = set()
+    for start in (0, 6):
+        words.update(memoryview(data[start : start + (len(data) - start) // 8 * 8]).cast("Q"))
+    packed = array.array("Q", words).tobytes()
+    # Where the first, second and third byte of a trigram go in a uint32 that reads as (a << 16) | (b << 8) | c.
+    places = (2, 1, 0) if sys.byteorder == "little" else (1, 2, 3)
+    layout = bytearray(4 * len(words))
+    for offset in range(6):
+        for index, place in enumerate(places):
+            layout[place::4] = packed[offset + index :: 8]
+        trigrams.update(memoryview(layout).cast("I"))
+    # The trigrams past the last whole word.
+    end = data[-9:]
+    trigrams.update((a << 16) | (b << 8) | c for a, b, c in zip(end, end[1:], end[2:]))
+
+
+def query_trigrams(query, regex=False):
+    """Return the trigrams every match of the query must contain, or None if it cannot be narrowed.
+
+    For regular expressions only runs of literal characters at the top level of the
+    pattern are used, and patterns with top-level alternation are not narrowed.
+    """
+    literals = _required_literals(query) if regex else [query]
+    if literals is None:
+        return None
+    trigrams = set()
+    for literal in literals:
+        data = literal.encode("utf-8").lower()
+        trigrams.update(
+            (a << 16) | (b << 8) | c
+            for a, b, c in zip(data, data[1:], data[2:])
+            # bytes.lower() only folds ASCII, so non-ASCII trigrams could miss case-insensitive matches.
+            if a < 0x80 and b < 0x80 and c < 0x80
+        )
+    return trigrams or None
+
+
+def is_fresh(indexed, path):
+    """Whether ``path`` is in ``indexed`` with its current mtime and size."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    return indexed.get(path) == (stat.st_mtime_ns, stat.st_size)
+
+
+def filter_candidates(index_path, query, regex, paths):
+    """Yield the paths that may contain ``query``.
+
+    Unindexed and stale files are always kept; up-to-date files are kept only if the
+    index lists every trigram of the query for them.
+    """
+    trigrams = query_trigrams(query, regex)
+    if trigrams is None:
+        yield from paths
+        return
+    index = TrigramIndex(index_path)
+    try:
+        indexed = index.indexed_files()
+        candidates = index.candidates(trigrams)
+    finally:
+        index.close()
+    for path in map(os.path.abspath, paths):
+        if path in candidates or not is_fresh(indexed, path):
+            yield path
+
+
+def _required_literals(pattern):
+    try:
+        parsed = re._parser.parse(pattern)
+    except re.error:
+        return None
+    literals = []
+    run = []
+    for op, argument in parsed:
+        if op is re._constants.BRANCH:
+            return None
+        if op is re._constants.LITERAL:
+            run.append(chr(argument))
+            continue
+        if run:
+            literals.append("".join(run))
+            run = []
+    if run:
+        literals.append("".join(run))
+    return literals
+
+
+class TrigramIndex:
+    """On-disk inverted index from byte trigrams to files, keyed by path, mtime and size."""
+
+    def __init__(self, index_path):
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        self._connection = sqlite3.connect(index_path)
+        # WAL lets searches read the index while the indexer thread writes to it.
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        self._connection.close()
+
+    def indexed_files(self):
+        """Return ``{path: (mtime_ns, size)}`` for every indexed file."""
+        rows = self._connection.execute("SELECT path, mtime_ns, size FROM files")
+        return {path: (mtime_ns, size) for path, mtime_ns, size in rows}
+
+    def store(self, path, mtime_ns, size, trigrams):
+        """Replace the postings of one file."""
+        with self._connection:
+            row = self._connection.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+            if row:
+                self._connection.execute("DELETE FROM postings WHERE file_id = ?", row)
+                file_id = row[0]
+                self._connection.execute(
+                    "UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?", (mtime_ns, size, file_id)
+                )
+            else:
+                cursor = self._connection.execute(
+                    "INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)", (path, mtime_ns, size)
+                )
+                file_id = cursor.lastrowid
+            self._connection.executemany(
+                "INSERT INTO postings (trigram, file_id) VALUES (?, ?)", ((trigram, file_id) for trigram in trigrams)
+            )
+
+    def candidates(self, trigrams):
+        """Return the set of indexed paths containing all ``trigrams``."""
+        file_ids = None
+        # Intersect the rarest postings first so the working set shrinks quickly.
+        counts = sorted(
+            (self._connection.execute("SELECT COUNT(*) FROM postings WHERE trigram = ?", (t,)).fetchone()[0], t)
+            for t in trigrams
+        )
+        for _, trigram in counts:
+            rows = self._connection.execute("SELECT file_id FROM postings WHERE trigram = ?", (trigram,))
+            ids = {file_id for (file_id,) in rows}
+            file_ids = ids if file_ids is None else file_ids & ids
+            if not file_ids:
+                return set()
+        placeholders = ",".join("?" * len(file_ids))
+        rows = self._connection.execute(f"SELECT path FROM files WHERE id IN ({placeholders})", tuple(file_ids))
+        return {path for (path,) in rows}
+
+
+class TrigramIndexer(QThread):
+    """Brings the index up to date for a directory, computing trigrams in a process pool."""
+
+    progress = Signal(int, int, float)
+
+    def __init__(self, pool, index_path, root, glob="*", parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.index_path = index_path
+        self.root = root
+        self.glob = glob
+        self.error = ""
+
+    def run(self):
+        """Index every new or changed file below the root."""
+        start = time.perf_counter()
+        files_done = 0
+        bytes_done = 0
+        pending = set()
+        index = None
+        try:
+            index = TrigramIndex(self.index_path)
+            indexed = index.indexed_files()
+            stale = (
+                path for path in map(os.path.abspath, iter_files(self.root, self.glob)) if not is_fresh(indexed, path)
+            )
+            exhausted = False
+            while not self.isInterruptionRequested():
+                while not exhausted and len(pending) < MAX_FILES_IN_FLIGHT:
+                    path = next(stale, None)
+                    if path is None:
+                        exhausted = True
+                        break
+                    pending.add(self.pool.submit(file_trigrams, path))
+                if not pending:
+                    break
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, mtime_ns, size, trigrams = future.result()
+                    if trigrams is not None:
+                        index.store(path, mtime_ns, size, trigrams)
+                    files_done += 1
+                    bytes_done += size
+                if done:
+                    self.progress.emit(files_done, bytes_done, time.perf_counter() - start)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            for future in pending:
+                future.cancel()
+            if index is not None:
+                index.close()
@@ -0,0 +1,317 @@
+import struct
+import sys
+import tempfile
+import time
+from collections import deque
+
+# Undo and redo steps may hold this many bytes in memory before the oldest are spilled or dropped.
+DEFAULT_MEMORY_LIMIT = 32 * 1024 * 1024
+# Steps spilled to the temp file beyond this are dropped, oldest first.
+DEFAULT_SPILL_LIMIT = 256 * 1024 * 1024
+# Keystrokes further apart than this start a new undo step.
+MERGE_TIMEOUT = 2.0
+
+# position, UTF-8 bytes of the removed text, UTF-8 bytes of the inserted text; both texts follow.
+_DELTA = struct.Struct("<III")
+
+
+def utf16_length(text):
+    """Return the length of ``text`` in UTF-16 code units, the unit of QTextDocument positions."""
+    return len(text) if text.isascii() else len(text.encode("utf-16-le", "surrogatepass")) // 2
+
+
+def encode_step(deltas):
+    """Encode ``[(position, removed, inserted), ...]`` compactly as bytes."""
+    parts = []
+    for position, removed, inserted in deltas:
+        removed = removed.encode("utf-8", "surrogatepass")
+        inserted = inserted.encode("utf-8", "surrogatepass")
+        parts += (_DELTA.pack(position, len(removed), len(inserted)), removed, inserted)
+    return b"".join(parts)
+
+
+def decode_step(data):
+    """Decode bytes from ``encode_step``."""
+    deltas = []
+    offset = 0
+    while offset < len(data):
+        position, removed_length, inserted_length = _DELTA.unpack_from(data, offset)
+        offset += _DELTA.size
+        removed = data[offset : offset + removed_length].decode("utf-8", "surrogatepass")
+        offset += removed_length
+        inserted = data[offset : offset + inserted_length].decode("utf-8", "surrogatepass")
+        offset += inserted_length
+        deltas.append((position, removed, inserted))
+    return deltas
+
+
+class UndoHistory:
+    """Undo and redo stacks of compact edit deltas with a memory cap.
+
+    A step is a list of ``(position, removed, inserted)`` deltas applied in order,
+    stored encoded with ``encode_step``. Consecutive typed characters and
+    consecutive deletions are merged into one open step until the run is broken.
+    Once the steps use more than ``memory_limit`` bytes the oldest undo steps are
+    moved to a temp file when ``spill`` is set, or dropped otherwise.
+
+    Steps saved by an earlier session can be attached with ``set_base_loader``; they
+    are read only when undo or redo first runs out of steps recorded in this one.
+    """
+
+    def __init__(self, memory_limit=DEFAULT_MEMORY_LIMIT, spill=True, spill_limit=DEFAULT_SPILL_LIMIT):
+        self.memory_limit = memory_limit
+        self.spill = spill
+        self.spill_limit = spill_limit
+        self._spill_file = None
+        self._clear_state()
+
+    def _clear_state(self):
+        self._undo = deque()
+        self._redo = deque()
+        self._memory = 0
+        # ``(offset, length)`` of the steps in the spill file, oldest first.
+        self._spilled = []
+        self._spill_size = 0
+        # The open run: ``[position, removed, inserted, last_time]``, still being extended.
+        self._run = None
+        self._group = None
+        # Steps forgotten below the oldest one kept, so depths stay comparable with ``_clean``.
+        self._dropped = 0
+        self._clean = 0
+        self._base_loader = None
+        # Whether anything was recorded, undone or redone since the history was cleared.
+        self._changed = False
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def clear(self):
+        """Forget all history, e.g. after loading a new document."""
+        self._clear_state()
+
+    def set_base_loader(self, loader):
+        """Attach a callable returning ``(undo_steps, redo_steps)`` saved for the document as it is now, or None."""
+        self._base_loader = loader
+
+    def _load_base(self):
+        """Put the saved steps below the oldest step of this session; only valid while that is still reachable."""
+        loader, self._base_loader = self._base_loader, None
+        if loader is None or self._dropped or self._spilled or self._undo or self._run is not None:
+            return
+        saved = loader()
+        if not saved:
+            return
+        undo_steps, redo_steps = saved
+        if self._clean >= 0:
+            self._clean += len(undo_steps)
+        # Saved redo steps continue from the loaded document; edits made since then replace them.
+        if not self._redo:
+            self._redo.extend(redo_steps)
+            self._memory += sum(sys.getsizeof(data) for data in redo_steps)
+        self._undo.extend(undo_steps)
+        self._memory += sum(sys.getsizeof(data) for data in undo_steps)
+        self._enforce_limit()
+
+    def export_steps(self):
+        """Return ``(undo_steps, redo_steps)`` encoded, oldest undo step first, or None if nothing changed.
+
+        Steps saved by an earlier session that were never loaded are included below this session's.
+        """
+        if not self._changed:
+            return None
+        self._close_run()
+        undo_steps = []
+        if self._base_loader is not None and not self._dropped:
+            saved = self._base_loader()
+            if saved:
+                undo_steps += saved[0]
+        for offset, length in self._spilled:
+            self._spill_file.seek(offset)
+            undo_steps.append(self._spill_file.read(length))
+        undo_steps += self._undo
+        return undo_steps, list(self._redo)
+
+    def _depth(self):
+        return self._dropped + len(self._spilled) + len(self._undo) + (self._run is not None)
+
+    def record(self, position, removed, inserted):
+        """Record that ``removed`` at ``position`` was replaced by ``inserted``."""
+        if self._group is not None:
+            self._group.append((position, removed, inserted))
+            return
+        self._changed = True
+        if self._extend_run(position, removed, inserted):
+            return
+        self._close_run()
+        self._discard_redo()
+        self._run = [position, removed, inserted, time.monotonic()]
+
+    def _extend_run(self, position, removed, inserted):
+        """Merge one typed character or one deleted character into the open run, if it continues it."""
+        run = self._run
+        now = time.monotonic()
+        if run is None or now - run[3] > MERGE_TIMEOUT:
+            return False
+        run_position, run_removed, run_inserted, _ = run
+        if not removed and not run_removed and len(inserted) == 1 and inserted != "\n":
+            # Typing: the character goes right after the run.
+            if position != run_position + utf16_length(run_inserted):
+                return False
+            run[2] = run_inserted + inserted
+        elif not inserted and not run_inserted and len(removed) == 1 and removed != "\n":
+            if position + utf16_length(removed) == run_position:
+                # Backspace: the character was just before the run.
+                run[0], run[1] = position, removed + run_removed
+            elif position == run_position:
+                # Delete: the character was just after the run.
+                run[1] = run_removed + removed
+            else:
+                return False
+        else:
+            return False
+        run[3] = now
+        return True
+
+    def _close_run(self):
+        if self._run is not None:
+            position, removed, inserted, _ = self._run
+            self._run = None
+            self._push_undo(encode_step([(position, removed, inserted)]))
+
+    def begin_group(self):
+        """Collect the edits recorded until ``end_group`` into one step."""
+        self._close_run()
+        self._group = []
+
+    def end_group(self):
+        """Finish the step started by ``begin_group``."""
+        deltas, self._group = self._group, None
+        if deltas:
+            self._changed = True
+            self._discard_redo()
+            self._push_undo(encode_step(deltas))
+
+    def mark_clean(self):
+        """Remember the current state as the one saved on disk."""
+        self._close_run()
+        self._clean = self._depth()
+
+    def is_clean(self):
+        """Whether undo or redo returned to the saved state."""
+        return self._clean == self._depth()
+
+    def can_undo(self):
+        return self._run is not None or bool(self._undo) or bool(self._spilled) or self._base_loader is not None
+
+    def can_redo(self):
+        return bool(self._redo) or (self._base_loader is not None and self._depth() == 0)
+
+    def undo(self):
+        """Pop the latest step and return its deltas, in the order they were applied; None if there is none."""
+        self._close_run()
+        if not self._undo and not self._spilled:
+            self._load_base()
+        if self._undo:
+            data = self._undo.pop()
+            self._memory -= sys.getsizeof(data)
+        elif self._spilled:
+            data = self._read_spilled()
+        else:
+            return None
+        self._changed = True
+        self._push_redo(data)
+        return decode_step(data)
+
+    def redo(self):
+        """Pop the latest undone step and return its deltas to reapply; None if there is none."""
+        if not self._redo and self._depth() == 0:
+            self._load_base()
+        if not self._redo:
+            return None
+        self._changed = True
+        data = self._redo.pop()
+        self._memory -= sys.getsizeof(data)
+        self._push_undo(data)
+        return decode_step(data)
+
+    def statistics(self):
+        """Return a dict describing the history's size, for the debug view."""
+        return {
+            "undo_steps": len(self._undo) + (self._run is not None),
+            "spilled_steps": len(self._spilled),
+            "redo_steps": len(self._redo),
+            "dropped_steps": self._dropped,
+            "memory_bytes": self.memory_usage(),
+            "spilled_bytes": self._spill_size,
+            "memory_limit": self.memory_limit,
+        }
+
+    def memory_usage(self):
+        """Return the bytes held in memory by undo and redo steps."""
+        usage = self._memory
+        if self._run is not None:
+            usage += sys.getsizeof(self._run[1]) + sys.getsizeof(self._run[2])
+        return usage
+
+    def _push_undo(self, data):
+        self._undo.append(data)
+        self._memory += sys.getsizeof(data)
+        self._enforce_limit()
+
+    def _push_redo(self, data):
+        self._redo.append(data)
+        self._memory += sys.getsizeof(data)
+        self._enforce_limit()
+
+    def _discard_redo(self):
+        if self._redo:
+            if self._clean > self._depth():
+                # The saved state was only reachable by redoing.
+                self._clean = -1
+            self._memory -= sum(sys.getsizeof(data) for data in self._redo)
+            self._redo.clear()
+
+    def _enforce_limit(self):
+        """Spill or drop the oldest undo steps, then the furthest redo steps, until under the limit."""
+        while self._memory > self.memory_limit and self._undo:
+            data = self._undo.popleft()
+            self._memory -= sys.getsizeof(data)
+            if self.spill:
+                self._spill(data)
+            else:
+                self._dropped += 1
+        while self._memory > self.memory_limit and len(self._redo) > 1:
+            self._memory -= sys.getsizeof(self._redo.popleft())
+            if self._clean > self._depth() + len(self._redo):
+                self._clean = -1
+
+    def _spill(self, data):
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(prefix="gapp-text-editor-undo-")
+        self._spill_file.seek(0, 2)
+        self._spilled.append((self._spill_file.tell(), len(data)))
+        self._spill_file.write(data)
+        self._spill_size += len(data)
+        if self._spill_size > self.spill_limit:
+            self._compact_spill_file()
+
+    def _read_spilled(self):
+        offset, length = self._spilled.pop()
+        self._spill_file.seek(offset)
+        data = self._spill_file.read(length)
+        self._spill_file.truncate(offset)
+        self._spill_size -= length
+        return data
+
+    def _compact_spill_file(self):
+        """Drop the oldest spilled steps until the file is half its limit, rewriting what is kept."""
+        while self._spilled and self._spill_size > self.spill_limit // 2:
+            self._spill_size -= self._spilled.pop(0)[1]
+            self._dropped += 1
+        old_file, self._spill_file = self._spill_file, tempfile.TemporaryFile(prefix="gapp-text-editor-undo-")
+        spilled, self._spilled = self._spilled, []
+        for offset, length in spilled:
+            old_file.seek(offset)
+            self._spilled.append((self._spill_file.tell(), length))
+            self._spill_file.write(old_file.read(length))
+        old_file.close()
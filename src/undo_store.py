@@ -0,0 +1,89 @@
+import hashlib
+import os
+import struct
+import tempfile
+
+from app_paths import data_directory
+
+UNDO_STORE_VERSION = 1
+# Saved histories are trimmed to this many bytes of steps, dropping the oldest.
+MAX_STORED_BYTES = 32 * 1024 * 1024
+
+# magic, version, number of undo steps, number of redo steps; the content hash of the
+# file the history ends at, the file's path and the steps follow.
+_HEADER = struct.Struct("<4sBII")
+_LENGTH = struct.Struct("<I")
+_MAGIC = b"GTEU"
+
+
+def default_undo_directory():
+    """Return where undo histories are kept in the user's application data directory."""
+    return os.path.join(data_directory(), "undo")
+
+
+def undo_file_path(directory, file_path):
+    """Return where the undo history of ``file_path`` is kept."""
+    key = hashlib.sha1(os.path.abspath(file_path).encode("utf-8", "surrogatepass")).hexdigest()
+    return os.path.join(directory, key + ".undo")
+
+
+def content_hash():
+    """Return a new hash object for the uncompressed bytes of a file, as computed while loading and saving it."""
+    return hashlib.blake2b(digest_size=16)
+
+
+def save_undo_history(undo_path, file_path, digest, undo_steps, redo_steps):
+    """Write encoded undo and redo steps for a file whose bytes hash to ``digest``, oldest undo step first."""
+    undo_steps = list(undo_steps)
+    total = sum(len(step) for step in undo_steps) + sum(len(step) for step in redo_steps)
+    dropped = 0
+    while dropped < len(undo_steps) and total > MAX_STORED_BYTES:
+        total -= len(undo_steps[dropped])
+        dropped += 1
+    undo_steps = undo_steps[dropped:]
+
+    path = os.path.abspath(file_path).encode("utf-8", "surrogatepass")
+    parts = [_HEADER.pack(_MAGIC, UNDO_STORE_VERSION, len(undo_steps), len(redo_steps)), digest]
+    parts += (_LENGTH.pack(len(path)), path)
+    for step in (*undo_steps, *redo_steps):
+        parts += (_LENGTH.pack(len(step)), step)
+
+    directory = os.path.dirname(os.path.abspath(undo_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".undo.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(b"".join(parts))
+        os.replace(temp_path, undo_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def load_undo_history(undo_path, file_path, digest):
+    """Return ``(undo_steps, redo_steps)`` saved for ``file_path`` with content hash ``digest``, or None.
+
+    A history saved for other contents of the file, e.g. after it was edited
+    elsewhere, or one that cannot be read, is ignored.
+    """
+    try:
+        with open(undo_path, "rb") as file:
+            data = file.read()
+        magic, version, undo_count, redo_count = _HEADER.unpack_from(data)
+        offset = _HEADER.size
+        if magic != _MAGIC or version != UNDO_STORE_VERSION or data[offset : offset + len(digest)] != digest:
+            return None
+        offset += len(digest)
+        steps = []
+        for _ in range(1 + undo_count + redo_count):
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            steps.append(data[offset : offset + length])
+            offset += length
+    except (OSError, struct.error):
+        return None
+    # The first entry is the path, guarding against hash collisions of the file name.
+    if offset > len(data) or steps[0] != os.path.abspath(file_path).encode("utf-8", "surrogatepass"):
+        return None
+    return steps[1 : 1 + undo_count], steps[1 + undo_count :]
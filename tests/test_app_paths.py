@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+from app_paths import APPLICATION_NAME, cache_directory, data_directory
+from journal import default_journal_directory
+from session import default_session_path
+from trigram_index import default_index_path
+from undo_store import default_undo_directory
+
+
+@pytest.fixture
+def named_app(qapp):
+    name = qapp.applicationName()
+    qapp.setApplicationName(APPLICATION_NAME)
+    yield qapp
+    qapp.setApplicationName(name)
+
+
+def test_state_is_kept_under_the_application_name(named_app):
+    assert os.path.basename(data_directory()) == APPLICATION_NAME
+    assert os.path.basename(cache_directory()) == APPLICATION_NAME
+    assert os.path.dirname(default_session_path()) == data_directory()
+    assert os.path.dirname(default_journal_directory()) == data_directory()
+    assert os.path.dirname(default_undo_directory()) == data_directory()
+    assert os.path.dirname(default_index_path()) == cache_directory()
@@ -0,0 +1,63 @@
+from PySide6.QtGui import QTextCursor, QTextDocument
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QPlainTextDocumentLayout
+
+from change_bus import ChangeBus
+
+
+def make_bus(text, debounce_ms=0):
+    document = QTextDocument()
+    # Without a layout the document reports no contentsChange.
+    document.setDocumentLayout(QPlainTextDocumentLayout(document))
+    document.setPlainText(text)
+    bus = ChangeBus(document, debounce_ms=debounce_ms)
+    batches = []
+    bus.contents_changed.connect(lambda first, last: batches.append((first, last)))
+    return document, bus, batches
+
+
+def insert(document, position, text):
+    cursor = QTextCursor(document)
+    cursor.setPosition(position)
+    cursor.insertText(text)
+
+
+def test_changes_in_one_tick_are_delivered_once(qapp):
+    document, _, batches = make_bus("a\nb\nc\nd\n")
+    insert(document, 2, "x")
+    insert(document, 8, "y")
+    assert batches == []
+    QTest.qWait(10)
+    assert batches == [(1, 3)]
+
+
+def test_flush_delivers_immediately_and_only_once(qapp):
+    document, bus, batches = make_bus("a\nb\n")
+    insert(document, 0, "x\ny\n")
+    bus.flush()
+    assert batches == [(0, 2)]
+    QTest.qWait(10)
+    bus.flush()
+    assert batches == [(0, 2)]
+
+
+def test_range_is_clamped_to_blocks_left_after_removal(qapp):
+    document, bus, batches = make_bus("a\nb\nc\nd\n")
+    insert(document, 8, "e\nf\n")
+    cursor = QTextCursor(document)
+    cursor.setPosition(2)
+    cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+    cursor.removeSelectedText()
+    bus.flush()
+    assert batches == [(1, 1)]
+
+
+def test_debounce_waits_for_quiet(qapp):
+    document, _, batches = make_bus("a\n", debounce_ms=50)
+    insert(document, 0, "x")
+    QTest.qWait(30)
+    insert(document, 0, "y")
+    QTest.qWait(30)
+    assert batches == []
+    QTest.qWait(100)
+    assert batches == [(0, 0)]
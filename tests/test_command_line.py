@@ -0,0 +1,34 @@
+import pytest
+
+from command_line import parse_arguments
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["-platform", "offscreen", "a.txt"],
+        ["a.txt", "--platform", "offscreen"],
+        ["-style", "fusion", "-reverse", "a.txt"],
+        ["-style=fusion", "a.txt"],
+    ],
+)
+def test_qt_options_are_not_taken_for_files(argv):
+    assert parse_arguments(argv).files == [("a.txt", None)]
+
+
+def test_line_and_goto():
+    arguments = parse_arguments(["a.txt", "+3", "b.txt", "--goto", "c.txt:7", "--readonly"])
+    assert arguments.files == [("a.txt", None), ("b.txt", 3), ("c.txt", 7)]
+    assert arguments.readonly
+
+
+def test_large_file_threshold_starts_a_new_instance():
+    arguments = parse_arguments(["--large-file-threshold", "1024", "a.txt"])
+    assert arguments.large_file_threshold == 1024
+    assert arguments.new_instance
+    assert parse_arguments(["a.txt"]).large_file_threshold is None
+
+
+def test_negative_large_file_threshold_is_rejected():
+    with pytest.raises(SystemExit):
+        parse_arguments(["--large-file-threshold", "-1"])
@@ -0,0 +1,55 @@
+import bz2
+import gzip
+import io
+import lzma
+
+import pytest
+
+from compression import compression_suffix, open_reader, open_writer, uncompressed_path
+from saver import FileSaver
+
+
+@pytest.mark.parametrize(
+    "path, suffix, plain",
+    [
+        ("notes.md.gz", ".gz", "notes.md"),
+        ("LOG.BZ2", ".bz2", "LOG"),
+        ("data.xz", ".xz", "data"),
+        ("archive.tar", None, "archive.tar"),
+        ("", None, ""),
+    ],
+)
+def test_suffixes(path, suffix, plain):
+    assert compression_suffix(path) == suffix
+    assert uncompressed_path(path) == plain
+
+
+@pytest.mark.parametrize(
+    "suffix, decompress", [(".gz", gzip.decompress), (".bz2", bz2.decompress), (".xz", lzma.decompress)]
+)
+def test_writer_and_reader_round_trip(suffix, decompress):
+    file = io.BytesIO()
+    with open_writer(file, "a.txt" + suffix) as writer:
+        writer.write(b"hello\n" * 1000)
+    # Closing the writer finishes the stream but leaves the file open for the saver.
+    assert not file.closed
+    assert decompress(file.getvalue()) == b"hello\n" * 1000
+    file.seek(0)
+    with open_reader(file, "a.txt" + suffix) as reader:
+        assert reader.read(6) == b"hello\n"
+
+
+def test_uncompressed_files_are_not_wrapped():
+    file = io.BytesIO()
+    assert open_reader(file, "a.txt") is file
+    assert open_writer(file, "a.txt") is file
+
+
+def test_saver_compresses_in_the_format_of_the_file(qapp, tmp_path):
+    path = tmp_path / "a.txt.gz"
+    saver = FileSaver(str(path), [("héllo\n", 0, 6)], newline="\r\n")
+    errors = []
+    saver.failed.connect(errors.append)
+    saver.run()
+    assert errors == []
+    assert gzip.decompress(path.read_bytes()) == "héllo\r\n".encode()
@@ -0,0 +1,67 @@
+import pytest
+from PySide6.QtTest import QTest
+
+from follow import FileFollower
+
+
+@pytest.fixture
+def follow(qapp, tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"")
+    received = []
+    resets = []
+    followers = []
+
+    def start(offset=0, encoding="utf-8"):
+        follower = FileFollower(str(path), offset, encoding)
+        follower.appended.connect(received.append)
+        follower.reset.connect(lambda: resets.append(len(received)))
+        followers.append(follower)
+        return follower
+
+    yield path, start, received, resets
+    for follower in followers:
+        follower.close()
+
+
+def wait_for(condition, timeout_ms=5000):
+    for _ in range(timeout_ms // 10):
+        if condition():
+            return
+        QTest.qWait(10)
+    raise AssertionError("timed out")
+
+
+def append(path, data):
+    with open(path, "ab") as file:
+        file.write(data)
+
+
+def test_appended_text_is_emitted_from_the_offset(follow):
+    path, start, received, _ = follow
+    path.write_bytes(b"old\n")
+    follower = start(offset=4)
+    append(path, b"new\r\nline\n")
+    wait_for(lambda: "".join(received) == "new\nline\n")
+    assert follower.offset() == path.stat().st_size
+
+
+def test_offset_excludes_held_back_bytes(follow):
+    path, start, received, _ = follow
+    follower = start()
+    # A cut UTF-8 character and a CR that may be followed by an LF are not emitted yet.
+    append(path, "ab\r".encode() + "é".encode()[:1])
+    wait_for(lambda: received == ["ab"])
+    assert follower.offset() == 2
+    append(path, "é".encode()[1:] + b"\n")
+    wait_for(lambda: "".join(received) == "ab\né\n")
+    assert follower.offset() == path.stat().st_size
+
+
+def test_truncation_resets_and_follows_from_the_start(follow):
+    path, start, received, resets = follow
+    path.write_bytes(b"first\n")
+    follower = start(offset=6)
+    path.write_bytes(b"x\n")
+    wait_for(lambda: resets and "".join(received) == "x\n")
+    assert follower.offset() == 2
@@ -0,0 +1,51 @@
+from PySide6.QtGui import QTextCursor, QTextDocument
+from PySide6.QtWidgets import QPlainTextDocumentLayout
+from PySide6.QtTest import QTest
+
+from highlighter import FORMATS, Highlighter, MarkdownLexer, PythonLexer, lexer_for_path
+
+
+def highlight(text, lexer):
+    document = QTextDocument()
+    # Without a layout the document reports no changes, as in the editor it always has one.
+    document.setDocumentLayout(QPlainTextDocumentLayout(document))
+    document.setPlainText(text)
+    highlighter = Highlighter(document)
+    highlighter.set_lexer(lexer)
+    for _ in range(500):
+        if not highlighter.pending:
+            break
+        QTest.qWait(1)
+    return document, highlighter
+
+
+def kinds(block):
+    """Return the ``(start, length, kind)`` of each format range of a block."""
+    return [
+        (format_range.start, format_range.length, next(k for k, f in FORMATS.items() if f == format_range.format))
+        for format_range in block.layout().formats()
+    ]
+
+
+def test_lexer_for_path():
+    assert isinstance(lexer_for_path("a.py"), PythonLexer)
+    assert isinstance(lexer_for_path("notes.md.gz"), MarkdownLexer)
+    assert lexer_for_path("a.txt") is None
+
+
+def test_formats_are_placed_in_utf16_units(qapp):
+    text = 'x = "😀😀" # comment'
+    document, _ = highlight(text, PythonLexer())
+    ranges = kinds(document.firstBlock())
+    # Each emoji takes two UTF-16 units, so the string spans 6 and the comment starts at 11.
+    assert (4, 6, "string") in ranges
+    assert (11, 9, "comment") in ranges
+
+
+def test_triple_quoted_string_state_carries_to_the_next_block(qapp):
+    document, highlighter = highlight('s = """\nstill a string\n"""\nx = 1', PythonLexer())
+    assert kinds(document.findBlockByNumber(1)) == [(0, 14, "string")]
+    cursor = QTextCursor(document.findBlockByNumber(0))
+    cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+    cursor.insertText(' """')
+    assert kinds(document.findBlockByNumber(1)) == []
@@ -0,0 +1,79 @@
+import os
+import struct
+from pathlib import Path
+
+from journal import EditJournal, JournalDirectory, JournalWriter, encode_header, encode_record, read_journal
+
+
+def write_journal(path, *records):
+    path.write_bytes(encode_header("/tmp/a.txt", "utf-16-le", (12, 34)) + b"".join(records))
+
+
+def test_read_journal(tmp_path):
+    path = tmp_path / "a.journal"
+    write_journal(path, encode_record(0, 0, "héllo 😀"), encode_record(3, 2, ""))
+    header, edits = read_journal(path)
+    assert header == {"path": "/tmp/a.txt", "encoding": "utf-16-le", "fingerprint": (12, 34)}
+    assert edits == [(0, 0, "héllo 😀"), (3, 2, "")]
+
+
+def test_reading_stops_at_a_torn_record(tmp_path):
+    path = tmp_path / "a.journal"
+    write_journal(path, encode_record(0, 0, "kept"), encode_record(4, 0, "torn")[:-2])
+    assert read_journal(path)[1] == [(0, 0, "kept")]
+
+
+def test_reading_stops_at_a_corrupt_record(tmp_path):
+    path = tmp_path / "a.journal"
+    record = bytearray(encode_record(4, 0, "flipped"))
+    record[struct.calcsize("<III")] ^= 0xFF
+    write_journal(path, encode_record(0, 0, "kept"), bytes(record), encode_record(0, 0, "after"))
+    assert read_journal(path)[1] == [(0, 0, "kept")]
+
+
+def test_invalid_header(tmp_path):
+    path = tmp_path / "a.journal"
+    path.write_bytes(b"not a journal")
+    assert read_journal(path) is None
+    assert read_journal(tmp_path / "missing.journal") is None
+
+
+def test_journal_after_save_keeps_only_edits_made_during_the_save(tmp_path, qapp):
+    writer = JournalWriter()
+    writer.start()
+    path = str(tmp_path / "a.journal")
+    journal = EditJournal(writer, path, "/tmp/a.txt", "utf-8", (1, 2))
+    journal.record(0, 0, "saved")
+    journal.begin_save()
+    journal.record(5, 0, " typed during the save")
+    journal.finish_save("/tmp/b.txt", "latin-1", (3, 4))
+    writer.stop()
+    header, edits = read_journal(path)
+    assert header == {"path": "/tmp/b.txt", "encoding": "latin-1", "fingerprint": (3, 4)}
+    assert edits == [(5, 0, " typed during the save")]
+
+
+def test_discarded_journal_is_removed(tmp_path, qapp):
+    writer = JournalWriter()
+    writer.start()
+    path = tmp_path / "a.journal"
+    journal = EditJournal(writer, str(path), "/tmp/a.txt", "utf-8", (1, 2))
+    journal.record(0, 0, "x")
+    journal.discard()
+    writer.stop()
+    assert not path.exists()
+
+
+def test_journals_of_exited_editors_are_recovered(tmp_path, qapp):
+    exited = JournalDirectory(str(tmp_path))
+    journal_path = exited.new_journal_path()
+    write_journal(Path(journal_path), encode_record(0, 0, "unsaved"))
+    running = JournalDirectory(str(tmp_path))
+    # Still locked by its editor.
+    assert running.recover() == []
+    exited.close()
+    recovered = running.recover()
+    assert [os.path.basename(path) for path in recovered] == [os.path.basename(journal_path)]
+    assert read_journal(recovered[0])[1] == [(0, 0, "unsaved")]
+    assert not os.path.exists(exited.directory)
+    running.close()
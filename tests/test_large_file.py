@@ -0,0 +1,78 @@
+import large_file
+from large_file import LargeFileModel, LargeFileSearch
+
+
+def open_model(path, data):
+    path.write_bytes(data)
+    model = LargeFileModel(str(path))
+    model.index.run()
+    return model
+
+
+def test_index_checkpoints_every_chunk(tmp_path, qapp, monkeypatch):
+    monkeypatch.setattr(large_file, "INDEX_CHUNK_SIZE", 10)
+    model = open_model(tmp_path / "big.txt", b"".join(b"line %d\n" % index for index in range(100)))
+    try:
+        assert model.line_count == 101
+        assert len(model.index.chunk_offsets) > 50
+        assert model.line_offset(42) == len(b"".join(b"line %d\n" % index for index in range(42)))
+        assert model.text(98, 5) == "line 98\nline 99\n"
+    finally:
+        model.close()
+
+
+def test_text_drops_carriage_returns_of_line_breaks(tmp_path, qapp):
+    model = open_model(tmp_path / "big.txt", "a\r\nb\xe9\r\nc\r".encode())
+    try:
+        assert model.line_count == 3
+        assert model.text(0, 2) == "a\nb\xe9"
+        assert model.text(2, 1) == "c"
+    finally:
+        model.close()
+
+
+def test_empty_file_has_one_empty_line(tmp_path, qapp):
+    model = open_model(tmp_path / "big.txt", b"")
+    try:
+        assert (model.line_count, model.text(0, 10)) == (1, "")
+    finally:
+        model.close()
+
+
+def search(path, query, **options):
+    worker = LargeFileSearch(str(path), query, **options)
+    matches = []
+    worker.matches_found.connect(matches.extend)
+    worker.run()
+    return worker, matches
+
+
+def test_search_reports_byte_offsets_and_lines(tmp_path, qapp):
+    path = tmp_path / "big.txt"
+    path.write_bytes("é foo\r\nbar\nFOO foo\n".encode())
+    _, matches = search(path, "foo")
+    assert matches == [(3, 6, 0), (12, 15, 2), (16, 19, 2)]
+    _, matches = search(path, "foo", case_sensitive=True)
+    assert matches == [(3, 6, 0), (16, 19, 2)]
+    _, matches = search(path, r"^\w+$", regex=True)
+    assert matches == [(8, 11, 1)]
+
+
+def test_search_reports_unencodable_queries_and_empty_files(tmp_path, qapp):
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"")
+    worker, matches = search(path, "x")
+    assert (worker.error, matches) == ("", [])
+    worker, _ = search(path, "€", encoding="latin-1")
+    assert "latin-1" in worker.error
+
+
+def test_model_converts_byte_offsets_to_columns(tmp_path, qapp):
+    path = tmp_path / "big.txt"
+    path.write_bytes("a\n\U0001f600é foo\n".encode())
+    model = LargeFileModel(str(path))
+    try:
+        assert model.column(path.read_bytes().index(b"foo")) == 4
+        assert model.line_breaks(0, 3) == 1
+    finally:
+        model.close()
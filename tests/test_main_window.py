@@ -0,0 +1,206 @@
+import codecs
+import gzip
+
+import pytest
+from PySide6.QtTest import QTest
+
+import main
+from main import MainWindow
+
+
+@pytest.fixture
+def window(qapp):
+    window = MainWindow()
+    yield window
+    for tab in window._document_tabs():
+        if tab.editor is not None:
+            tab.editor.document().setModified(False)
+    window.close()
+    window.deleteLater()
+
+
+def wait_until(condition, timeout_ms=5000):
+    for _ in range(timeout_ms // 10):
+        if condition():
+            return
+        QTest.qWait(10)
+    raise AssertionError("timed out")
+
+
+def test_cancelled_load_cannot_be_saved_over_the_file(window, tmp_path):
+    path = tmp_path / "big.txt"
+    data = b"".join(b"line %d\n" % index for index in range(1_000_000))
+    path.write_bytes(data)
+    window.open_files([(str(path), None)])
+    tab = window.current_tab
+    wait_until(lambda: tab.editor.document().characterCount() > 1)
+    window.cancel_loading()
+    assert tab.partial
+    assert "(partial)" in tab.title()
+    window.save_file()
+    wait_until(lambda: tab.saver is None)
+    assert path.read_bytes() == data
+
+
+def test_large_utf16_file_is_streamed_instead_of_mapped(window, tmp_path):
+    path = tmp_path / "wide.txt"
+    path.write_bytes(codecs.BOM_UTF16_LE + "first\nsecond\n".encode("utf-16-le"))
+    window.large_file_threshold = 0
+    window.open_files([(str(path), None)])
+    tab = window.current_tab
+    wait_until(lambda: tab.loader is None)
+    assert tab.editor.large_file is None
+    assert tab.editor.toPlainText() == "first\nsecond\n"
+
+
+def test_editing_is_blocked_until_the_file_is_loaded(window, tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"".join(b"line %d\n" % index for index in range(1_000_000)))
+    window.open_files([(str(path), None)])
+    tab = window.current_tab
+    editor = tab.editor
+    wait_until(lambda: editor.document().characterCount() > 1)
+    assert tab.loader is not None
+    QTest.keyClicks(editor, "TYPED")
+    assert editor.isReadOnly()
+    assert not editor.textCursor().hasSelection()
+    wait_until(lambda: tab.loader is None, 30000)
+    assert not editor.isReadOnly()
+    assert not editor.textCursor().hasSelection()
+    assert editor.textCursor().position() == 0
+    QTest.keyClicks(editor, "X")
+    assert editor.toPlainText().startswith("Xline 0\nline 1\n")
+    assert editor.text_model.text() == editor.toPlainText()
+    assert editor.document().isModified()
+
+
+def follow_file(window, tmp_path, data):
+    path = tmp_path / "app.log"
+    path.write_bytes(data)
+    window.open_files([(str(path), None)])
+    tab = window.current_tab
+    wait_until(lambda: tab.loader is None)
+    window.toggle_follow()
+    assert tab.follower is not None
+    return path, tab
+
+
+def test_following_again_continues_after_followed_text(window, tmp_path):
+    path, tab = follow_file(window, tmp_path, b"a\n")
+    with open(path, "ab") as file:
+        file.write(b"b\n")
+    wait_until(lambda: tab.editor.toPlainText() == "a\nb\n")
+    window.toggle_follow()
+    assert tab.follower is None
+    window.toggle_follow()
+    with open(path, "ab") as file:
+        file.write(b"c\n")
+    wait_until(lambda: tab.editor.toPlainText().endswith("c\n"))
+    assert tab.editor.toPlainText() == "a\nb\nc\n"
+
+
+def test_save_as_stops_following(window, tmp_path, monkeypatch):
+    path, tab = follow_file(window, tmp_path, b"a\n")
+    with open(path, "ab") as file:
+        file.write(b"b\n")
+    wait_until(lambda: tab.editor.toPlainText() == "a\nb\n")
+    copy = tmp_path / "copy.log"
+    monkeypatch.setattr(main.QFileDialog, "getSaveFileName", lambda *args: (str(copy), ""))
+    window._save_as_file()
+    wait_until(lambda: tab.saver is None)
+    assert tab.follower is None
+    assert tab.file_path == str(copy)
+    with open(path, "ab") as file:
+        file.write(b"c\n")
+    QTest.qWait(300)
+    assert copy.read_bytes() == b"a\nb\n"
+    assert tab.editor.toPlainText() == "a\nb\n"
+
+
+def test_line_beyond_the_indexed_part_of_a_large_file_is_reached(window, tmp_path):
+    path = tmp_path / "big.log"
+    path.write_bytes(b"".join(b"line %d\n" % index for index in range(2_000_000)))
+    window.large_file_threshold = 0
+    window.open_files([(str(path), 1_500_000)])
+    editor = window.current_tab.editor
+    assert editor.large_file is not None
+    wait_until(lambda: editor.large_file.index.isFinished(), 30000)
+    QTest.qWait(50)
+    assert editor.large_file_scroll_bar.value() == 1_499_999
+    assert editor.firstVisibleBlock().text() == "line 1499999"
+
+
+def test_large_file_threshold_can_be_set(qapp, tmp_path):
+    path = tmp_path / "small.txt"
+    path.write_bytes(b"x\n" * 1024)
+    window = MainWindow(large_file_threshold=1024)
+    window.open_files([(str(path), None)])
+    assert window.current_tab.editor.large_file is not None
+    window.close()
+    window.deleteLater()
+
+
+def test_find_in_large_file_mode_selects_matches_outside_the_window(window, tmp_path):
+    path = tmp_path / "big.log"
+    path.write_bytes(b"".join(b"line %d\n" % index for index in range(200_000)) + "ünïcode needle\n".encode())
+    window.large_file_threshold = 0
+    window.open_files([(str(path), None)])
+    editor = window.current_tab.editor
+    wait_until(lambda: editor.large_file.index.isFinished(), 30000)
+    window.show()
+    panel = window.find_panel
+    panel.show_find()
+    panel.find_field.setText("NEEDLE")
+    wait_until(lambda: panel.count_label.text() == "1 matches")
+    panel.find_next()
+    QTest.qWait(50)
+    cursor = editor.textCursor()
+    assert cursor.selectedText() == "needle"
+    assert editor.line_number_offset + cursor.blockNumber() == 200_000
+    assert len(editor.extraSelections()) == 1
+    panel.find_previous()
+    assert editor.textCursor().selectedText() == "needle"
+    panel.replace_current()
+    assert cursor.selectedText() == "needle"
+    assert "read-only" in panel.count_label.text()
+
+
+def test_least_recently_used_unmodified_tabs_are_unloaded(window, tmp_path):
+    paths = []
+    for name in "abc":
+        paths.append(tmp_path / f"{name}.txt")
+        paths[-1].write_text(f"{name}\n" * 1000)
+    window.memory_budget = 0
+    a, b, c = (window.add_document(str(path), False) for path in paths)
+    # Tabs are loaded when first shown.
+    assert (a.editor, b.editor, c.editor) == (None, None, None)
+    window.tabs.setCurrentWidget(c)
+    wait_until(lambda: c.loader is None)
+    window.tabs.setCurrentWidget(a)
+    wait_until(lambda: a.loader is None)
+    assert c.editor is None
+    a.editor.insertPlainText("modified ")
+    window.tabs.setCurrentWidget(b)
+    wait_until(lambda: b.loader is None)
+    # Modified documents stay loaded whatever the budget.
+    assert a.editor is not None
+    cursor = b.editor.textCursor()
+    cursor.setPosition(100)
+    b.editor.setTextCursor(cursor)
+    window.tabs.setCurrentWidget(c)
+    assert b.editor is None
+    window.tabs.setCurrentWidget(b)
+    wait_until(lambda: b.loader is None)
+    assert b.editor.textCursor().position() == 100
+
+
+def test_compressed_file_is_decompressed_while_loading(window, tmp_path):
+    path = tmp_path / "notes.md.gz"
+    path.write_bytes(gzip.compress("# Title\n\nbody\n".encode() * 1000))
+    window.large_file_threshold = 0
+    window.open_files([(str(path), None)])
+    tab = window.current_tab
+    wait_until(lambda: tab.loader is None)
+    # Compressed files are never mapped, however large.
+    assert tab.editor.large_file is None
+    assert tab.editor.toPlainText() == "# Title\n\nbody\n" * 1000
@@ -0,0 +1,61 @@
+import random
+
+from piece_table import PieceTable, astral_offsets
+
+
+def utf16_length(text):
+    return len(text.encode("utf-16-le")) // 2
+
+
+def check(table, text):
+    assert table.text() == text
+    assert len(table) == len(text)
+    assert table.utf16_length() == utf16_length(text)
+    for index in range(len(text) + 1):
+        position = utf16_length(text[:index])
+        assert table.to_utf16(index) == position
+        assert table.from_utf16(position) == index
+
+
+def test_astral_offsets():
+    assert astral_offsets("plain") == []
+    assert astral_offsets("é😀a𝄞") == [1, 3]
+
+
+def test_edits_match_string_model():
+    rng = random.Random(3)
+    alphabet = "ab\né😀𝄞"
+    text = "héllo 😀 world\nsecond line\n"
+    table = PieceTable(text)
+    for _ in range(300):
+        position = rng.randint(0, len(text))
+        if rng.random() < 0.5:
+            inserted = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+            table.insert(position, inserted)
+            text = text[:position] + inserted + text[position:]
+        else:
+            length = rng.randint(0, len(text) - position)
+            table.delete(position, length)
+            text = text[:position] + text[position + length :]
+        check(table, text)
+
+
+def test_append_original_and_replace_ranges():
+    table = PieceTable()
+    table.append_original("a😀b\n")
+    table.append_original("c😀d\n")
+    text = "a😀b\nc😀d\n"
+    check(table, text)
+    replacements = [(0, 1, "𝄞"), (2, 6, "xy"), (7, 8, "")]
+    table.replace_ranges(replacements)
+    for start, end, replacement in reversed(replacements):
+        text = text[:start] + replacement + text[end:]
+    check(table, text)
+
+
+def test_snapshot_survives_later_edits():
+    table = PieceTable("one two three")
+    snapshot = table.snapshot()
+    table.replace(4, 3, "2")
+    assert "".join(buffer[lo:hi] for buffer, lo, hi in snapshot) == "one two three"
+    assert table.text() == "one 2 three"
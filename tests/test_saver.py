@@ -0,0 +1,38 @@
+import os
+import stat
+
+from saver import NEW_FILE_MODE, FileSaver
+
+
+def save(path, text):
+    saver = FileSaver(str(path), [(text, 0, len(text))], newline="\n")
+    errors = []
+    saver.failed.connect(errors.append)
+    saver.run()
+    assert errors == []
+
+
+def test_new_file_gets_default_permissions(qapp, tmp_path):
+    path = tmp_path / "new.txt"
+    save(path, "hello\n")
+    assert stat.S_IMODE(os.stat(path).st_mode) == NEW_FILE_MODE
+
+
+def test_existing_permissions_are_kept(qapp, tmp_path):
+    path = tmp_path / "script.sh"
+    path.write_text("old\n")
+    os.chmod(path, 0o750)
+    save(path, "new\n")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o750
+    assert path.read_text() == "new\n"
+
+
+def test_symlink_target_is_replaced_not_the_link(qapp, tmp_path):
+    target = tmp_path / "real.txt"
+    target.write_text("old\n")
+    link = tmp_path / "link.txt"
+    link.symlink_to(target)
+    save(link, "new\n")
+    assert link.is_symlink()
+    assert target.read_text() == "new\n"
+    assert sorted(os.listdir(tmp_path)) == ["link.txt", "real.txt"]
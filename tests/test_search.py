@@ -0,0 +1,44 @@
+import pytest
+
+from piece_table import PieceTable
+from search import TextSearch
+
+TEXT = "héllo 😀 world\nsecond line\n"
+
+
+def utf16(text, index):
+    return len(text[:index].encode("utf-16-le")) // 2
+
+
+def run_search(qapp, spans, query, **options):
+    search = TextSearch(spans, query, **options)
+    matches = []
+    search.matches_found.connect(matches.extend)
+    search.run()
+    return matches, search.error
+
+
+@pytest.mark.parametrize("options", [{}, {"case_sensitive": True}, {"regex": True}])
+def test_matches_are_utf16_positions(qapp, options):
+    matches, _ = run_search(qapp, PieceTable(TEXT).snapshot(), "l", **options)
+    expected = [utf16(TEXT, index) for index, char in enumerate(TEXT) if char == "l"]
+    assert [start for start, _, _ in matches] == expected
+    assert all(end == start + 1 for start, end, _ in matches)
+
+
+def test_positions_across_chunks(qapp, monkeypatch):
+    # Small chunks, so matches and non-BMP characters fall on both sides of chunk boundaries.
+    monkeypatch.setattr("search.iter_text_chunks.__defaults__", (7,))
+    text = "😀ab\n" * 10
+    matches, _ = run_search(qapp, PieceTable(text).snapshot(), "ab", case_sensitive=True)
+    assert [start for start, _, _ in matches] == [utf16(text, index) for index in range(1, len(text), 4)]
+
+
+def test_regex_replacements(qapp):
+    matches, _ = run_search(qapp, PieceTable("a1 b22").snapshot(), r"(\w)(\d+)", regex=True, replacement=r"\2\1")
+    assert matches == [(0, 2, "1a"), (3, 6, "22b")]
+
+
+def test_invalid_regex(qapp):
+    matches, error = run_search(qapp, PieceTable("text").snapshot(), "(", regex=True)
+    assert matches == [] and error
@@ -0,0 +1,62 @@
+import json
+
+from PySide6.QtTest import QTest
+
+from main import MainWindow
+from session import SESSION_VERSION, load_session, save_session
+
+
+def wait_until(condition, timeout_ms=5000):
+    for _ in range(timeout_ms // 10):
+        if condition():
+            return
+        QTest.qWait(10)
+    raise AssertionError("timed out")
+
+
+def test_session_round_trips(tmp_path):
+    path = tmp_path / "state" / "session.json"
+    session = {"documents": [{"path": "/tmp/a.txt", "cursor": 3}], "current": 0, "show_line_numbers": False}
+    save_session(str(path), session)
+    assert load_session(str(path)) == dict(session, version=SESSION_VERSION)
+    assert [p.name for p in path.parent.iterdir()] == ["session.json"]
+
+
+def test_unreadable_sessions_are_ignored(tmp_path):
+    path = tmp_path / "session.json"
+    assert load_session(str(path)) is None
+    path.write_text("{not json")
+    assert load_session(str(path)) is None
+    path.write_text(json.dumps({"version": SESSION_VERSION + 1, "documents": []}))
+    assert load_session(str(path)) is None
+    path.write_text("[]")
+    assert load_session(str(path)) is None
+
+
+def test_restore_loads_only_the_current_document(qapp, tmp_path):
+    session_path = str(tmp_path / "session.json")
+    paths = [tmp_path / "a.txt", tmp_path / "b.txt"]
+    for path in paths:
+        path.write_text("first\nsecond\n")
+    window = MainWindow(session_path=session_path)
+    window.open_files([(str(path), None) for path in paths])
+    wait_until(lambda: window.current_tab.loader is None)
+    cursor = window.current_tab.editor.textCursor()
+    cursor.setPosition(8)
+    window.current_tab.editor.setTextCursor(cursor)
+    window.write_session()
+    window.close()
+    window.deleteLater()
+
+    restored = MainWindow(session_path=session_path)
+    try:
+        tabs = list(restored._document_tabs())
+        assert [tab.file_path for tab in tabs] == [str(path) for path in paths]
+        assert restored.current_tab is tabs[1]
+        assert tabs[0].editor is None
+        wait_until(lambda: tabs[1].loader is None)
+        assert tabs[1].editor.textCursor().position() == 8
+        assert tabs[1].editor.textCursor().block().text() == "second"
+    finally:
+        restored.close()
+        restored.deleteLater()
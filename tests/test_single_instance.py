@@ -0,0 +1,43 @@
+import os
+import stat
+import tempfile
+
+import pytest
+
+from single_instance import decode_request, encode_request, hand_off, server_name
+
+
+@pytest.fixture
+def temp_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "gettempdir", lambda: str(tmp_path))
+    return tmp_path
+
+
+def test_socket_is_kept_in_a_private_directory(temp_dir):
+    directory = os.path.dirname(server_name())
+    assert os.path.dirname(directory) == str(temp_dir)
+    assert stat.S_IMODE(os.lstat(directory).st_mode) == 0o700
+
+
+def test_shared_directory_is_refused(temp_dir):
+    directory = temp_dir / f"gapp-text-editor-{os.getuid()}"
+    directory.mkdir()
+    os.chmod(directory, 0o777)
+    with pytest.raises(PermissionError):
+        server_name()
+    assert not hand_off([("a.txt", None)])
+
+
+def test_symlinked_directory_is_refused(temp_dir):
+    target = temp_dir / "elsewhere"
+    target.mkdir(mode=0o700)
+    (temp_dir / f"gapp-text-editor-{os.getuid()}").symlink_to(target)
+    with pytest.raises(PermissionError):
+        server_name()
+
+
+def test_request_round_trip():
+    files, options = decode_request(encode_request([("a.txt", 3)], read_only=True, encoding="latin-1"))
+    assert files == [(os.path.abspath("a.txt"), 3)]
+    assert options == {"read_only": True, "encoding": "latin-1"}
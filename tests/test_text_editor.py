@@ -0,0 +1,114 @@
+import pytest
+from PySide6.QtGui import QTextCursor
+from PySide6.QtTest import QTest
+
+from main import TextEditor
+
+TEXT = "héllo 😀 world\nsecond line\n"
+
+
+@pytest.fixture
+def editor(qapp):
+    editor = TextEditor()
+    editor.begin_loading()
+    editor.append_chunk(TEXT)
+    editor.end_loading()
+    yield editor
+    editor.deleteLater()
+
+
+def assert_in_sync(editor):
+    assert editor.text_model.text() == editor.toPlainText()
+
+
+def move_to(editor, position):
+    cursor = editor.textCursor()
+    cursor.setPosition(position)
+    editor.setTextCursor(cursor)
+
+
+def test_typing_after_astral_character(editor):
+    editor.moveCursor(QTextCursor.MoveOperation.End)
+    QTest.keyClicks(editor, "abc")
+    assert_in_sync(editor)
+    assert editor.toPlainText() == TEXT + "abc"
+
+
+def test_undo_redo_after_astral_character(editor):
+    editor.moveCursor(QTextCursor.MoveOperation.End)
+    QTest.keyClicks(editor, "abc")
+    editor.undo()
+    assert_in_sync(editor)
+    assert editor.toPlainText() == TEXT
+    editor.redo()
+    assert_in_sync(editor)
+    assert editor.toPlainText() == TEXT + "abc"
+
+
+def test_inserting_and_deleting_astral_characters(editor):
+    move_to(editor, 6)
+    editor.insertPlainText("𝄞x")
+    assert_in_sync(editor)
+    QTest.keyClick(editor, "\b")
+    QTest.keyClick(editor, "\b")
+    assert_in_sync(editor)
+    assert editor.toPlainText() == TEXT
+    editor.undo()
+    assert_in_sync(editor)
+
+
+def test_replace_ranges_uses_document_positions(editor):
+    text = editor.toPlainText()
+    # UTF-16 positions of every "l" after the emoji.
+    positions = [len(text[:index].encode("utf-16-le")) // 2 for index, char in enumerate(text) if char == "l"]
+    editor.replace_ranges([(position, position + 1, "L") for position in positions])
+    assert_in_sync(editor)
+    assert editor.toPlainText() == TEXT.replace("l", "L")
+    editor.undo()
+    assert_in_sync(editor)
+    assert editor.toPlainText() == TEXT
+
+
+def test_replayed_journal_edits(editor):
+    end = editor.document().characterCount() - 1
+    editor.replay_edits([(end, 0, "tail 😀"), (8, 1, "_"), (0, 1, "H")])
+    assert_in_sync(editor)
+    assert editor.toPlainText() == "Héllo 😀_world\nsecond line\ntail 😀"
+    editor.undo()
+    assert_in_sync(editor)
+    assert editor.toPlainText() == TEXT
+
+
+def test_replace_all_after_astral_character(editor, qapp):
+    from main import FindPanel
+
+    panel = FindPanel()
+    panel.set_text_editor(editor)
+    panel.find_field.setText("l")
+    panel.case_option.setChecked(True)
+    panel.replace_field.setText("L")
+    panel.replace_all()
+    panel._replace_search.wait()
+    qapp.processEvents()
+    assert editor.toPlainText() == TEXT.replace("l", "L")
+    assert_in_sync(editor)
+    editor.undo()
+    assert editor.toPlainText() == TEXT
+    assert_in_sync(editor)
+    panel.shutdown()
+
+
+def test_painted_line_numbers_stay_within_the_gutter(qapp):
+    editor = TextEditor()
+    editor.resize(400, 200)
+    editor.show()
+    editor.setPlainText("\n".join(str(i) for i in range(2000)))
+    qapp.processEvents()
+    scroll_bar = editor.verticalScrollBar()
+    for value in range(0, scroll_bar.maximum(), 3):
+        scroll_bar.setValue(value)
+        qapp.processEvents()
+    area = editor.line_number_area
+    assert area._painted_rows
+    assert all(-area._line_height < top < area.height() for top in area._painted_rows)
+    editor.deleteLater()
@@ -0,0 +1,81 @@
+import codecs
+import os
+
+import pytest
+
+from text_format import detect_text_format, is_ascii_compatible
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        ("héllo\r\nworld\r\n".encode(), ("utf-8", "\r\n")),
+        (codecs.BOM_UTF8 + b"a\nb\n", ("utf-8-sig", "\n")),
+        (codecs.BOM_UTF16_LE + "a\rb\r".encode("utf-16-le"), ("utf-16-le-sig", "\r")),
+        (codecs.BOM_UTF16_BE + "a\r\nb\r\n".encode("utf-16-be"), ("utf-16-be-sig", "\r\n")),
+        (codecs.BOM_UTF32_LE + "x\n".encode("utf-32-le"), ("utf-32-le-sig", "\n")),
+        ("hello world\nline\n".encode("utf-16-le"), ("utf-16-le", "\n")),
+        ("“quoted” café\n".encode("cp1252"), ("cp1252", "\n")),
+        ("caf\xe9 \x81\n".encode("latin-1"), ("latin-1", "\n")),
+    ],
+)
+def test_detection(tmp_path, data, expected):
+    path = tmp_path / "file.txt"
+    path.write_bytes(data)
+    assert detect_text_format(path) == expected
+
+
+def test_samples_after_the_head_are_checked(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes((b"a" * 100 + b"\r\n") * 5000 + "é".encode("latin-1") + b"\r\n")
+    assert detect_text_format(path) == ("cp1252", "\r\n")
+
+
+def test_utf8_character_cut_by_a_sample_is_not_mistaken_for_cp1252(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes("ééééééé\n".encode() * 100_000)
+    assert detect_text_format(path) == ("utf-8", "\n")
+
+
+def test_most_common_line_break_wins(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"a\r\nb\nc\r\nd\r\n")
+    assert detect_text_format(path) == ("utf-8", "\r\n")
+
+
+def test_file_without_line_breaks_uses_the_platform_newline(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"")
+    assert detect_text_format(path) == ("utf-8", os.linesep)
+
+
+def test_given_encoding_is_kept(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"a\nb\n")
+    assert detect_text_format(path, "latin-1") == ("latin-1", "\n")
+
+
+@pytest.mark.parametrize("name", ["utf-16-le-sig", "utf-16-be-sig", "utf-32-le-sig", "utf-32-be-sig"])
+def test_bom_codecs_round_trip(name):
+    encoder = codecs.getincrementalencoder(name)()
+    data = encoder.encode("a😀") + encoder.encode("b", final=True)
+    assert data.startswith(codecs.lookup(name.removesuffix("-sig")).encode("\ufeff")[0])
+    decoder = codecs.getincrementaldecoder(name)()
+    assert "".join(decoder.decode(data[i : i + 1]) for i in range(len(data))) + decoder.decode(b"", True) == "a😀b"
+    assert data.decode(name) == "a😀b"
+
+
+@pytest.mark.parametrize(
+    "encoding, expected",
+    [
+        ("utf-8", True),
+        ("utf-8-sig", True),
+        ("cp1252", True),
+        ("latin-1", True),
+        ("utf-16-le", False),
+        ("utf-16-be-sig", False),
+        ("utf-32-le-sig", False),
+    ],
+)
+def test_is_ascii_compatible(encoding, expected):
+    assert is_ascii_compatible(encoding) is expected
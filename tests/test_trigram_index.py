@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+import trigram_index
+from trigram_index import file_trigrams, query_trigrams
+
+
+def naive_trigrams(data):
+    return sorted({(a << 16) | (b << 8) | c for a, b, c in zip(data, data[1:], data[2:])})
+
+
+@pytest.mark.parametrize("length", [0, 1, 2, 3, 7, 8, 9, 13, 14, 15, 16, 17, 40, 1000])
+def test_file_trigrams_match_every_window(tmp_path, length):
+    rng = random.Random(length)
+    data = bytes(rng.choice(b"abcXYZ \n\xe9") for _ in range(length))
+    path = tmp_path / "data.txt"
+    path.write_bytes(data)
+    assert file_trigrams(str(path))[3] == naive_trigrams(data.lower())
+
+
+def test_file_trigrams_across_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(trigram_index, "TRIGRAM_CHUNK_SIZE", 5)
+    data = b"The quick brown fox jumps over the lazy dog\n" * 3
+    path = tmp_path / "data.txt"
+    path.write_bytes(data)
+    assert file_trigrams(str(path))[3] == naive_trigrams(data.lower())
+
+
+def test_query_trigrams_are_found_in_the_file(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"2025-01-01 ERROR request_id=rare-needle-42\n")
+    assert set(query_trigrams("rare-needle")) <= set(file_trigrams(str(path))[3])
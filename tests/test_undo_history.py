@@ -0,0 +1,110 @@
+import undo_history
+from undo_history import UndoHistory, decode_step, encode_step, utf16_length
+
+
+def test_step_encoding_round_trips():
+    deltas = [(0, "", "abc"), (5, "😀\n", ""), (2, "é", "x")]
+    assert decode_step(encode_step(deltas)) == deltas
+
+
+def test_utf16_length():
+    assert utf16_length("abc") == 3
+    assert utf16_length("a😀") == 3
+
+
+def test_typing_is_undone_as_one_run():
+    history = UndoHistory()
+    for index, char in enumerate("abc"):
+        history.record(index, "", char)
+    assert history.undo() == [(0, "", "abc")]
+    assert not history.can_undo()
+    assert history.redo() == [(0, "", "abc")]
+
+
+def test_run_after_astral_character_uses_utf16_positions():
+    history = UndoHistory()
+    history.record(0, "", "😀")
+    history.record(2, "", "a")
+    assert history.undo() == [(0, "", "😀a")]
+
+
+def test_groups_and_clean_state():
+    history = UndoHistory()
+    history.record(0, "", "a")
+    history.mark_clean()
+    history.begin_group()
+    history.record(1, "", "x")
+    history.record(0, "a", "b")
+    history.end_group()
+    assert not history.is_clean()
+    assert history.undo() == [(1, "", "x"), (0, "a", "b")]
+    assert history.is_clean()
+
+
+def test_new_edit_discards_redo():
+    history = UndoHistory()
+    history.record(0, "", "a")
+    history.undo()
+    history.record(0, "", "\n")
+    assert not history.can_redo()
+
+
+def test_steps_over_the_limit_are_spilled_and_read_back():
+    history = UndoHistory(memory_limit=1024)
+    for index in range(50):
+        history.begin_group()
+        history.record(index * 100, "", "x" * 100)
+        history.end_group()
+    assert history.statistics()["spilled_steps"] > 0
+    assert history.memory_usage() <= 1024
+    undone = [history.undo() for _ in range(50)]
+    assert undone[-1] == [(0, "", "x" * 100)]
+    assert history.undo() is None
+
+
+def test_saved_steps_are_loaded_below_this_session():
+    history = UndoHistory()
+    history.set_base_loader(lambda: ([encode_step([(0, "", "old")])], []))
+    history.record(3, "", "new")
+    history.undo()
+    # The session's own step is undone first, the saved one only once it is needed.
+    assert history.undo() == [(0, "", "old")]
+    undo_steps, redo_steps = history.export_steps()
+    assert undo_steps == []
+    assert [decode_step(step) for step in redo_steps] == [[(3, "", "new")], [(0, "", "old")]]
+
+
+def test_backspace_and_delete_runs_merge():
+    history = UndoHistory()
+    history.record(2, "c", "")
+    history.record(1, "b", "")
+    history.record(1, "d", "")
+    assert history.undo() == [(1, "bcd", "")]
+
+
+def test_runs_break_at_new_lines_and_pauses(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(undo_history.time, "monotonic", lambda: now[0])
+    history = UndoHistory()
+    history.record(0, "", "a")
+    history.record(1, "", "\n")
+    history.record(2, "", "b")
+    now[0] += undo_history.MERGE_TIMEOUT + 1
+    history.record(3, "", "c")
+    # A new line ends the run before it and starts the next one.
+    assert [history.undo() for _ in range(3)] == [[(3, "", "c")], [(1, "", "\nb")], [(0, "", "a")]]
+
+
+def test_steps_over_the_limit_are_dropped_without_spilling():
+    history = UndoHistory(memory_limit=1024, spill=False)
+    history.mark_clean()
+    for index in range(50):
+        history.begin_group()
+        history.record(index * 100, "", "x" * 100)
+        history.end_group()
+    assert history.statistics()["spilled_steps"] == 0
+    assert history.statistics()["dropped_steps"] > 0
+    while history.undo() is not None:
+        pass
+    # The saved state was dropped, so undoing cannot get back to it.
+    assert not history.is_clean()